@@ -0,0 +1,30 @@
+"""price_history asset_id + recorded_at index
+
+Revision ID: 3f1d2a9c7b40
+Revises: c58bcea65b8a
+Create Date: 2026-10-19 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1d2a9c7b40"
+down_revision: Union[str, None] = "c58bcea65b8a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_price_history_asset_recorded",
+        "price_history",
+        ["asset_id", "recorded_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_price_history_asset_recorded", table_name="price_history")
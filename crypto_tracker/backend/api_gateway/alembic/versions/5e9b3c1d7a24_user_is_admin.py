@@ -0,0 +1,31 @@
+"""user is_admin
+
+Revision ID: 5e9b3c1d7a24
+Revises: d2a6c94e0b17
+Create Date: 2026-10-19 16:42:10.318205
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e9b3c1d7a24"
+down_revision: Union[str, None] = "d2a6c94e0b17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Администраторов нет, пока их не назначат через grant_admin.py
+    op.add_column(
+        "users",
+        sa.Column("is_admin", sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "is_admin")
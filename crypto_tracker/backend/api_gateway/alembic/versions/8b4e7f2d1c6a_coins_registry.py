@@ -0,0 +1,61 @@
+"""coins registry
+
+Revision ID: 8b4e7f2d1c6a
+Revises: 3f1d2a9c7b40
+Create Date: 2026-10-19 12:40:18.207344
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b4e7f2d1c6a"
+down_revision: Union[str, None] = "3f1d2a9c7b40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Монеты, которые отслеживались до появления реестра. updated_at пустой:
+# при первом запуске gateway загрузит полный список провайдера
+SEED_COINS = [
+    ("bitcoin", "BTC", "Bitcoin", 1),
+    ("ethereum", "ETH", "Ethereum", 2),
+    ("solana", "SOL", "Solana", 5),
+    ("cardano", "ADA", "Cardano", 10),
+    ("polkadot", "DOT", "Polkadot", 30),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    coins = op.create_table(
+        "coins",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("symbol", sa.String(), nullable=True),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("rank", sa.Integer(), nullable=True),
+        sa.Column("is_primary", sa.Boolean(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_coins_symbol"), "coins", ["symbol"], unique=False)
+    op.bulk_insert(
+        coins,
+        [
+            {
+                "id": coin_id,
+                "symbol": symbol,
+                "name": name,
+                "rank": rank,
+                "is_primary": True,
+            }
+            for coin_id, symbol, name, rank in SEED_COINS
+        ],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_coins_symbol"), table_name="coins")
+    op.drop_table("coins")
@@ -0,0 +1,50 @@
+"""price_history symbol and quote
+
+Revision ID: 9c2e4f6a8b13
+Revises: 5e9b3c1d7a24
+Create Date: 2026-10-20 11:24:37.904512
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2e4f6a8b13"
+down_revision: Union[str, None] = "5e9b3c1d7a24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("price_history", sa.Column("symbol", sa.String(), nullable=True))
+    op.add_column(
+        "price_history", sa.Column("quote", sa.String(length=8), nullable=True)
+    )
+    # Существующие записи — по текущему символу актива: прежние смены
+    # символа не сохранялись, восстановить их не из чего
+    for column in ("symbol", "quote"):
+        op.execute(
+            f"UPDATE price_history SET {column} = "
+            f"(SELECT {column} FROM assets WHERE assets.id = price_history.asset_id)"
+        )
+    with op.batch_alter_table("price_history") as batch_op:
+        batch_op.alter_column("symbol", existing_type=sa.String(), nullable=False)
+        batch_op.alter_column(
+            "quote", existing_type=sa.String(length=8), nullable=False
+        )
+    op.create_index(
+        "ix_price_history_symbol_recorded",
+        "price_history",
+        ["symbol", "quote", "recorded_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_price_history_symbol_recorded", table_name="price_history")
+    with op.batch_alter_table("price_history") as batch_op:
+        batch_op.drop_column("quote")
+        batch_op.drop_column("symbol")
@@ -0,0 +1,31 @@
+"""asset quote currency
+
+Revision ID: d2a6c94e0b17
+Revises: 8b4e7f2d1c6a
+Create Date: 2026-10-19 14:05:52.613920
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2a6c94e0b17"
+down_revision: Union[str, None] = "8b4e7f2d1c6a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Существующие активы и их история — в долларах
+    op.add_column(
+        "assets",
+        sa.Column("quote", sa.String(length=8), server_default="USD", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("assets", "quote")
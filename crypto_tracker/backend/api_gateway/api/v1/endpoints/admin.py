@@ -0,0 +1,76 @@
+import asyncio
+
+from core.config import settings
+from core.principal_cache import principal_cache
+from core.profiling import list_profiles, make_profile_token, profile_path, profile_text
+from core.query_stats import query_stats
+from core.security import get_admin_user
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+
+router = APIRouter(dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/query-stats")
+async def get_query_stats(
+    order_by: str = Query(
+        "total_ms", pattern="^(total_ms|count|mean_ms|p50_ms|p95_ms|p99_ms|max_ms)$"
+    ),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    Время SQL-запросов по отпечаткам: количество, сумма, p50/p95/p99
+    и маршруты, которые их выполняют
+    """
+    return query_stats.stats(order_by, limit)
+
+
+@router.delete("/query-stats")
+async def reset_query_stats():
+    """Сбросить накопленную статистику SQL-запросов"""
+    query_stats.reset()
+    return {"message": "Query stats reset"}
+
+
+@router.get("/principal-cache")
+async def get_principal_cache_stats():
+    """Кэш аутентификации: размер, попадания по уровням, сбросы"""
+    return principal_cache.stats()
+
+
+@router.get("/profiles")
+async def get_profiles():
+    """Сохраненные профили запросов (см. ProfilingMiddleware)"""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(404, "Profiling is disabled")
+    return await asyncio.to_thread(list_profiles)
+
+
+@router.post("/profiles/token")
+async def create_profile_token(ttl: int = Query(600, ge=1, le=3600)):
+    """
+    Подписанный токен профилирования для заголовка X-Profile
+    или параметра ?profile=, действует ttl секунд
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(404, "Profiling is disabled")
+    token = make_profile_token(ttl)
+    return {"token": token, "expires": int(token.partition(".")[0])}
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("prof", pattern="^(prof|text)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+):
+    """
+    Профиль запроса: .prof для snakeviz / flameprof
+    или текстовый отчет pstats (format=text)
+    """
+    path = profile_path(profile_id) if settings.PROFILING_ENABLED else None
+    if path is None:
+        raise HTTPException(404, "Profile not found")
+    if format == "text":
+        return PlainTextResponse(await asyncio.to_thread(profile_text, path, sort))
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
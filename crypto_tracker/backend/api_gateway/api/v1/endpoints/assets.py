@@ -1,52 +1,196 @@
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 
+from core.cache import get_redis, price_key
+from core.config import settings
 from core.database import get_db
+from core.etag import conditional_get
+from core.rate_limit import limiter, user_or_ip_key
 from core.security import get_current_user
-from fastapi import APIRouter, Depends, HTTPException, Query
-from models.database import User
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from models.schemas import (
     AssetCreateRequest,
     AssetResponse,
     AssetUpdateRequest,
+    BacktestRequest,
     PriceHistory,
+    UserResponse,
+    to_naive_utc,
 )
 from repositories.asset import (
     create_asset,
     delete_asset,
     get_active_assets_by_user,
     get_asset_by_id,
-    get_assets_by_user,
     restore_asset_by_id,
     update_asset,
 )
-from repositories.price_history import get_price_history_by_asset
+from repositories.price_history import (
+    get_owned_price_history,
+    stream_price_history,
+    stream_user_price_history,
+)
+from services.arrow_export import (
+    ARROW_AVAILABLE,
+    ARROW_MEDIA_TYPES,
+    ARROW_WRITERS,
+    ASSET_COLUMNS,
+    USER_COLUMNS,
+)
+from services.asset_list import get_asset_list
+from services.backtest import DEFAULT_PERIOD, run_backtest
+from services.correlation import get_correlation
+from services.export import EXPORT_MEDIA_TYPES, EXPORT_WRITERS
+from services.history_format import ENCODERS, MEDIA_TYPES, negotiate_format
+from services.indicators import get_indicators
+from services.tick_stream import iter_tick_events
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
+# Для Arrow/Parquet порции крупнее: одна порция — один batch / row group
+ARROW_CHUNK_SIZE = 50_000
+
+# Лимиты на пользователя (без токена — на IP); выгрузки делят общий счетчик
+history_limit = Depends(limiter.limit(settings.HISTORY_RATE_LIMIT, user_or_ip_key))
+export_limit = Depends(
+    limiter.limit(settings.EXPORT_RATE_LIMIT, user_or_ip_key, scope="export")
+)
+
 
 @router.get("/", response_model=List[AssetResponse])
 async def get_my_assets(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    etag: Optional[str] = Depends(conditional_get),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Получить все активные валюты текущего пользователя"""
-    assets = await get_active_assets_by_user(db, current_user.id)
-    return assets
+    return await get_asset_list(db, current_user.id, active_only=True)
 
 
 @router.get("/all", response_model=List[AssetResponse])
 async def get_all_my_assets(
-    current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)
+    etag: Optional[str] = Depends(conditional_get),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
     """Получить все валюты текущего пользователя (включая неактивные)"""
-    assets = await get_assets_by_user(db, current_user.id)
-    return assets
+    return await get_asset_list(db, current_user.id, active_only=False)
+
+
+@router.get("/export", dependencies=[export_limit])
+async def export_my_price_history(
+    format: str = Query("arrow", pattern="^(arrow|parquet)$"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """
+    Выгрузить историю цен всех активов пользователя для аналитики
+    (Arrow IPC stream или Parquet)
+    """
+    if not ARROW_AVAILABLE:
+        raise HTTPException(501, "Arrow export is not available")
+
+    chunks = stream_user_price_history(
+        current_user.id,
+        to_naive_utc(start),
+        to_naive_utc(end),
+        chunk_size=ARROW_CHUNK_SIZE,
+    )
+    filename = f"{current_user.username}_price_history.{format}"
+    return StreamingResponse(
+        ARROW_WRITERS[format](chunks, USER_COLUMNS),
+        media_type=ARROW_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/stream")
+async def stream_my_prices(
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Поток цен активов пользователя (Server-Sent Events): событие tick
+    после каждого обновления цен worker'ом, вместо опроса истории
+    """
+    if get_redis() is None:
+        raise HTTPException(503, "Live updates are not available")
+
+    assets = await get_active_assets_by_user(db, current_user.id)
+    # Соединение возвращается в пул до начала долгого потока
+    await db.commit()
+
+    return StreamingResponse(
+        iter_tick_events({price_key(asset.symbol, asset.quote) for asset in assets}),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/correlation", dependencies=[history_limit])
+async def get_my_correlation(
+    resolution: str = Query("1h", pattern="^(5m|1h|1d)$"),
+    points: int = Query(168, ge=3, le=500),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Корреляция и ковариация доходностей активных активов пользователя.
+
+    Ряды выравниваются на общую сетку (points закрытых интервалов шага
+    resolution), матрицы — по лог-доходностям за шаг. Ответ кэшируется
+    по набору символов и шагу, поэтому одинаковые наборы у разных
+    пользователей считаются один раз
+    """
+    assets = await get_active_assets_by_user(db, current_user.id)
+    body = await get_correlation(
+        ((asset.symbol, asset.quote) for asset in assets), resolution, points
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/backtest", dependencies=[history_limit])
+async def backtest_thresholds(
+    backtest: BacktestRequest,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Сколько раз сработали бы уведомления для пар min_price / max_price
+    на истории символа за период — до создания актива.
+    Пар может быть до 1000 за запрос (перебор порогов)
+    """
+    end = backtest.end or datetime.utcnow()
+    start = backtest.start or end - DEFAULT_PERIOD
+    if start >= end:
+        raise HTTPException(422, "start must be before end")
+    if end - start > timedelta(days=settings.BACKTEST_MAX_DAYS):
+        raise HTTPException(
+            422, f"Period is longer than {settings.BACKTEST_MAX_DAYS} days"
+        )
+
+    body = await run_backtest(
+        db,
+        backtest.symbol,
+        backtest.quote.value,
+        backtest.thresholds,
+        start,
+        end,
+        backtest.max_events,
+    )
+    if body is None:
+        raise HTTPException(404, "No price history for this symbol and period")
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{asset_id}", response_model=AssetResponse)
 async def get_asset(
     asset_id: int,
-    current_user: User = Depends(get_current_user),
+    etag: Optional[str] = Depends(conditional_get),
+    current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Получить конкретный актив по ID"""
@@ -60,7 +204,7 @@ async def get_asset(
 @router.post("/", response_model=AssetResponse)
 async def create_new_asset(
     asset_data: AssetCreateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Создать новый актив для отслеживания"""
@@ -71,7 +215,7 @@ async def create_new_asset(
 @router.post("/{asset_id}/restore", response_model=AssetResponse)
 async def restore_asset(
     asset_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Восстановить неактивный актив"""
@@ -85,7 +229,7 @@ async def restore_asset(
 async def update_existing_asset(
     asset_id: int,
     asset_data: AssetUpdateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Обновить данные актива"""
@@ -98,7 +242,7 @@ async def update_existing_asset(
 @router.delete("/{asset_id}")
 async def delete_existing_asset(
     asset_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Удалить валюту"""
@@ -108,20 +252,117 @@ async def delete_existing_asset(
     return {"message": "Asset deleted successfully"}
 
 
-@router.get("/{asset_id}/history", response_model=List[PriceHistory])
+@router.get(
+    "/{asset_id}/history",
+    response_model=List[PriceHistory],
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+            "description": "JSON, колоночный JSON или msgpack (по Accept/format)",
+        }
+    },
+    dependencies=[history_limit],
+)
 async def get_asset_price_history(
+    request: Request,
     asset_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=1000),
-    current_user: User = Depends(get_current_user),
+    format: Optional[str] = Query(None, pattern="^(json|columnar|msgpack)$"),
+    etag: Optional[str] = Depends(conditional_get),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Получить историю цен для конкретного актива.
+
+    Формат выбирается параметром format или заголовком Accept:
+    columnar ({"t": [...], "p": [...]}) и msgpack собираются напрямую
+    из колонок, без pydantic-валидации каждой строки.
+    Владелец актива проверяется в том же запросе, что читает историю.
+    """
+    history = await get_owned_price_history(db, asset_id, current_user.id, skip, limit)
+    if history is None:
+        raise HTTPException(404, "Asset not found")
+
+    history_format = negotiate_format(request.headers.get("accept"), format)
+    if history_format in ENCODERS:
+        timestamps = [row.recorded_at for row in history]
+        prices = [row.price for row in history]
+        headers = {"Vary": "Accept"}
+        if etag:
+            headers.update({"ETag": etag, "Cache-Control": "private, no-cache"})
+        return Response(
+            content=ENCODERS[history_format](timestamps, prices),
+            media_type=MEDIA_TYPES[history_format],
+            headers=headers,
+        )
+
+    return [row._asdict() for row in history]
+
+
+@router.get("/{asset_id}/indicators", dependencies=[history_limit])
+async def get_asset_indicators(
+    asset_id: int,
+    window: int = Query(20, ge=2, le=200),
+    points: int = Query(100, ge=1, le=1000),
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Технические индикаторы по цене актива: SMA, EMA, RSI, полосы
+    Боллинджера и реализованная волатильность (годовая) за window тиков.
+
+    Ответ колоночный ({"t": [...], "price": [...], "sma": [...], ...}),
+    последние points точек. Считается по символу и валюте котировки,
+    а не по активу: до следующего тика worker'а все владельцы символа
+    получают один и тот же готовый ответ.
+    """
+    asset = await get_asset_by_id(db, asset_id, current_user.id)
+    if not asset:
+        raise HTTPException(404, "Asset not found")
+
+    body = await get_indicators(asset.symbol, asset.quote, window, points)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{asset_id}/export", dependencies=[export_limit])
+async def export_asset_price_history(
+    asset_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson|arrow|parquet)$"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    current_user: UserResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Получить историю цен для конкретного актива
+    Выгрузить полную историю цен актива за любой период:
+    CSV / NDJSON или Arrow IPC stream / Parquet для аналитики.
+    Строки читаются серверным курсором и сразу уходят клиенту,
+    поэтому память не зависит от количества записей.
     """
     asset = await get_asset_by_id(db, asset_id, current_user.id)
     if not asset:
         raise HTTPException(404, "Asset not found")
 
-    history = await get_price_history_by_asset(db, asset_id, skip, limit)
-    return history
+    # ?start=...Z приходит с зоной, а recorded_at в БД — без
+    start, end = to_naive_utc(start), to_naive_utc(end)
+    filename = f"{asset.symbol}_price_history.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if format in ARROW_WRITERS:
+        if not ARROW_AVAILABLE:
+            raise HTTPException(501, "Arrow export is not available")
+        chunks = stream_price_history(asset_id, start, end, chunk_size=ARROW_CHUNK_SIZE)
+        return StreamingResponse(
+            ARROW_WRITERS[format](chunks, ASSET_COLUMNS),
+            media_type=ARROW_MEDIA_TYPES[format],
+            headers=headers,
+        )
+
+    chunks = stream_price_history(asset_id, start, end)
+    return StreamingResponse(
+        EXPORT_WRITERS[format](chunks),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers=headers,
+    )
@@ -1,23 +1,26 @@
 from core.database import get_db
-from core.security import get_current_user, make_token, verify_password
-from fastapi import APIRouter, Depends, HTTPException, Request
-from models.database import User
+from core.rate_limit import limiter
+from core.security import get_current_user, make_token, verify_and_update_password
+from fastapi import APIRouter, Depends, HTTPException
 from models.schemas import Token, UserCreateRequest, UserLoginRequest, UserResponse
-from repositories.user import create_user, get_user_by_email, get_user_by_username
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from repositories.user import (
+    create_user,
+    deactivate_user,
+    get_user_by_email,
+    get_user_by_username,
+    update_password_hash,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-limiter = Limiter(key_func=get_remote_address)
-
 router = APIRouter()
 
 
-@router.post("/register", response_model=UserResponse)
-@limiter.limit("3/hour")
-async def register(
-    request: Request, user_data: UserCreateRequest, db: AsyncSession = Depends(get_db)
-):
+@router.post(
+    "/register",
+    response_model=UserResponse,
+    dependencies=[Depends(limiter.limit("3/hour"))],
+)
+async def register(user_data: UserCreateRequest, db: AsyncSession = Depends(get_db)):
     if await get_user_by_email(db, user_data.email):
         raise HTTPException(400, "Email already taken")
 
@@ -34,26 +37,22 @@ async def register(
     )
 
 
-@router.post("/login", response_model=Token)
-@limiter.limit("5/minute")
-async def login(
-    request: Request, credentials: UserLoginRequest, db: AsyncSession = Depends(get_db)
-):
+@router.post(
+    "/login", response_model=Token, dependencies=[Depends(limiter.limit("5/minute"))]
+)
+async def login(credentials: UserLoginRequest, db: AsyncSession = Depends(get_db)):
     user = await get_user_by_email(db, credentials.email)
-    dummy_hash = (
-        "$pbkdf2-sha256$29000$N2YMIWQsBWBMae09x1jrPQ$1t8iyB2A.WF/Z5JZv."
-        "lfCIhXXN33N23OSgQYThBYRfw"
-    )
 
-    if user:
-        is_valid = verify_password(credentials.password, user.password_hash)
-    else:
-        verify_password(credentials.password, dummy_hash)
-        is_valid = False
+    is_valid, new_hash = await verify_and_update_password(
+        credentials.password, user.password_hash if user else None
+    )
 
     if not is_valid or not user:
         raise HTTPException(401, "Invalid email or password")
 
+    if new_hash:
+        await update_password_hash(db, user, new_hash)
+
     if not user.is_active:
         raise HTTPException(400, "Account Deactivated")
 
@@ -63,5 +62,15 @@ async def login(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
     return current_user
+
+
+@router.delete("/me")
+async def deactivate_current_user(
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Деактивировать свой аккаунт"""
+    await deactivate_user(db, current_user.id)
+    return {"message": "Account deactivated"}
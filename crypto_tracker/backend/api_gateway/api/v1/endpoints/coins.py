@@ -0,0 +1,21 @@
+from typing import List
+
+from fastapi import APIRouter, Query, Response
+from models.schemas import CoinResponse
+from services.coin_registry import coin_registry
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=List[CoinResponse])
+async def search_coins(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Автодополнение символа: монеты с префиксом символа или названия.
+    Поиск идет по индексу в памяти, без обращения к БД и провайдеру
+    """
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return [coin._asdict() for coin in coin_registry.search(q, limit)]
@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 
-from .endpoints import assets, auth
+from .endpoints import admin, assets, auth, coins
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["Auth"])
 api_router.include_router(assets.router, prefix="/assets", tags=["Assets"])
+api_router.include_router(coins.router, prefix="/coins", tags=["Coins"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
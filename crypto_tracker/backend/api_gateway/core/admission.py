@@ -0,0 +1,117 @@
+import json
+import re
+import time
+
+from core.config import settings
+from core.database import pool_stats, statement_deadline
+from core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_SHED
+from core.query_stats import request_scope
+
+# Дорогие эндпоинты (история, расчеты, выгрузки) — первыми под нагрузкой
+HEAVY_PATH = re.compile(
+    r"^/api/v1/assets/(export|correlation|backtest|[^/]+/(history|export|indicators))$"
+)
+# Служебные пути и долгие потоки (не держат соединение с БД) не отбрасываются
+EXEMPT_PATHS = {"/health", "/ready", "/metrics", "/api/v1/assets/stream"}
+
+LIGHT = "light"
+HEAVY = "heavy"
+
+
+def classify(path: str) -> str:
+    return HEAVY if HEAVY_PATH.match(path) else LIGHT
+
+
+class AdmissionStats:
+    def __init__(self):
+        self.in_flight = {LIGHT: 0, HEAVY: 0}
+        self.admitted = {LIGHT: 0, HEAVY: 0}
+        self.shed = {LIGHT: 0, HEAVY: 0}
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": dict(self.in_flight),
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+        }
+
+
+admission_stats = AdmissionStats()
+
+for _request_class in (LIGHT, HEAVY):
+    ADMISSION_IN_FLIGHT.labels(_request_class).set_function(
+        lambda request_class=_request_class: admission_stats.in_flight[request_class]
+    )
+
+
+class AdmissionControlMiddleware:
+    """
+    Контроль нагрузки на входе в API.
+
+    Считает запросы в обработке и очередь за соединениями пула.
+    Если ресурсов не хватает — сразу отвечает 503 с Retry-After,
+    вместо того чтобы ждать pool_timeout. Дорогие запросы (история,
+    выгрузки) отбрасываются первыми: уже при появлении очереди к пулу.
+    Каждому запросу выставляется крайний срок для SQL-запросов
+    и запоминается scope — для статистики запросов по маршрутам.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        request_class = classify(scope["path"])
+        if self._should_shed(request_class):
+            admission_stats.shed[request_class] += 1
+            ADMISSION_SHED.labels(request_class).inc()
+            await self._reject(send)
+            return
+
+        deadline_ms = (
+            settings.HEAVY_REQUEST_DEADLINE_MS
+            if request_class == HEAVY
+            else settings.REQUEST_DEADLINE_MS
+        )
+        token = statement_deadline.set(time.monotonic() + deadline_ms / 1000)
+        scope_token = request_scope.set(scope)
+        admission_stats.admitted[request_class] += 1
+        admission_stats.in_flight[request_class] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_stats.in_flight[request_class] -= 1
+            statement_deadline.reset(token)
+            request_scope.reset(scope_token)
+
+    def _should_shed(self, request_class: str) -> bool:
+        in_flight = admission_stats.in_flight
+        if in_flight[LIGHT] + in_flight[HEAVY] >= settings.ADMISSION_MAX_IN_FLIGHT:
+            return True
+        if pool_stats.waiting >= settings.ADMISSION_MAX_POOL_WAITERS:
+            return True
+        if request_class == HEAVY:
+            return (
+                in_flight[HEAVY] >= settings.ADMISSION_HEAVY_MAX_IN_FLIGHT
+                or pool_stats.waiting >= settings.ADMISSION_HEAVY_MAX_POOL_WAITERS
+            )
+        return False
+
+    @staticmethod
+    async def _reject(send):
+        body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(settings.ADMISSION_RETRY_AFTER).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
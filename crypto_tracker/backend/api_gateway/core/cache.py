@@ -0,0 +1,229 @@
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+from core.config import settings
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger("cache_api_getaway")
+
+# Ключи, которые пишет worker после каждого тика
+PRICES_TICK_KEY = "prices:tick"  # Глобальный номер тика
+PRICES_TICK_AT_KEY = "prices:tick_at"  # Время последнего тика, Unix
+PRICES_SEQ_KEY = "prices:seq"  # Номер тика по каждому символу
+PRICES_LATEST_KEY = "prices:latest"  # Последняя цена по каждому символу, USD
+PRICES_FX_KEY = "prices:fx"  # Единиц валюты котировки за 1 USD
+PRICES_CHANNEL = "prices:ticks"  # Pub/Sub: тик с ценами и контекстом трассы
+
+BASE_QUOTE = "USD"
+
+
+def price_key(symbol: str, quote: str) -> str:
+    """Ключ цены в тике: "BTC" для USD, "BTC/EUR" для других котировок"""
+    return symbol if quote == BASE_QUOTE else f"{symbol}/{quote}"
+
+
+_redis: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """
+    Ленивое создание клиента Redis.
+    Если REDIS_URL пустой — кэширование отключено и возвращается None.
+    """
+    global _redis
+    if not settings.REDIS_URL:
+        return None
+    if _redis is None:
+        _redis = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+        )
+    return _redis
+
+
+def user_version_key(user_id: int) -> str:
+    return f"user:{user_id}:version"
+
+
+def user_written_key(user_id: int) -> str:
+    """Есть, пока не прошло READ_YOUR_WRITES_WINDOW после записи пользователя"""
+    return f"user:{user_id}:written"
+
+
+async def user_wrote_recently(user_id: int) -> bool:
+    """
+    Пользователь писал меньше READ_YOUR_WRITES_WINDOW назад — в любом
+    процессе gateway. Без Redis — False: остается окно своего процесса
+    """
+    redis = get_redis()
+    if redis is None:
+        return False
+    try:
+        return bool(await redis.exists(user_written_key(user_id)))
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, skip write marker: {e}")
+        return False
+
+
+async def get_data_versions(user_id: int) -> Optional[Tuple[str, str, bool]]:
+    """
+    Версия данных пользователя, номер последнего тика worker'а и флаг
+    "версия сменилась меньше READ_YOUR_WRITES_WINDOW назад" — реплика
+    может еще не видеть эти данные.
+    Один round-trip в Redis, без обращения к БД.
+    None — если Redis недоступен (тогда ETag не используется).
+    """
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        user_version, tick, tick_at, written = await redis.mget(
+            user_version_key(user_id),
+            PRICES_TICK_KEY,
+            PRICES_TICK_AT_KEY,
+            user_written_key(user_id),
+        )
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, skip versions: {e}")
+        return None
+    recent = written is not None or (
+        tick_at is not None
+        and time.time() - float(tick_at) < settings.READ_YOUR_WRITES_WINDOW
+    )
+    return user_version or "0", tick or "0", recent
+
+
+async def invalidate_user_data(user_id: int) -> None:
+    """
+    После изменения активов пользователя: новая версия данных (ETag),
+    отметка о недавней записи (для всех процессов gateway)
+    и удаление закэшированных списков активов
+    """
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(user_version_key(user_id))
+            if settings.READ_YOUR_WRITES_WINDOW > 0:
+                pipe.set(
+                    user_written_key(user_id), 1, ex=settings.READ_YOUR_WRITES_WINDOW
+                )
+            pipe.delete(*(asset_list_key(user_id, s) for s in ASSET_LIST_SCOPES))
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Failed to invalidate data for user {user_id}: {e}")
+
+
+# -------------Asset lists-------------------
+ASSET_LIST_SCOPES = ("active", "all")
+
+
+def asset_list_key(user_id: int, scope: str) -> str:
+    return f"assets:{user_id}:{scope}"
+
+
+async def get_cached_asset_list(
+    user_id: int, scope: str
+) -> Tuple[Optional[str], Optional[List[dict]]]:
+    """
+    Текущая версия данных пользователя и закэшированный список активов.
+    Запись действительна, только если построена на той же версии:
+    так список, прочитанный из БД до чужой записи, не переживет ее.
+    """
+    redis = get_redis()
+    if redis is None:
+        return None, None
+    try:
+        version, raw = await redis.mget(
+            user_version_key(user_id), asset_list_key(user_id, scope)
+        )
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, skip asset list cache: {e}")
+        return None, None
+
+    version = version or "0"
+    if raw:
+        cached = orjson.loads(raw)
+        if cached["version"] == version:
+            return version, cached["assets"]
+    return version, None
+
+
+async def set_cached_asset_list(
+    user_id: int, scope: str, version: str, assets: List[dict]
+) -> None:
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.set(
+            asset_list_key(user_id, scope),
+            orjson.dumps({"version": version, "assets": assets}),
+            ex=settings.ASSET_LIST_CACHE_TTL,
+        )
+    except RedisError as e:
+        logger.warning(f"Failed to cache asset list for user {user_id}: {e}")
+
+
+# -------------Prices-------------------
+async def get_latest_prices(
+    pairs: Iterable[Tuple[str, str]]
+) -> Dict[Tuple[str, str], float]:
+    """
+    Последние цены, опубликованные worker'ом: {(symbol, quote): price}.
+
+    В Redis цены только в USD плюс курсы котировок к USD: цена в другой
+    валюте считается здесь, без отдельного ключа и запроса к провайдеру
+    """
+    pairs = list(pairs)
+    redis = get_redis()
+    if redis is None or not pairs:
+        return {}
+    symbols = sorted({symbol for symbol, _ in pairs})
+    quotes = sorted({quote for _, quote in pairs if quote != BASE_QUOTE})
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(PRICES_LATEST_KEY, symbols)
+            if quotes:
+                pipe.hmget(PRICES_FX_KEY, quotes)
+            results = await pipe.execute()
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, skip latest prices: {e}")
+        return {}
+
+    usd = {s: float(p) for s, p in zip(symbols, results[0]) if p is not None}
+    fx = {BASE_QUOTE: 1.0}
+    if quotes:
+        fx.update((q, float(r)) for q, r in zip(quotes, results[1]) if r is not None)
+    return {
+        (symbol, quote): usd[symbol] * fx[quote]
+        for symbol, quote in pairs
+        if symbol in usd and quote in fx
+    }
+
+
+async def get_symbol_seqs(symbols: Sequence[str]) -> Optional[List[int]]:
+    """
+    Номера последних тиков символов (prices:seq): меняются, только когда
+    worker записал новые цены. None — если Redis недоступен
+    """
+    redis = get_redis()
+    if redis is None or not symbols:
+        return None
+    try:
+        seqs = await redis.hmget(PRICES_SEQ_KEY, list(symbols))
+    except RedisError as e:
+        logger.warning(f"Redis unavailable, skip tick sequence: {e}")
+        return None
+    return [int(seq or 0) for seq in seqs]
+
+
+async def get_symbol_seq(symbol: str) -> Optional[int]:
+    seqs = await get_symbol_seqs([symbol])
+    return seqs[0] if seqs is not None else None
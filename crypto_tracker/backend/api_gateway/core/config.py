@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 
 from pydantic_settings import BaseSettings
@@ -7,13 +8,95 @@ BACKEND_DIR = Path(__file__).parent.parent
 
 class Settings(BaseSettings):
     CRYPTO_API_KEY: str
+    COINGECKO_API_URL: str = "https://api.coingecko.com/api/v3"
     DATABASE_URL: str
+    DATABASE_REPLICA_URL: str = ""  # Реплика только для чтения (опционально)
+    READ_YOUR_WRITES_WINDOW: int = 5  # секунд чтения из primary после записи
     REDIS_URL: str = "redis://redis:6379/0"
     JWT_SECRET: str
     SECRET_KEY: str
     SENTRY_DSN: str
     DEBUG: bool = False
 
+    # Пул соединений и предел времени запросов к БД
+    DB_POOL_SIZE: int = 20
+    DB_POOL_TIMEOUT: int = 5  # секунд ожидания свободного соединения
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000  # statement_timeout в Postgres
+
+    # Прогрев перед приемом трафика (GET /ready)
+    READY_WARM_CONNECTIONS: int = 5  # соединений пула, открываемых заранее
+    READY_RETRY_DELAY: int = 2  # секунд между попытками прогрева
+
+    # Контроль нагрузки (middleware core/admission.py)
+    ADMISSION_MAX_IN_FLIGHT: int = 200
+    ADMISSION_HEAVY_MAX_IN_FLIGHT: int = 10
+    ADMISSION_MAX_POOL_WAITERS: int = 40
+    ADMISSION_HEAVY_MAX_POOL_WAITERS: int = 1
+    ADMISSION_RETRY_AFTER: int = 2  # секунд
+    REQUEST_DEADLINE_MS: int = 5_000
+    HEAVY_REQUEST_DEADLINE_MS: int = 30_000
+
+    # Статистика SQL-запросов по отпечаткам (GET /api/v1/admin/query-stats)
+    QUERY_STATS_ENABLED: bool = True
+    QUERY_STATS_SAMPLES: int = 1000  # замеров на отпечаток для перцентилей
+    QUERY_STATS_MAX_FINGERPRINTS: int = 500
+    SLOW_QUERY_MS: int = 200  # логировать запросы дольше, 0 — не логировать
+
+    # Профилирование отдельных запросов по подписанному токену (только staging)
+    PROFILING_ENABLED: bool = False
+    PROFILE_DIR: str = str(Path(tempfile.gettempdir()) / "crypto_tracker_profiles")
+    PROFILE_MAX_ARTIFACTS: int = 50
+
+    # Порт /metrics для Prometheus, 0 — отключить. Отдельный от API:
+    # метрики не публикуются наружу вместе с основным портом.
+    # Не METRICS_PORT: тот из общего .env занимает worker (9100)
+    API_METRICS_PORT: int = 9101
+
+    # Мониторинг event loop: задержка планирования и детектор блокировок
+    LOOP_MONITOR_INTERVAL: float = 0.5  # секунд между замерами
+    LOOP_BLOCK_THRESHOLD_MS: int = 100  # блокировка дольше — стек в лог
+    LOOP_BLOCK_DETECTOR: bool = False  # сторожевой поток (включен и при DEBUG)
+
+    # Трассировка OpenTelemetry: адрес OTLP/HTTP коллектора, пусто — отключена
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = ""
+    OTEL_SERVICE_NAME: str = "crypto-tracker-api"
+
+    # Поток цен (SSE): комментарий-пинг, если тиков нет дольше N секунд
+    STREAM_HEARTBEAT: int = 15
+
+    # Реестр монет провайдера (таблица coins, снимок на диске, поиск)
+    COIN_REGISTRY_SYNC_INTERVAL: int = 86_400  # секунд между загрузками, 0 — нет
+    COIN_REGISTRY_REFRESH: int = 300  # секунд между проверками таблицы
+    COIN_REGISTRY_SNAPSHOT: str = str(
+        Path(tempfile.gettempdir()) / "crypto_tracker_coins.json"
+    )
+
+    # Проверка порогов на истории (POST /api/v1/assets/backtest)
+    BACKTEST_MAX_DAYS: int = 365  # самый длинный период
+
+    # Кэш списков активов пользователя в Redis
+    ASSET_LIST_CACHE_TTL: int = 3600  # секунд
+
+    # Кэши расчетов по ценам в памяти процесса (ответов до следующего тика)
+    INDICATOR_CACHE_SIZE: int = 1000  # индикаторы по символам
+    CORRELATION_CACHE_SIZE: int = 1000  # матрицы корреляции по наборам символов
+
+    # Кэш аутентифицированных пользователей
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_TTL: int = 60  # секунд
+    PRINCIPAL_CACHE_REDIS: bool = False
+
+    # Хэширование паролей (PBKDF2-SHA256)
+    PASSWORD_HASH_ROUNDS: int = 29_000
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
+    # Ограничение частоты запросов (по умолчанию счетчики в REDIS_URL)
+    RATE_LIMIT_STORAGE_URI: str = ""
+    RATE_LIMIT_STRATEGY: str = "moving-window"
+    HISTORY_RATE_LIMIT: str = "120/minute"
+    EXPORT_RATE_LIMIT: str = "10/minute"
+
     class Config:
         env_file = BACKEND_DIR / ".env"
 
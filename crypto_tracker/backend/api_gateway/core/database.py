@@ -1,21 +1,294 @@
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from core.cache import user_wrote_recently
 from core.config import settings
+from core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT,
+    DB_POOL_WAITING,
+)
+from core.query_stats import record_query, start_query_timer
+from sqlalchemy import Select, event, exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 DATABASE_URL = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+DATABASE_REPLICA_URL = settings.DATABASE_REPLICA_URL.replace(
+    "postgresql://", "postgresql+asyncpg://"
+)
+
+# Крайний срок (time.monotonic) для SQL-запросов текущего HTTP-запроса.
+# Выставляется middleware контроля нагрузки.
+statement_deadline: ContextVar[Optional[float]] = ContextVar(
+    "statement_deadline", default=None
+)
+
+
+# Насколько statement_timeout транзакции может пережить крайний срок, прежде
+# чем его выставят заново: каждый SET LOCAL — лишний round-trip в Postgres
+STATEMENT_TIMEOUT_SLACK_MS = 100
+# Код ошибки Postgres: запрос отменен (в том числе по statement_timeout)
+QUERY_CANCELED = "57014"
+
+
+class StatementDeadlineExceeded(Exception):
+    """Бюджет времени запроса исчерпан — SQL-запрос не выполнен или отменен"""
+
+
+class PoolStats:
+    """
+    Ожидание соединения из пула: сколько ждут сейчас и сколько ждали
+    """
+
+    def __init__(self):
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.ewma_wait = 0.0
+
+    def record_wait(self, wait: float) -> None:
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.ewma_wait = 0.9 * self.ewma_wait + 0.1 * wait
+        DB_POOL_WAIT.observe(wait)
+
+    def stats(self) -> dict:
+        return {
+            "size": engine.pool.size(),
+            "checked_out": engine.pool.checkedout(),
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 2)
+            if self.checkouts
+            else 0.0,
+            "recent_wait_ms": round(self.ewma_wait * 1000, 2),
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+        }
+
+
+pool_stats = PoolStats()
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, который замеряет ожидание свободного соединения
+    """
+
+    def _do_get(self):
+        pool_stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.timeouts += 1
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            pool_stats.waiting -= 1
+            pool_stats.record_wait(time.perf_counter() - started)
+
+
+def make_engine(url: str):
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg://"):
+        # Жесткий предел на любой запрос на стороне Postgres
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+        }
+
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=0,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        connect_args=connect_args,
+    )
+
+
+engine = make_engine(DATABASE_URL)
+# Реплика только для чтения; без DATABASE_REPLICA_URL все идет в primary
+replica_engine = make_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+
+DB_POOL_WAITING.set_function(lambda: pool_stats.waiting)
+for name, pool_engine in (("primary", engine), ("replica", replica_engine)):
+    if pool_engine is not None:
+        DB_POOL_SIZE.labels(name).set_function(pool_engine.pool.size)
+        DB_POOL_CHECKED_OUT.labels(name).set_function(pool_engine.pool.checkedout)
+
+# user_id -> до какого момента (time.monotonic) читать только из primary.
+# Только записи этого процесса; записи других — отметка в Redis.
+# Окно у всех одной длины, поэтому записи идут в порядке истечения
+_recent_writes: Dict[int, float] = {}
+
+
+def use_primary(db: AsyncSession) -> None:
+    """
+    Все запросы сессии — в primary (для функций, которые читают и затем пишут)
+    """
+    db.info["primary"] = True
+
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=20,
-    max_overflow=0,
+def _in_write_window(user_id: Optional[int]) -> bool:
+    if user_id is None:
+        return False
+    until = _recent_writes.get(user_id)
+    if until is None:
+        return False
+    if until < time.monotonic():
+        del _recent_writes[user_id]
+        return False
+    return True
+
+
+async def route_user_reads(db: AsyncSession, user_id: int) -> None:
+    """
+    Сессия запроса пользователя: если он писал в последние
+    READ_YOUR_WRITES_WINDOW секунд — здесь или в другом процессе
+    (отметка user:{id}:written в Redis) — все запросы идут в primary
+    """
+    db.info["user_id"] = user_id
+    if (
+        replica_engine is not None
+        and not _in_write_window(user_id)
+        and await user_wrote_recently(user_id)
+    ):
+        use_primary(db)
+
+
+class RoutingSession(Session):
+    """
+    Маршрутизация запросов между primary и репликой.
+
+    SELECT идет в реплику, кроме случаев:
+    - сессия уже писала или помечена use_primary();
+    - пользователь сессии сам писал в последние READ_YOUR_WRITES_WINDOW секунд
+      в этом процессе (в других — см. route_user_reads).
+    Все изменения (flush, UPDATE/INSERT/DELETE) идут в primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            replica_engine is None
+            or self._flushing
+            or self.info.get("primary")
+            or not isinstance(clause, Select)
+            or _in_write_window(self.info.get("user_id"))
+        ):
+            return engine.sync_engine
+        return replica_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def mark_session_wrote(session, flush_context):
+    session.info["primary"] = True
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def mark_bulk_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        session = orm_execute_state.session
+        session.info["primary"] = True
+        session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def remember_user_write(session):
+    """
+    После записи пользователь какое-то время читает из primary,
+    чтобы не увидеть на реплике старые данные (read-your-writes)
+    """
+    if session.info.pop("wrote", False):
+        user_id = session.info.get("user_id")
+        if user_id is not None and settings.READ_YOUR_WRITES_WINDOW > 0:
+            now = time.monotonic()
+            # Повторная запись переносит пользователя в конец
+            _recent_writes.pop(user_id, None)
+            _recent_writes[user_id] = now + settings.READ_YOUR_WRITES_WINDOW
+            _prune_recent_writes(now)
+
+
+def _prune_recent_writes(now: float) -> None:
+    """Удалить истекшие окна: они в начале словаря, до первого действующего"""
+    while _recent_writes:
+        user_id, until = next(iter(_recent_writes.items()))
+        if until >= now:
+            return
+        del _recent_writes[user_id]
+
+
+async_session = sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
 )
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
 
+def check_statement_deadline(conn, cursor, statement, parameters, context, many):
+    """
+    Не отправляем в БД новые запросы, если бюджет HTTP-запроса исчерпан.
+
+    В Postgres уже отправленный запрос тоже ограничен остатком бюджета:
+    SET LOCAL statement_timeout действует до конца транзакции, и сервер
+    сам отменяет запрос по сроку. Повторно таймаут выставляется, только
+    когда прежний пережил бы срок больше чем на STATEMENT_TIMEOUT_SLACK_MS
+    """
+    deadline = statement_deadline.get()
+    if deadline is None:
+        return
+    remaining_ms = int((deadline - time.monotonic()) * 1000)
+    if remaining_ms <= 0:
+        raise StatementDeadlineExceeded("Request deadline exceeded")
+    if conn.dialect.name != "postgresql":
+        return
+
+    applied_ms = conn.info.get("statement_timeout_ms")
+    if applied_ms is None or applied_ms > remaining_ms + STATEMENT_TIMEOUT_SLACK_MS:
+        # set_config(..., true) — это SET LOCAL, но с параметром:
+        # одно подготовленное выражение на соединение для любых значений
+        cursor.execute(
+            "SELECT set_config('statement_timeout', $1, true)", (str(remaining_ms),)
+        )
+        conn.info["statement_timeout_ms"] = remaining_ms
+
+
+def reset_statement_timeout(conn):
+    """SET LOCAL закончился вместе с транзакцией"""
+    conn.info.pop("statement_timeout_ms", None)
+
+
+def translate_statement_timeout(context):
+    """Отмена по statement_timeout из бюджета запроса — как исчерпанный бюджет"""
+    sqlstate = getattr(context.original_exception, "sqlstate", None)
+    if sqlstate == QUERY_CANCELED and statement_deadline.get() is not None:
+        return StatementDeadlineExceeded("Request deadline exceeded")
+
+
+for _engine in filter(None, (engine, replica_engine)):
+    event.listen(_engine.sync_engine, "before_cursor_execute", check_statement_deadline)
+    event.listen(_engine.sync_engine, "commit", reset_statement_timeout)
+    event.listen(_engine.sync_engine, "rollback", reset_statement_timeout)
+    event.listen(_engine.sync_engine, "handle_error", translate_statement_timeout)
+    if settings.QUERY_STATS_ENABLED:
+        event.listen(_engine.sync_engine, "before_cursor_execute", start_query_timer)
+        event.listen(_engine.sync_engine, "after_cursor_execute", record_query)
+
+
 async def get_db():
     """
     Получение сессии БД
@@ -31,13 +304,5 @@ async def get_db():
             await session.close()
 
 
-async def create_tables():
-    """
-    Создает все таблицы в базе данных
-    """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
-
 def get_async_session():
     return async_session()
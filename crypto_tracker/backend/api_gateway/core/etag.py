@@ -0,0 +1,76 @@
+import hashlib
+from typing import Optional
+
+from core.cache import get_data_versions
+from core.database import get_db, use_primary
+from core.metrics import cache_result
+from core.security import get_current_user
+from fastapi import Depends, HTTPException, Request, Response, status
+from models.schemas import UserResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def make_etag(*parts) -> str:
+    """
+    Сильный ETag из набора версий
+    """
+    raw = "|".join(str(part) for part in parts)
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match (список тегов или "*")
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    current_user: UserResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> Optional[str]:
+    """
+    ETag для чтения данных пользователя.
+
+    Строится из версии данных пользователя и номера тика worker'а,
+    поэтому вычисляется без запроса в БД. Пользователь — из кэша
+    принципалов: удаленный или деактивированный получает 401, а не 304.
+    При совпадении с If-None-Match сразу отвечаем 304 — до сериализации ответа.
+
+    Если версия сменилась в окне read-your-writes, сессия читает из primary:
+    ответ с отстающей реплики получил бы новый ETag и остался бы у клиента.
+    """
+    versions = await get_data_versions(current_user.id)
+    if versions is None:
+        return None
+
+    user_version, tick, recent = versions
+    if recent:
+        use_primary(db)
+    etag = make_etag(
+        current_user.id,
+        request.url.path,
+        request.url.query,
+        request.headers.get("accept", ""),
+        user_version,
+        tick,
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept"}
+
+    not_modified = etag_matches(request.headers.get("if-none-match"), etag)
+    cache_result("etag", not_modified)
+    if not_modified:
+        raise HTTPException(status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return etag
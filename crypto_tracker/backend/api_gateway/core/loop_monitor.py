@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, Optional
+
+from core.config import settings
+from core.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG
+
+logger = logging.getLogger("loop_monitor")
+
+
+class LoopMonitor:
+    """
+    Задержка планирования event loop и детектор блокирующих вызовов.
+
+    Корутина засыпает на interval и замеряет, насколько позже проснулась:
+    все это время loop был занят другим кодом. Детектор (режим отладки) —
+    сторожевой поток: если корутина не отмечалась дольше interval +
+    block_threshold, loop чем-то заблокирован, и в лог пишется текущий
+    стек его потока, то есть сам блокирующий вызов.
+    """
+
+    def __init__(self, interval: float, block_threshold_ms: int, detect_blocking: bool):
+        self.interval = interval
+        self.block_threshold = block_threshold_ms / 1000
+        self.detect_blocking = detect_blocking
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocks = 0
+        self.recent_blocks: Deque[dict] = deque(maxlen=10)
+        self._heartbeat = time.perf_counter()
+        self._reported_heartbeat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Запуск из работающего event loop"""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.perf_counter()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        if self.detect_blocking:
+            threading.Thread(
+                target=self._watch, name="loop-watchdog", daemon=True
+            ).start()
+        logger.info(
+            f"Event loop monitor started (interval {self.interval}s, "
+            f"blocking detector {'on' if self.detect_blocking else 'off'})"
+        )
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            self._heartbeat = started
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            EVENT_LOOP_LAG.observe(lag)
+
+    def _watch(self) -> None:
+        check_every = max(0.01, self.block_threshold / 2)
+        while not self._stopped.wait(check_every):
+            heartbeat = self._heartbeat
+            blocked_for = time.perf_counter() - heartbeat - self.interval
+            # Один отчет на одну блокировку
+            if (
+                blocked_for < self.block_threshold
+                or heartbeat == self._reported_heartbeat
+            ):
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._reported_heartbeat = heartbeat
+            self._report(blocked_for, "".join(traceback.format_stack(frame)))
+
+    def _report(self, blocked_for: float, stack: str) -> None:
+        self.blocks += 1
+        EVENT_LOOP_BLOCKS.inc()
+        self.recent_blocks.append(
+            {
+                "at": time.time(),
+                "blocked_ms": round(blocked_for * 1000, 1),
+                "stack": stack,
+            }
+        )
+        logger.warning(
+            f"Event loop blocked for {blocked_for * 1000:.0f} ms "
+            f"(still running), stack of the loop thread:\n{stack}"
+        )
+
+    def stats(self) -> dict:
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "blocking_detector": self.detect_blocking,
+            "blocks": self.blocks,
+        }
+
+
+loop_monitor = LoopMonitor(
+    interval=settings.LOOP_MONITOR_INTERVAL,
+    block_threshold_ms=settings.LOOP_BLOCK_THRESHOLD_MS,
+    detect_blocking=settings.DEBUG or settings.LOOP_BLOCK_DETECTOR,
+)
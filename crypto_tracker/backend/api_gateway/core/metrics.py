@@ -0,0 +1,122 @@
+import logging
+import time
+from typing import Optional
+from wsgiref.simple_server import WSGIServer
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+logger = logging.getLogger("metrics")
+
+# -------------HTTP-------------------
+REQUEST_LATENCY = Histogram(
+    "gateway_http_request_duration_seconds",
+    "Время обработки HTTP-запроса",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# -------------Event loop-------------------
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Задержка планирования event loop (насколько позже проснулась корутина)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total", "Блокировки event loop дольше LOOP_BLOCK_THRESHOLD_MS"
+)
+
+# -------------DB pool-------------------
+DB_POOL_SIZE = Gauge("db_pool_size", "Размер пула соединений", ["engine"])
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Соединения, выданные из пула", ["engine"]
+)
+DB_POOL_WAITING = Gauge("db_pool_waiting", "Ожидающие соединение из пула")
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Ожидание соединения из пула",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Соединение не получено за pool_timeout"
+)
+
+# -------------Admission-------------------
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Запросы в обработке", ["request_class"]
+)
+ADMISSION_SHED = Counter(
+    "admission_shed_total", "Запросы, отброшенные с 503", ["request_class"]
+)
+
+# -------------Price provider-------------------
+PROVIDER_LATENCY = Histogram(
+    "price_provider_request_duration_seconds",
+    "Время запроса к провайдеру цен",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PROVIDER_REQUESTS = Counter(
+    "price_provider_requests_total",
+    "Запросы к провайдеру цен по результату (ok, http_error, invalid, exception)",
+    ["outcome"],
+)
+
+# -------------Caches-------------------
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Обращения к кэшам (principal, asset_list, etag) по результату hit/miss",
+    ["cache", "result"],
+)
+
+
+def cache_result(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class PrometheusMiddleware:
+    """
+    Гистограмма времени ответа по шаблону маршрута (/api/v1/assets/{asset_id}),
+    а не по фактическому пути — иначе число рядов растет с числом активов.
+    Запросы без маршрута (404, отброшенные 503) попадают в route="unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status_code),
+            ).observe(time.perf_counter() - started)
+
+
+def start_metrics_server(port: int) -> Optional[WSGIServer]:
+    """
+    /metrics на отдельном порту. Если порт занят (второй процесс
+    uvicorn --workers или другой сервис) — старт не падает, метрики
+    этого процесса не отдаются; None
+    """
+    try:
+        server, _ = start_http_server(port)
+    except OSError as e:
+        logger.warning(f"Metrics port {port} unavailable, /metrics disabled: {e}")
+        return None
+    logger.info(f"Metrics available on port {port}")
+    return server
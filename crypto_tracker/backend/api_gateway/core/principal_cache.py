@@ -0,0 +1,192 @@
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from core.cache import get_redis
+from core.config import settings
+from core.metrics import cache_result
+from models.schemas import UserResponse
+from redis.exceptions import RedisError, WatchError
+
+logger = logging.getLogger("principal_cache")
+
+# Поле hash principal:{user_id}: случайная метка последнего сброса
+GENERATION_FIELD = "generation"
+
+# Версия записей пользователя: счетчик сбросов процесса и метка в Redis
+Generation = Tuple[int, Optional[str]]
+
+
+def principal_key(user_id: int) -> str:
+    return f"principal:{user_id}"
+
+
+class PrincipalCache:
+    """
+    Кэш аутентифицированных пользователей, ключ — (user_id, iat токена).
+
+    Первый уровень — ограниченный LRU с TTL в памяти процесса,
+    второй (опционально) — Redis: hash principal:{user_id} с полями по iat.
+    Сброс по пользователю удаляет обе записи; в других процессах
+    локальная запись живет не дольше TTL.
+
+    Запрос, который прочитал пользователя из БД до сброса, не должен
+    вернуть в кэш старую запись: версия (generation()) берется до чтения
+    из БД, и set() ничего не пишет, если с тех пор был сброс. В процессе
+    это общий счетчик сбросов (лишний промах после любого сброса вместо
+    счетчика на каждого пользователя), в Redis — метка в hash пользователя.
+    """
+
+    def __init__(self, max_size: int, ttl: int, use_redis: bool):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.use_redis = use_redis
+        self._entries: OrderedDict = OrderedDict()  # (user_id, iat) -> (срок, user)
+        self._iats: Dict[int, Set[int]] = {}
+        self._generation = 0
+        self.hits_local = 0
+        self.hits_redis = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    async def get(self, user_id: int, iat: int) -> Optional[UserResponse]:
+        key = (user_id, iat)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits_local += 1
+                cache_result("principal", True)
+                return principal
+            self._drop(key)
+
+        generation = self._generation
+        principal = await self._get_redis(user_id, iat)
+        if principal is not None:
+            self.hits_redis += 1
+            cache_result("principal", True)
+            # Пока ждали Redis, пользователя могли сбросить
+            if generation == self._generation:
+                self._put_local(key, principal)
+            return principal
+
+        self.misses += 1
+        cache_result("principal", False)
+        return None
+
+    async def generation(self, user_id: int) -> Generation:
+        """
+        Версия записей пользователя — взять до чтения из БД и передать в set()
+        """
+        redis = get_redis() if self.use_redis else None
+        if redis is None:
+            return self._generation, None
+        try:
+            return self._generation, await redis.hget(
+                principal_key(user_id), GENERATION_FIELD
+            )
+        except RedisError as e:
+            logger.warning(f"Redis unavailable, skip principal cache: {e}")
+            return self._generation, None
+
+    async def set(
+        self, user_id: int, iat: int, principal: UserResponse, generation: Generation
+    ) -> None:
+        """
+        Запомнить пользователя, если с generation() его записи не сбрасывали
+        """
+        local_generation, redis_generation = generation
+        if local_generation != self._generation:
+            return
+
+        redis = get_redis() if self.use_redis else None
+        if redis is not None:
+            key = principal_key(user_id)
+            try:
+                async with redis.pipeline(transaction=True) as pipe:
+                    # Сброс в другом процессе между generation() и записью
+                    await pipe.watch(key)
+                    if await pipe.hget(key, GENERATION_FIELD) != redis_generation:
+                        return
+                    pipe.multi()
+                    pipe.hset(key, str(iat), principal.model_dump_json())
+                    pipe.expire(key, self.ttl)
+                    await pipe.execute()
+            except WatchError:
+                return
+            except RedisError as e:
+                logger.warning(f"Failed to store principal {user_id} in Redis: {e}")
+            if local_generation != self._generation:
+                return
+        self._put_local((user_id, iat), principal)
+
+    async def invalidate(self, user_id: int) -> None:
+        """
+        Сбросить все записи пользователя (например, после деактивации)
+        """
+        self.invalidations += 1
+        self._generation += 1
+        for iat in list(self._iats.get(user_id, ())):
+            self._drop((user_id, iat))
+
+        redis = get_redis() if self.use_redis else None
+        if redis is None:
+            return
+        key = principal_key(user_id)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, GENERATION_FIELD, uuid.uuid4().hex)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Failed to invalidate principal {user_id} in Redis: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits_local + self.hits_redis + self.misses
+        hits = self.hits_local + self.hits_redis
+        return {
+            "size": len(self._entries),
+            "hits_local": self.hits_local,
+            "hits_redis": self.hits_redis,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    async def _get_redis(self, user_id: int, iat: int) -> Optional[UserResponse]:
+        redis = get_redis() if self.use_redis else None
+        if redis is None:
+            return None
+        try:
+            raw = await redis.hget(principal_key(user_id), str(iat))
+        except RedisError as e:
+            logger.warning(f"Redis unavailable, skip principal cache: {e}")
+            return None
+        return UserResponse.model_validate_json(raw) if raw else None
+
+    def _put_local(self, key: Tuple[int, int], principal: UserResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(key)
+        self._iats.setdefault(key[0], set()).add(key[1])
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+
+    def _drop(self, key: Tuple[int, int]) -> None:
+        self._entries.pop(key, None)
+        iats = self._iats.get(key[0])
+        if iats is not None:
+            iats.discard(key[1])
+            if not iats:
+                del self._iats[key[0]]
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    use_redis=settings.PRINCIPAL_CACHE_REDIS,
+)
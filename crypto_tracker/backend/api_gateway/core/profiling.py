@@ -0,0 +1,146 @@
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import io
+import logging
+import os
+import pstats
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+from core.config import settings
+
+logger = logging.getLogger("profiling")
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ID = re.compile(r"^\d+-[0-9a-f]{8}$")
+
+
+def _sign(expires: int) -> str:
+    return hmac.new(
+        settings.SECRET_KEY.encode(), f"profile:{expires}".encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def make_profile_token(ttl: int = 600) -> str:
+    """
+    Токен для профилирования запроса: "<expires>.<hmac>", действует ttl секунд.
+    Передается в заголовке X-Profile или параметре ?profile=
+    """
+    expires = int(time.time()) + ttl
+    return f"{expires}.{_sign(expires)}"
+
+
+def verify_profile_token(token: str) -> bool:
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _sign(int(expires)))
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = Path(settings.PROFILE_DIR) / f"{profile_id}.prof"
+    return path if path.exists() else None
+
+
+def list_profiles() -> List[dict]:
+    directory = Path(settings.PROFILE_DIR)
+    if not directory.exists():
+        return []
+    profiles = sorted(directory.glob("*.prof"), key=os.path.getmtime, reverse=True)
+    return [
+        {"id": path.stem, "size": path.stat().st_size, "created": path.stat().st_mtime}
+        for path in profiles
+    ]
+
+
+def profile_text(path: Path, sort: str = "cumulative", limit: int = 50) -> str:
+    """Текстовый отчет pstats: limit самых дорогих функций"""
+    stream = io.StringIO()
+    pstats.Stats(str(path), stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+def _cleanup(directory: Path) -> None:
+    profiles = sorted(directory.glob("*.prof"), key=os.path.getmtime)
+    for path in profiles[: -settings.PROFILE_MAX_ARTIFACTS]:
+        path.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование одного запроса через cProfile по подписанному токену.
+
+    Только для отладки и staging: подключается при PROFILING_ENABLED.
+    Профиль сохраняется в PROFILE_DIR как .prof (pstats, открывается
+    snakeviz / flameprof), id возвращается в заголовке X-Profile-Id.
+    cProfile видит весь поток, поэтому в профиль попадают и запросы,
+    которые event loop выполнял параллельно; одновременно профилируется
+    только один запрос.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if self._active:
+            await self.app(scope, receive, self._with_header(send, b"busy"))
+            return
+
+        profile_id = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        profiler = cProfile.Profile()
+        self._active = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, self._with_header(send, profile_id.encode()))
+        finally:
+            profiler.disable()
+            self._active = False
+            # Запись профиля и удаление старых — файловый I/O, не в event loop
+            await asyncio.to_thread(self._save, profiler, profile_id, scope)
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        token = None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER.encode():
+                token = value.decode("latin-1")
+                break
+        if token is None and scope.get("query_string"):
+            values = parse_qs(scope["query_string"].decode("latin-1")).get(
+                PROFILE_QUERY_PARAM
+            )
+            token = values[0] if values else None
+        return token is not None and verify_profile_token(token)
+
+    @staticmethod
+    def _with_header(send, value: bytes):
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", value))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        return send_wrapper
+
+    @staticmethod
+    def _save(profiler: cProfile.Profile, profile_id: str, scope) -> None:
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(directory / f"{profile_id}.prof"))
+        _cleanup(directory)
+        logger.info(f"Profile {profile_id} saved for {scope['method']} {scope['path']}")
@@ -0,0 +1,164 @@
+import hashlib
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger("query_stats")
+
+# ASGI scope текущего HTTP-запроса. Маршрут (scope["route"]) появляется
+# в нем после роутинга, поэтому читается в момент выполнения запроса в БД.
+request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PARAMS = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+# Отпечатки сверх лимита складываются в одну запись
+OVERFLOW_FINGERPRINT = "overflow"
+
+
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """
+    Нормализованный текст запроса и короткий хэш от него:
+    литералы и параметры заменяются на ?, списки (?, ?, ...) — на (?+).
+    Запросы, отличающиеся только значениями, получают один отпечаток.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRINGS.sub("?", normalized)
+    normalized = _PARAMS.sub("?", normalized)
+    normalized = _NUMBERS.sub("?", normalized)
+    normalized = _VALUE_LISTS.sub("(?+)", normalized)
+    digest = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+    return digest, normalized
+
+
+def current_route() -> str:
+    scope = request_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    index = min(len(sorted_samples) - 1, int(q * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+class FingerprintStats:
+    def __init__(self, statement: str, max_samples: int):
+        self.statement = statement
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+        self.routes: Counter = Counter()
+
+    def record(self, duration: float, route: str) -> None:
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.samples.append(duration)
+        self.routes[route] += 1
+
+    def as_dict(self, digest: str) -> dict:
+        samples = sorted(self.samples)
+        return {
+            "fingerprint": digest,
+            "statement": self.statement,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 2),
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+            "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "routes": dict(self.routes.most_common(5)),
+        }
+
+
+class QueryStats:
+    """
+    Время SQL-запросов по отпечаткам: количество, сумма и перцентили.
+
+    Перцентили считаются по последним max_samples замерам отпечатка,
+    число отпечатков ограничено max_fingerprints. Запросы дольше
+    slow_ms логируются вместе с маршрутом, который их выполнил.
+    """
+
+    def __init__(self, slow_ms: int, max_samples: int, max_fingerprints: int):
+        self.slow = slow_ms / 1000
+        self.max_samples = max_samples
+        self.max_fingerprints = max_fingerprints
+        self._stats: Dict[str, FingerprintStats] = {}
+        self._digests: Dict[str, Tuple[str, str]] = {}  # текст -> отпечаток
+        self.started_at = time.time()
+
+    def record(self, statement: str, duration: float) -> None:
+        digest, normalized = self._fingerprint(statement)
+        route = current_route()
+
+        stats = self._stats.get(digest)
+        if stats is None:
+            if len(self._stats) >= self.max_fingerprints:
+                digest, normalized = OVERFLOW_FINGERPRINT, OVERFLOW_FINGERPRINT
+                stats = self._stats.get(digest)
+            if stats is None:
+                stats = self._stats[digest] = FingerprintStats(
+                    normalized, self.max_samples
+                )
+        stats.record(duration, route)
+
+        if self.slow and duration >= self.slow:
+            logger.warning(
+                f"Slow query {duration * 1000:.1f} ms route={route} "
+                f"fingerprint={digest}: {normalized}"
+            )
+
+    def stats(self, order_by: str = "total_ms", limit: int = 50) -> dict:
+        items = [stats.as_dict(digest) for digest, stats in self._stats.items()]
+        items.sort(key=lambda item: item[order_by], reverse=True)
+        return {
+            "since": self.started_at,
+            "fingerprints": len(items),
+            "statements": sum(item["count"] for item in items),
+            "queries": items[:limit],
+        }
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self.started_at = time.time()
+
+    def _fingerprint(self, statement: str) -> Tuple[str, str]:
+        # Тексты запросов ORM повторяются, регулярки — только на новый текст
+        cached = self._digests.get(statement)
+        if cached is None:
+            if len(self._digests) >= self.max_fingerprints * 4:
+                self._digests.clear()
+            cached = self._digests[statement] = fingerprint(statement)
+        return cached
+
+
+query_stats = QueryStats(
+    slow_ms=settings.SLOW_QUERY_MS,
+    max_samples=settings.QUERY_STATS_SAMPLES,
+    max_fingerprints=settings.QUERY_STATS_MAX_FINGERPRINTS,
+)
+
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        query_stats.record(statement, time.perf_counter() - started)
@@ -0,0 +1,113 @@
+import logging
+import time
+from typing import Callable, Optional
+
+import jwt
+from core.config import settings
+from core.security import decode_token
+from fastapi import HTTPException, Request
+from limits import RateLimitItem, parse
+from limits.aio.storage import MemoryStorage
+from limits.aio.strategies import STRATEGIES
+from limits.storage import storage_from_string
+
+logger = logging.getLogger("rate_limit")
+
+# Сколько секунд считать в памяти процесса после ошибки хранилища
+FALLBACK_RETRY = 30
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "127.0.0.1"
+
+
+def user_or_ip_key(request: Request) -> str:
+    """
+    Ключ лимита по пользователю из JWT (без запроса в БД),
+    для запросов без валидного токена — по IP
+    """
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            return f"user:{decode_token(token)['sub']}"
+        except jwt.InvalidTokenError:
+            pass
+    return f"ip:{client_ip(request)}"
+
+
+def ip_key(request: Request) -> str:
+    return f"ip:{client_ip(request)}"
+
+
+def async_storage_uri(uri: str) -> str:
+    """URI хранилища limits.aio: redis:// -> async+redis://"""
+    if not uri:
+        return "async+memory://"
+    return uri if uri.startswith("async+") else f"async+{uri}"
+
+
+class RateLimiter:
+    """
+    Лимиты запросов как зависимости FastAPI на асинхронном хранилище limits.aio:
+    проверка в Redis не блокирует event loop.
+
+    Счетчики в Redis общие для всех воркеров uvicorn и реплик и переживают
+    рестарт; moving-window выполняется атомарными Lua-скриптами.
+    Если хранилище недоступно — FALLBACK_RETRY секунд считаем в памяти процесса.
+    """
+
+    def __init__(self, storage_uri: str, strategy: str, key_prefix: str):
+        self.enabled = True
+        self.key_prefix = key_prefix
+        self._strategy = STRATEGIES[strategy]
+        self._limiter = self._strategy(
+            storage_from_string(storage_uri, implementation="redispy")
+            if storage_uri.startswith("async+redis")
+            else storage_from_string(storage_uri)
+        )
+        self._fallback = self._strategy(MemoryStorage())
+        self._fallback_until = 0.0
+
+    def limit(
+        self,
+        limit_value: str,
+        key_func: Callable[[Request], str] = ip_key,
+        scope: Optional[str] = None,
+    ):
+        """
+        Зависимость: 429, если лимит limit_value исчерпан.
+        Лимит считается на эндпоинт, а не на конкретный URL (иначе
+        /assets/1/history и /assets/2/history считались бы раздельно);
+        эндпоинты с общим scope делят один счетчик.
+        """
+        item = parse(limit_value)
+
+        async def check_rate_limit(request: Request) -> None:
+            if not self.enabled:
+                return
+            endpoint = scope or request.scope["endpoint"].__name__
+            if not await self.hit(item, key_func(request), endpoint):
+                raise HTTPException(
+                    status_code=429,
+                    detail=f"Rate limit exceeded: {item}",
+                    headers={"Retry-After": str(item.get_expiry())},
+                )
+
+        return check_rate_limit
+
+    async def hit(self, item: RateLimitItem, key: str, scope: str) -> bool:
+        if time.monotonic() >= self._fallback_until:
+            try:
+                return await self._limiter.hit(item, self.key_prefix, key, scope)
+            except Exception as e:
+                logger.warning(f"Rate limit storage unavailable, use memory: {e}")
+                self._fallback_until = time.monotonic() + FALLBACK_RETRY
+        return await self._fallback.hit(item, self.key_prefix, key, scope)
+
+
+limiter = RateLimiter(
+    async_storage_uri(settings.RATE_LIMIT_STORAGE_URI or settings.REDIS_URL),
+    strategy=settings.RATE_LIMIT_STRATEGY,
+    key_prefix="ratelimit",
+)
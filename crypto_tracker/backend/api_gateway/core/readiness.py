@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from core.cache import get_redis
+from core.config import settings
+from core.database import engine, replica_engine
+from models.database import User
+from redis.exceptions import RedisError
+from services.coin_registry import coin_registry
+from services.price_service import get_http_session
+from sqlalchemy import select
+from sqlalchemy.orm import configure_mappers
+
+logger = logging.getLogger("readiness")
+
+
+class CoinRegistryNotLoaded(Exception):
+    """Реестр монет еще не загружен: символы проверялись бы по SEED_COINS"""
+
+
+class Readiness:
+    """
+    Готовность принимать трафик (GET /ready).
+
+    После старта фоном прогреваются конфигурация ORM, пул соединений
+    с БД (primary и реплика), HTTP-клиент провайдера цен и Redis,
+    и ожидается первая загрузка реестра монет (по нему проверяются символы).
+    Пока прогрев не прошел, /ready отвечает 503. Если БД еще недоступна,
+    миграции не применены или реестр не загружен, прогрев повторяется
+    через retry_delay. Redis необязателен: его недоступность отмечается,
+    но не блокирует.
+    """
+
+    def __init__(self, warm_connections: int, retry_delay: float):
+        self.warm_connections = warm_connections
+        self.retry_delay = retry_delay
+        self.ready = False
+        self.checks: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.warmed_in_ms: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        self.ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while not self.ready:
+            try:
+                await self.warm_up()
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Warm-up failed, retry in {self.retry_delay}s: {e}")
+                await asyncio.sleep(self.retry_delay)
+
+    async def warm_up(self) -> None:
+        started = time.perf_counter()
+        configure_mappers()
+        self.checks["orm"] = "ok"
+
+        for name, pool_engine in (("primary", engine), ("replica", replica_engine)):
+            if pool_engine is not None:
+                await self._warm_pool(pool_engine)
+                self.checks[f"db_{name}"] = "ok"
+
+        get_http_session()
+        self.checks["http_client"] = "ok"
+        self.checks["redis"] = await self._ping_redis()
+
+        if not coin_registry.loaded:
+            raise CoinRegistryNotLoaded("coin registry is not loaded yet")
+        self.checks["coin_registry"] = coin_registry.source
+
+        self.warmed_in_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.error = None
+        self.ready = True
+        logger.info(f"Ready in {self.warmed_in_ms} ms: {self.checks}")
+
+    async def _warm_pool(self, pool_engine) -> None:
+        """
+        Открыть warm_connections соединений одновременно и выполнить
+        запрос к таблице: заодно проверяется, что миграции применены
+        """
+        count = min(self.warm_connections, settings.DB_POOL_SIZE)
+        connections = [pool_engine.connect() for _ in range(count)]
+        try:
+            await asyncio.gather(*(conn.start() for conn in connections))
+            await asyncio.gather(
+                *(conn.execute(select(User.id).limit(1)) for conn in connections)
+            )
+        finally:
+            await asyncio.gather(
+                *(conn.close() for conn in connections), return_exceptions=True
+            )
+
+    @staticmethod
+    async def _ping_redis() -> str:
+        redis = get_redis()
+        if redis is None:
+            return "disabled"
+        try:
+            await redis.ping()
+        except RedisError as e:
+            logger.warning(f"Redis unavailable at warm-up: {e}")
+            return "unavailable"
+        return "ok"
+
+    def stats(self) -> dict:
+        return {
+            "status": "ready" if self.ready else "starting",
+            "checks": self.checks,
+            "warmed_in_ms": self.warmed_in_ms,
+            "error": self.error,
+        }
+
+
+readiness = Readiness(
+    warm_connections=settings.READY_WARM_CONNECTIONS,
+    retry_delay=settings.READY_RETRY_DELAY,
+)
@@ -1,11 +1,15 @@
 import time
+from typing import Optional, Tuple
 
 import jwt
 from core.config import settings
-from core.database import get_db
+from core.database import get_db, route_user_reads
+from core.hashing import hashing_pool
+from core.principal_cache import principal_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.hash import pbkdf2_sha256
+from models.schemas import UserResponse
+from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -16,12 +20,38 @@ JWT_EXPIRE_SEC = 60 * 60 * 24 * 7  # 7 дней
 
 
 # -------------Password-------------------
-def make_password_hash(password: str) -> str:
-    return pbkdf2_sha256.hash(password)
-
-
-def verify_password(password: str, password_hash: str) -> bool:
-    return pbkdf2_sha256.verify(password, password_hash)
+# При изменении PASSWORD_HASH_ROUNDS старые хэши помечаются как устаревшие
+# и пересчитываются при следующем успешном входе
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Хэширование пароля в пуле потоков, не блокируя event loop
+    """
+    return await hashing_pool.run(pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    password: str, password_hash: Optional[str]
+) -> Tuple[bool, Optional[str]]:
+    """
+    Проверка пароля в пуле потоков.
+    Возвращает (валиден ли пароль, новый хэш — если параметры устарели).
+    Для неизвестного пользователя (password_hash=None) выполняется
+    фиктивная проверка той же стоимости, чтобы время ответа не выдавало email.
+    """
+    if password_hash is None:
+        await hashing_pool.run(pwd_context.dummy_verify)
+        return False, None
+    return await hashing_pool.run(
+        pwd_context.verify_and_update, password, password_hash
+    )
 
 
 # -------------Token-------------------
@@ -44,31 +74,64 @@ def decode_token(token: str):
 
 
 # -------------User-------------------
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-):
+async def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Проверенные claims JWT без обращения к БД
+    """
     try:
         payload = decode_token(token)
-        user_id = int(payload.get("sub"))
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
-            )
-
-        from repositories.user import get_user_by_id
-
-        user = await get_user_by_id(db, user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
-            )
-
-        return user
+        payload["sub"] = int(payload["sub"])
+        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
         )
-    except jwt.InvalidTokenError:
+    except (jwt.InvalidTokenError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
         )
+
+
+async def get_current_user(
+    payload: dict = Depends(get_token_payload), db: AsyncSession = Depends(get_db)
+) -> UserResponse:
+    """
+    Текущий пользователь: сначала из кэша по (user_id, iat), затем из БД
+    """
+    user_id = payload["sub"]
+    iat = payload.get("iat", 0)
+    # Для read-your-writes маршрутизации запросов сессии
+    await route_user_reads(db, user_id)
+
+    principal = await principal_cache.get(user_id, iat)
+    if principal is not None:
+        return principal
+    # До чтения из БД: сброс во время чтения не даст закэшировать старое
+    generation = await principal_cache.generation(user_id)
+
+    from repositories.user import get_user_by_id
+
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Account Deactivated"
+        )
+
+    principal = UserResponse.model_validate(user)
+    await principal_cache.set(user_id, iat, principal, generation)
+    return principal
+
+
+async def get_admin_user(
+    current_user: UserResponse = Depends(get_current_user),
+) -> UserResponse:
+    """
+    Текущий пользователь, если у него есть права администратора (users.is_admin)
+    """
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return current_user
@@ -0,0 +1,186 @@
+import functools
+import inspect
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from core.config import settings
+
+# opentelemetry — опциональная зависимость. Без коллектора спаны некуда
+# отправлять, поэтому и импорт (~100 мс на старте) не нужен
+trace = None
+if settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+    try:
+        from opentelemetry import propagate, trace
+        from opentelemetry.trace import SpanKind, Status, StatusCode
+    except ImportError:
+        trace = None
+
+TRACING_AVAILABLE = trace is not None
+
+TRACER_NAME = "crypto_tracker.api_gateway"
+
+logger = logging.getLogger("tracing")
+
+
+def setup_tracing() -> None:
+    """
+    Экспорт спанов в OTLP-коллектор, если задан OTEL_EXPORTER_OTLP_ENDPOINT.
+    Без него (или без opentelemetry) спаны не создаются.
+    """
+    if not settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    if not TRACING_AVAILABLE:
+        logger.warning(
+            "OTEL_EXPORTER_OTLP_ENDPOINT is set, but opentelemetry is missing"
+        )
+        return
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME})
+    )
+    provider.add_span_processor(
+        BatchSpanProcessor(
+            OTLPSpanExporter(
+                endpoint=f"{settings.OTEL_EXPORTER_OTLP_ENDPOINT.rstrip('/')}/v1/traces"
+            )
+        )
+    )
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing enabled, exporting to {settings.OTEL_EXPORTER_OTLP_ENDPOINT}")
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def update_name(self, name):
+        pass
+
+    def record_exception(self, exception):
+        pass
+
+    def set_status(self, status):
+        pass
+
+    def end(self):
+        pass
+
+
+@contextmanager
+def start_span(name: str, parent: Optional[Dict[str, str]] = None, kind=None):
+    """
+    Спан с именем name. parent — контекст W3C (traceparent) из другого
+    сервиса: спан продолжает его трассу.
+    """
+    if not TRACING_AVAILABLE:
+        yield _NoopSpan()
+        return
+
+    tracer = trace.get_tracer(TRACER_NAME)
+    parent_context = propagate.extract(parent) if parent else None
+    with tracer.start_as_current_span(
+        name, context=parent_context, kind=kind or SpanKind.INTERNAL
+    ) as span:
+        yield span
+
+
+def inject_context() -> Dict[str, str]:
+    """Контекст текущего спана для передачи в другой сервис"""
+    carrier: Dict[str, str] = {}
+    if TRACING_AVAILABLE:
+        propagate.inject(carrier)
+    return carrier
+
+
+def traced(name: Optional[str] = None):
+    """
+    Декоратор: вызов функции — отдельный спан.
+    Для асинхронных генераторов спан длится всю итерацию, но не становится
+    текущим: генератор может продолжаться в другом контексте (StreamingResponse).
+    """
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def gen_wrapper(*args, **kwargs):
+                span = (
+                    trace.get_tracer(TRACER_NAME).start_span(span_name)
+                    if TRACING_AVAILABLE
+                    else _NoopSpan()
+                )
+                try:
+                    async for item in func(*args, **kwargs):
+                        yield item
+                finally:
+                    span.end()
+
+            return gen_wrapper
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracingMiddleware:
+    """
+    Серверный спан на каждый HTTP-запрос: продолжает трассу из заголовка
+    traceparent, имя — шаблон маршрута (известен после роутинга)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not TRACING_AVAILABLE:
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope["headers"]
+        }
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with start_span(
+            f"{scope['method']} {scope['path']}", parent=carrier, kind=SpanKind.SERVER
+        ) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.update_name(f"{scope['method']} {route.path}")
+                    span.set_attribute("http.route", route.path)
+                span.set_attribute("http.request.method", scope["method"])
+                span.set_attribute("http.response.status_code", status_code)
+                if status_code >= 500:
+                    span.set_status(Status(StatusCode.ERROR))
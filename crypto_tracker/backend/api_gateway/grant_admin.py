@@ -0,0 +1,36 @@
+"""
+Выдать или отозвать права администратора (эндпоинты /api/v1/admin).
+
+    python grant_admin.py alice
+    python grant_admin.py alice --revoke
+
+Права хранятся в users.is_admin и не зависят от данных, которые
+пользователь указал при регистрации.
+"""
+import argparse
+import asyncio
+import sys
+
+from core.database import async_session, engine
+from repositories.user import set_admin
+
+
+async def main(username: str, is_admin: bool) -> int:
+    try:
+        async with async_session() as db:
+            user = await set_admin(db, username, is_admin)
+    finally:
+        await engine.dispose()
+    if user is None:
+        print(f"User {username!r} not found", file=sys.stderr)
+        return 1
+    print(f"{user.username}: is_admin={user.is_admin}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("username")
+    parser.add_argument("--revoke", action="store_true", help="Отозвать права")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.username, not args.revoke)))
@@ -1,13 +1,23 @@
 from datetime import datetime
 
-import sentry_sdk
 from api.v1.routers import api_router
+from core.admission import AdmissionControlMiddleware, admission_stats
 from core.config import settings
-from core.database import create_tables
-from fastapi import FastAPI
+from core.database import StatementDeadlineExceeded, pool_stats
+from core.hashing import hashing_pool
+from core.loop_monitor import loop_monitor
+from core.metrics import PrometheusMiddleware, start_metrics_server
+from core.profiling import ProfilingMiddleware
+from core.readiness import readiness
+from core.tracing import TracingMiddleware, setup_tracing
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import JSONResponse
+from services.coin_registry import coin_registry
+from services.correlation import correlation_cache
+from services.indicators import indicator_cache
+from services.price_service import close_http_session
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 origins = [
     "http://localhost:8080",
@@ -23,6 +33,9 @@ def scrub_sensitive_data(event, hint):
 
 
 if settings.SENTRY_DSN != "":
+    # Импорт только при включенном Sentry: это ~300 мс на старте
+    import sentry_sdk
+
     sentry_sdk.init(
         dsn=settings.SENTRY_DSN,
         send_default_pii=False,
@@ -31,6 +44,7 @@ if settings.SENTRY_DSN != "":
         before_send=scrub_sensitive_data,
     )
 
+setup_tracing()
 
 app = FastAPI(
     title="Crypto Tracker API",
@@ -40,17 +54,46 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Профилирование запросов — самый внутренний слой, только для отладки
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Контроль нагрузки: добавлен раньше CORS, чтобы ответы 503 тоже
+# проходили через CORSMiddleware
+app.add_middleware(AdmissionControlMiddleware)
+
 # Разрешаем фронту обращаться к API
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=[
+        "Content-Type",
+        "Authorization",
+        "If-None-Match",
+        "X-Profile",
+        "traceparent",
+    ],
+    expose_headers=["ETag", "X-Profile-Id"],
     max_age=3600,
 )
 
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Метрики и трассировка — внешние слои: в них попадают и отброшенные 503
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(TracingMiddleware)
+
+
+@app.exception_handler(PoolTimeoutError)
+@app.exception_handler(StatementDeadlineExceeded)
+async def overload_exception_handler(request: Request, exc: Exception):
+    """Пул исчерпан или бюджет запроса вышел — клиенту стоит повторить позже"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is overloaded, retry later"},
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+    )
+
 
 # Подключаем API роуты
 app.include_router(api_router, prefix="/api/v1")
@@ -58,18 +101,44 @@ app.include_router(api_router, prefix="/api/v1")
 
 @app.on_event("startup")
 async def startup_event():
-    """Асинхронное создание таблиц при старте"""
-    await create_tables()
-    print("Таблицы базы данных созданы")
+    """
+    Схемой БД управляет Alembic (alembic upgrade head до запуска).
+    Прогрев идет фоном, о готовности сообщает GET /ready
+    """
+    if settings.API_METRICS_PORT:
+        start_metrics_server(settings.API_METRICS_PORT)
+    readiness.start()
+    coin_registry.start()
+    loop_monitor.start()
+
 
-    for route in app.routes:
-        if hasattr(route, "path"):
-            print(f"🔍 Route: {route.path}")
+@app.on_event("shutdown")
+async def shutdown_event():
+    await readiness.stop()
+    await coin_registry.stop()
+    await close_http_session()
+    await loop_monitor.stop()
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": datetime.utcnow()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow(),
+        "password_hashing": hashing_pool.stats(),
+        "admission": admission_stats.stats(),
+        "db_pool": pool_stats.stats(),
+        "event_loop": loop_monitor.stats(),
+        "coin_registry": coin_registry.stats(),
+        "indicator_cache": indicator_cache.stats(),
+        "correlation_cache": correlation_cache.stats(),
+    }
+
+
+@app.get("/ready")
+async def ready_check():
+    """Готовность принимать трафик: 503, пока не прогреты БД, HTTP-клиент и Redis"""
+    return JSONResponse(readiness.stats(), status_code=200 if readiness.ready else 503)
 
 
 @app.get("/")
@@ -1,11 +1,14 @@
-from .database import Asset, PriceHistory, User
+from .database import Asset, Coin, PriceHistory, User
 from .schemas import (
     AssetBase,
     AssetCreateRequest,
     AssetResponse,
     AssetUpdateRequest,
+    BacktestRequest,
+    CoinResponse,
     PriceHistoryBase,
     PriceHistoryCreate,
+    PriceThresholds,
     Token,
     TokenData,
     UserBase,
@@ -18,6 +21,7 @@ __all__ = [
     "User",
     "Asset",
     "PriceHistory",
+    "Coin",
     "UserBase",
     "UserCreateRequest",
     "UserLoginRequest",
@@ -26,6 +30,9 @@ __all__ = [
     "AssetCreateRequest",
     "AssetUpdateRequest",
     "AssetResponse",
+    "CoinResponse",
+    "BacktestRequest",
+    "PriceThresholds",
     "PriceHistoryBase",
     "PriceHistoryCreate",
     "Token",
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
@@ -55,6 +55,7 @@ class UserResponse(BaseModel):
     username: str
     email: EmailStr
     is_active: bool
+    is_admin: bool = False
     created_at: datetime
 
     class Config:
@@ -63,21 +64,48 @@ class UserResponse(BaseModel):
 
 
 # -------------Asset---------------
-class CryptoSymbol(str, Enum):
+def validate_coin_symbol(symbol: str) -> str:
+    """Символ должен быть в реестре монет (GET /api/v1/coins/search)"""
+    # Импорт здесь: реестр сам зависит от models через репозиторий
+    from services.coin_registry import coin_registry
+
+    symbol = symbol.upper()
+    if coin_registry.coin_id(symbol) is None:
+        raise ValueError(f"Unknown symbol {symbol}")
+    return symbol
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Время из запроса -> UTC без зоны, как recorded_at в БД"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class QuoteCurrency(str, Enum):
+    """Валюта котировки: в ней пороги, текущая цена и история актива"""
+
+    USD = "USD"
+    EUR = "EUR"
+    GBP = "GBP"
+    JPY = "JPY"
     BTC = "BTC"
     ETH = "ETH"
-    ADA = "ADA"
-    DOT = "DOT"
-    SOL = "SOL"
 
 
 class AssetBase(BaseModel):
     """Базовая схема валюты"""
 
-    symbol: CryptoSymbol
+    symbol: str = Field(..., min_length=1, max_length=20)
+    quote: QuoteCurrency = QuoteCurrency.USD
     min_price: float = Field(..., gt=0)
     max_price: float = Field(..., gt=0)
 
+    @field_validator("symbol")
+    @classmethod
+    def validate_symbol(cls, v):
+        return validate_coin_symbol(v)
+
     @field_validator("max_price")
     @classmethod
     def validate_max_price(cls, v, info):
@@ -93,13 +121,21 @@ class AssetCreateRequest(AssetBase):
 
 
 class AssetUpdateRequest(BaseModel):
-    """Схема для обновления валюты"""
+    """
+    Схема для обновления валюты.
+    quote не меняется: история актива записана в одной валюте
+    """
 
-    symbol: Optional[str] = Field(None, min_length=2, max_length=10, pattern="^[A-Z]+$")
+    symbol: Optional[str] = Field(None, min_length=1, max_length=20)
     min_price: Optional[float] = Field(None, gt=0)
     max_price: Optional[float] = Field(None, gt=0)
     is_active: Optional[bool] = None
 
+    @field_validator("symbol")
+    @classmethod
+    def validate_symbol(cls, v):
+        return validate_coin_symbol(v) if v is not None else v
+
     @field_validator("max_price")
     @classmethod
     def validate_max_price(cls, v, info):
@@ -116,6 +152,7 @@ class AssetResponse(BaseModel):
     id: int
     user_id: int
     symbol: str
+    quote: str = "USD"
     min_price: float
     max_price: float
     current_price: Optional[float] = None
@@ -126,6 +163,16 @@ class AssetResponse(BaseModel):
         from_attributes = True
 
 
+# -------------Coins---------------
+class CoinResponse(BaseModel):
+    """Монета из реестра провайдера"""
+
+    id: str
+    symbol: str
+    name: str
+    rank: Optional[int] = None
+
+
 # -------------PriceHistory---------------
 class PriceHistoryBase(BaseModel):
     """Базовая схема истории цен"""
@@ -150,6 +197,45 @@ class PriceHistory(PriceHistoryBase):
         from_attributes = True
 
 
+# -------------Backtest---------------
+class PriceThresholds(BaseModel):
+    """Пара порогов-кандидатов, как в AssetCreateRequest"""
+
+    min_price: float = Field(..., gt=0)
+    max_price: float = Field(..., gt=0)
+
+    @field_validator("max_price")
+    @classmethod
+    def validate_max_price(cls, v, info):
+        if info.data and "min_price" in info.data and v <= info.data["min_price"]:
+            raise ValueError("max_price должен быть больше min_price")
+        return v
+
+
+class BacktestRequest(BaseModel):
+    """
+    Проверка порогов на истории цен символа до создания актива.
+    Период по умолчанию — последние 30 дней
+    """
+
+    symbol: str = Field(..., min_length=1, max_length=20)
+    quote: QuoteCurrency = QuoteCurrency.USD
+    thresholds: List[PriceThresholds] = Field(..., min_length=1, max_length=1000)
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    max_events: int = Field(100, ge=0, le=1000)  # Моментов на порог в ответе
+
+    @field_validator("symbol")
+    @classmethod
+    def validate_symbol(cls, v):
+        return validate_coin_symbol(v)
+
+    @field_validator("start", "end")
+    @classmethod
+    def to_naive_utc(cls, v):
+        return to_naive_utc(v)
+
+
 # -------------Token---------------
 class Token(BaseModel):
     """Схема для JWT токена"""
@@ -1,9 +1,12 @@
 import logging
 from typing import List, Optional
 
-from fastapi import HTTPException
+from core.cache import invalidate_user_data
+from core.database import use_primary
+from core.tracing import traced
 from models.database import Asset
 from models.schemas import AssetCreateRequest, AssetUpdateRequest
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
@@ -13,6 +16,7 @@ logging.basicConfig(
 )
 
 
+@traced()
 async def get_assets_by_user(db: AsyncSession, user_id: int) -> List[Asset]:
     """
     Получает ВСЕ активы конкретного пользователя (включая и неактивные)
@@ -21,6 +25,7 @@ async def get_assets_by_user(db: AsyncSession, user_id: int) -> List[Asset]:
     return result.scalars().all()
 
 
+@traced()
 async def get_active_assets_by_user(db: AsyncSession, user_id: int) -> List[Asset]:
     """
     Получить только АКТИВНЫЕ активы пользователя
@@ -31,6 +36,7 @@ async def get_active_assets_by_user(db: AsyncSession, user_id: int) -> List[Asse
     return result.scalars().all()
 
 
+@traced()
 async def get_asset_by_id(
     db: AsyncSession, asset_id: int, user_id: int
 ) -> Optional[Asset]:
@@ -45,6 +51,7 @@ async def get_asset_by_id(
     return result.scalar_one_or_none()
 
 
+@traced()
 async def create_asset(
     db: AsyncSession, asset_data: AssetCreateRequest, user_id: int
 ) -> Asset:
@@ -53,11 +60,14 @@ async def create_asset(
     """
     from services.price_service import get_current_price
 
-    current_price = await get_current_price(asset_data.symbol.upper())
+    use_primary(db)
+    quote = asset_data.quote.value
+    current_price = await get_current_price(asset_data.symbol.upper(), quote)
 
     db_asset = Asset(
         user_id=user_id,
         symbol=asset_data.symbol.upper(),
+        quote=quote,
         min_price=asset_data.min_price,
         max_price=asset_data.max_price,
         current_price=current_price,
@@ -69,74 +79,107 @@ async def create_asset(
     if current_price is not None:
         from repositories.price_history import create_price_history
 
-        await create_price_history(db, db_asset.id, current_price)
+        await create_price_history(db, db_asset, current_price)
+    await invalidate_user_data(user_id)
     return db_asset
 
 
+@traced()
 async def restore_asset_by_id(
     db: AsyncSession, asset_id: int, user_id: int
 ) -> Optional[Asset]:
     """
     Восстановить неактивный актив
     """
-    # Ищем ЛЮБОЙ актив (включая неактивные)
+    # Ищем ЛЮБОЙ актив (включая неактивные): проверка владельца — в WHERE
     result = await db.execute(
-        select(Asset).where(Asset.id == asset_id, Asset.user_id == user_id)
+        update(Asset)
+        .where(Asset.id == asset_id, Asset.user_id == user_id)
+        .values(is_active=True)
+        .returning(Asset)
     )
     asset = result.scalar_one_or_none()
+    await db.commit()
 
     if asset:
-        asset.is_active = True
-        await db.commit()
-        await db.refresh(asset)
+        await invalidate_user_data(user_id)
     return asset
 
 
+@traced()
 async def update_asset(
     db: AsyncSession, asset_id: int, asset_data: AssetUpdateRequest, user_id: int
 ) -> Optional[Asset]:
     """
-    Обновить существующий актив
+    Обновить существующий актив одним UPDATE ... RETURNING
+    (при новом символе — сначала чтение текущего символа и валюты)
     """
     from services.price_service import get_current_price
 
-    asset = await get_asset_by_id(db, asset_id, user_id)
-    if not asset:
-        return None
-
-    if asset_data.symbol and asset_data.symbol != asset.symbol:
-        current_price = await get_current_price(asset_data.symbol.upper())
-        asset.current_price = current_price
-
     update_data = asset_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(asset, field, value)
+    if not update_data:
+        return await get_asset_by_id(db, asset_id, user_id)
+
+    if asset_data.symbol:
+        # Провайдер нужен, только если символ действительно меняется:
+        # клиенты часто присылают в PUT актив целиком. Символ и валюту
+        # читаем из primary — реплика может не видеть прошлую правку
+        use_primary(db)
+        result = await db.execute(
+            select(Asset.symbol, Asset.quote).where(
+                Asset.id == asset_id,
+                Asset.user_id == user_id,
+                Asset.is_active.is_(True),
+            )
+        )
+        current = result.one_or_none()
+        if current is None:
+            return None
+        if asset_data.symbol.upper() != current.symbol:
+            update_data["current_price"] = await get_current_price(
+                asset_data.symbol.upper(), current.quote
+            )
 
+    result = await db.execute(
+        update(Asset)
+        .where(
+            Asset.id == asset_id, Asset.user_id == user_id, Asset.is_active.is_(True)
+        )
+        .values(**update_data)
+        .returning(Asset)
+    )
+    asset = result.scalar_one_or_none()
     await db.commit()
-    await db.refresh(asset)
+
+    if asset:
+        await invalidate_user_data(user_id)
     return asset
 
 
+@traced()
 async def delete_asset(db: AsyncSession, asset_id: int, user_id: int) -> bool:
     """
-    Удалить актив из отслеживаемых
+    Удалить актив из отслеживаемых.
+    Владелец проверяется в самом UPDATE: чужой актив не найдется.
     """
-    asset = await get_asset_by_id(db, asset_id, user_id)
-    if not asset:
+    result = await db.execute(
+        update(Asset)
+        .where(
+            Asset.id == asset_id, Asset.user_id == user_id, Asset.is_active.is_(True)
+        )
+        .values(is_active=False)
+        .returning(Asset.id)
+    )
+    deleted = result.scalar_one_or_none() is not None
+    await db.commit()
+
+    if not deleted:
         logger.warning(
             f"Delete attempt for non-existent or "
             f"unauthorized asset_id={asset_id} by user_id={user_id}"
         )
         return False
 
-    if asset.user_id != user_id:
-        logger.error(
-            f"SECURITY: User {user_id} attempted "
-            f"to delete asset {asset_id} owned by {asset.user_id}"
-        )
-        raise HTTPException(403, "Forbidden")
-
-    asset.is_active = False
-    await db.commit()
+    await invalidate_user_data(user_id)
     logger.info(f"Asset {asset_id} deleted by user {user_id}")
     return True
@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from core.database import use_primary
+from core.tracing import traced
+from models.database import Coin
+from sqlalchemy import Row, delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+
+@traced()
+async def get_coins(db: AsyncSession) -> List[Row]:
+    """
+    Весь реестр монет: (id, symbol, name, rank, is_primary)
+    """
+    result = await db.execute(
+        select(Coin.id, Coin.symbol, Coin.name, Coin.rank, Coin.is_primary)
+    )
+    return result.all()
+
+
+@traced()
+async def get_coins_synced_at(db: AsyncSession) -> Optional[datetime]:
+    """
+    Время последней синхронизации с провайдером (None — еще не было)
+    """
+    use_primary(db)
+    return (await db.execute(select(func.max(Coin.updated_at)))).scalar()
+
+
+@traced()
+async def replace_coins(
+    db: AsyncSession, coins: Sequence[dict], synced_at: datetime
+) -> None:
+    """
+    Заменить реестр списком провайдера в одной транзакции:
+    читатели видят либо старый список, либо новый целиком
+    """
+    use_primary(db)
+    await db.execute(delete(Coin))
+    await db.execute(
+        insert(Coin), [{**coin, "updated_at": synced_at} for coin in coins]
+    )
+    await db.commit()
@@ -1,36 +1,186 @@
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 
-from models.database import PriceHistory
+from core.database import async_session
+from core.tracing import traced
+from models.database import Asset, PriceHistory
+from sqlalchemy import Row, func, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 
+@traced()
 async def create_price_history(
-    db: AsyncSession, asset_id: int, price: float
+    db: AsyncSession, asset: Asset, price: float
 ) -> PriceHistory:
     """
-    Создать запись в истории цен
+    Создать запись в истории цен (с текущими символом и валютой актива)
     """
-    price_history = PriceHistory(asset_id=asset_id, price=price)
+    price_history = PriceHistory(
+        asset_id=asset.id, symbol=asset.symbol, quote=asset.quote, price=price
+    )
     db.add(price_history)
     await db.commit()
     await db.refresh(price_history)
     return price_history
 
 
-async def get_price_history_by_asset(
-    db: AsyncSession, asset_id: int, skip: int = 0, limit: int = 50
-) -> List[PriceHistory]:
+@traced()
+async def get_owned_price_history(
+    db: AsyncSession, asset_id: int, user_id: int, skip: int = 0, limit: int = 50
+) -> Optional[List[Row]]:
     """
-    Получить историю цен для актива
+    История цен актива вместе с проверкой владельца — одним запросом.
+
+    Актив пользователя соединяется (LEFT JOIN ... ON true) с уже
+    ограниченной выборкой истории: актив без записей дает одну строку
+    с NULL, чужой или неактивный — ни одной (None -> 404).
+    Строки: (id, asset_id, price, recorded_at), новые первыми.
     """
     if limit > 1000:
         limit = 1000
-    result = await db.execute(
-        select(PriceHistory)
+    history = (
+        select(
+            PriceHistory.id,
+            PriceHistory.asset_id,
+            PriceHistory.price,
+            PriceHistory.recorded_at,
+        )
         .where(PriceHistory.asset_id == asset_id)
         .order_by(PriceHistory.recorded_at.desc())
         .offset(skip)
         .limit(limit)
+        .subquery()
+    )
+    result = await db.execute(
+        select(history)
+        .select_from(Asset)
+        .outerjoin(history, true())
+        .where(
+            Asset.id == asset_id, Asset.user_id == user_id, Asset.is_active.is_(True)
+        )
+        .order_by(history.c.recorded_at.desc())
+    )
+    rows = result.all()
+    if not rows:
+        return None
+    return [row for row in rows if row.id is not None]
+
+
+@traced()
+async def get_symbol_price_series(
+    db: AsyncSession, symbol: str, quote: str, limit: int
+) -> List[Row]:
+    """
+    Последние цены символа в валюте котировки: строки (recorded_at, price),
+    новые первыми.
+
+    Ряд собирается по символу и валюте самих записей, а не по активу:
+    после смены символа старые записи актива остаются за прежней монетой,
+    а пропуски приостановленного актива закрывают записи других.
+    Worker пишет цену тика во все активы символа с одним recorded_at,
+    поэтому записи одного момента сворачиваются в одну точку.
+    """
+    result = await db.execute(
+        select(PriceHistory.recorded_at, func.min(PriceHistory.price).label("price"))
+        .where(PriceHistory.symbol == symbol, PriceHistory.quote == quote)
+        .group_by(PriceHistory.recorded_at)
+        .order_by(PriceHistory.recorded_at.desc())
+        .limit(limit)
+    )
+    return result.all()
+
+
+@traced()
+async def get_symbols_price_history(
+    db: AsyncSession,
+    pairs: Sequence[Tuple[str, str]],
+    start: datetime,
+    end: datetime,
+) -> List[Row]:
+    """
+    Ряды нескольких символов за период [start, end) одним запросом:
+    строки (symbol, quote, recorded_at, price) по символу, затем по времени.
+    Ряд символа — как в get_symbol_price_series
+    """
+    result = await db.execute(
+        select(
+            PriceHistory.symbol,
+            PriceHistory.quote,
+            PriceHistory.recorded_at,
+            func.min(PriceHistory.price).label("price"),
+        )
+        .where(
+            tuple_(PriceHistory.symbol, PriceHistory.quote).in_(pairs),
+            PriceHistory.recorded_at >= start,
+            PriceHistory.recorded_at < end,
+        )
+        .group_by(PriceHistory.symbol, PriceHistory.quote, PriceHistory.recorded_at)
+        .order_by(PriceHistory.symbol, PriceHistory.quote, PriceHistory.recorded_at)
+    )
+    return result.all()
+
+
+@traced()
+async def _stream_chunks(query, chunk_size: int) -> AsyncIterator[Sequence]:
+    """
+    Порции строк запроса через серверный курсор.
+
+    Открывает собственную сессию: генератор живет дольше запроса,
+    поэтому сессия из get_db к этому моменту может быть уже закрыта.
+    """
+    query = query.execution_options(yield_per=chunk_size)
+    async with async_session() as session:
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            yield rows
+
+
+def _filter_period(query, start: Optional[datetime], end: Optional[datetime]):
+    if start is not None:
+        query = query.where(PriceHistory.recorded_at >= start)
+    if end is not None:
+        query = query.where(PriceHistory.recorded_at < end)
+    return query
+
+
+def stream_price_history(
+    asset_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    chunk_size: int = 5000,
+) -> AsyncIterator[Sequence]:
+    """
+    Потоковое чтение истории цен актива: порции строк (recorded_at, price)
+    """
+    query = select(PriceHistory.recorded_at, PriceHistory.price).where(
+        PriceHistory.asset_id == asset_id
+    )
+    query = _filter_period(query, start, end).order_by(PriceHistory.recorded_at)
+    return _stream_chunks(query, chunk_size)
+
+
+def stream_user_price_history(
+    user_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    chunk_size: int = 5000,
+) -> AsyncIterator[Sequence]:
+    """
+    Потоковое чтение истории цен всех активов пользователя:
+    порции строк (asset_id, symbol, recorded_at, price)
+    """
+    query = (
+        select(
+            PriceHistory.asset_id,
+            PriceHistory.symbol,
+            PriceHistory.recorded_at,
+            PriceHistory.price,
+        )
+        .join(Asset, Asset.id == PriceHistory.asset_id)
+        .where(Asset.user_id == user_id)
+    )
+    query = _filter_period(query, start, end).order_by(
+        PriceHistory.asset_id, PriceHistory.recorded_at
     )
-    return result.scalars().all()
+    return _stream_chunks(query, chunk_size)
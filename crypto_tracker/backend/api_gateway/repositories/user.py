@@ -1,4 +1,7 @@
-from core.security import make_password_hash
+from core.database import use_primary
+from core.principal_cache import principal_cache
+from core.security import hash_password
+from core.tracing import traced
 from fastapi import HTTPException
 from models.database import User
 from models.schemas import UserCreateRequest
@@ -7,23 +10,28 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 
+@traced()
 async def get_user_by_email(db: AsyncSession, email: str):
     result = await db.execute(select(User).where(User.email == email))
     return result.scalar_one_or_none()
 
 
+@traced()
 async def get_user_by_id(db: AsyncSession, id: int):
     result = await db.execute(select(User).where(User.id == id))
     return result.scalar_one_or_none()
 
 
+@traced()
 async def get_user_by_username(db: AsyncSession, username: str):
     result = await db.execute(select(User).where(User.username == username))
     return result.scalar_one_or_none()
 
 
+@traced()
 async def create_user(db: AsyncSession, user_data: UserCreateRequest):
-    hashed_password = make_password_hash(user_data.password)
+    use_primary(db)
+    hashed_password = await hash_password(user_data.password)
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -44,3 +52,48 @@ async def create_user(db: AsyncSession, user_data: UserCreateRequest):
             raise HTTPException(400, "Username уже занят")
         else:
             raise HTTPException(500, "Ошибка создания пользователя")
+
+
+@traced()
+async def update_password_hash(db: AsyncSession, user: User, password_hash: str):
+    """
+    Сохранить пересчитанный хэш пароля (после смены параметров хэширования)
+    и сбросить кэш аутентификации
+    """
+    use_primary(db)
+    user.password_hash = password_hash
+    await db.commit()
+    await principal_cache.invalidate(user.id)
+    return user
+
+
+@traced()
+async def deactivate_user(db: AsyncSession, user_id: int):
+    """
+    Деактивировать пользователя и сбросить его записи в кэше аутентификации
+    """
+    use_primary(db)
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        return None
+
+    user.is_active = False
+    await db.commit()
+    await principal_cache.invalidate(user_id)
+    return user
+
+
+@traced()
+async def set_admin(db: AsyncSession, username: str, is_admin: bool):
+    """
+    Выдать или отозвать права администратора и сбросить кэш аутентификации
+    """
+    use_primary(db)
+    user = await get_user_by_username(db, username)
+    if not user:
+        return None
+
+    user.is_admin = is_admin
+    await db.commit()
+    await principal_cache.invalidate(user.id)
+    return user
@@ -0,0 +1,48 @@
+from typing import List, Tuple
+
+from core.cache import (
+    BASE_QUOTE,
+    get_cached_asset_list,
+    get_latest_prices,
+    set_cached_asset_list,
+)
+from core.metrics import cache_result
+from models.schemas import AssetResponse
+from repositories.asset import get_active_assets_by_user, get_assets_by_user
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def get_asset_list(
+    db: AsyncSession, user_id: int, active_only: bool = True
+) -> List[dict]:
+    """
+    Список активов пользователя через кэш в Redis.
+
+    Сам набор активов меняется только через create/update/delete/restore,
+    которые сбрасывают кэш. Текущие цены меняются каждый тик, поэтому
+    подставляются при чтении из последних цен worker'а.
+    """
+    scope = "active" if active_only else "all"
+    version, assets = await get_cached_asset_list(user_id, scope)
+    if version is not None:
+        cache_result("asset_list", assets is not None)
+
+    if assets is None:
+        loader = get_active_assets_by_user if active_only else get_assets_by_user
+        rows = await loader(db, user_id)
+        assets = [
+            AssetResponse.model_validate(row).model_dump(mode="json") for row in rows
+        ]
+        if version is not None:
+            await set_cached_asset_list(user_id, scope, version, assets)
+
+    prices = await get_latest_prices({price_pair(asset) for asset in assets})
+    for asset in assets:
+        if price_pair(asset) in prices:
+            asset["current_price"] = prices[price_pair(asset)]
+    return assets
+
+
+def price_pair(asset: dict) -> Tuple[str, str]:
+    # В кэше могут быть списки, собранные до появления quote
+    return asset["symbol"], asset.get("quote", BASE_QUOTE)
@@ -0,0 +1,117 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+from models.schemas import PriceThresholds
+from repositories.price_history import get_symbols_price_history
+from services.history_format import EPOCH, MILLISECOND, epoch_ms_array
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PERIOD = timedelta(days=30)
+# Ячеек в одной матрице сравнений: порогов в порции ~ CHUNK_CELLS / точек ряда.
+# Ограничивает память при сотнях порогов на годе тиков
+CHUNK_CELLS = 1 << 22
+
+
+def crossings(
+    prices: np.ndarray, thresholds: np.ndarray, below: bool, max_events: int
+) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Пересечения каждого порога, как их видит worker (services/alerts.py):
+    цена в точке i за порогом, а в точке i - 1 — еще нет.
+
+    Возвращает число пересечений на порог и номера точек первых
+    max_events из них. Сравнения — матрицей (порог x точка) порциями
+    по CHUNK_CELLS, без цикла по точкам ряда.
+    """
+    counts = np.zeros(len(thresholds), dtype=np.int64)
+    events: List[np.ndarray] = []
+    rows = max(1, CHUNK_CELLS // max(len(prices), 1))
+    for start in range(0, len(thresholds), rows):
+        end = start + rows
+        column = thresholds[start:end, None]
+        outside = prices < column if below else prices > column
+        crossed = outside[:, 1:] & ~outside[:, :-1]
+        chunk_counts = crossed.sum(axis=1)
+        counts[start:end] = chunk_counts
+        # np.nonzero идет по строкам: моменты порога i — подряд и по времени
+        _, points = np.nonzero(crossed)
+        splits = np.cumsum(chunk_counts)[:-1]
+        events.extend(indices[:max_events] + 1 for indices in np.split(points, splits))
+    return counts, events
+
+
+def encode_backtest(
+    symbol: str,
+    quote: str,
+    start: datetime,
+    end: datetime,
+    thresholds: Sequence[PriceThresholds],
+    max_events: int,
+    rows: Sequence[Row],
+) -> bytes:
+    """
+    Ответ /assets/backtest: по каждой паре порогов — число срабатываний
+    below / above и их моменты (мс Unix, первые max_events)
+    """
+    timestamps = epoch_ms_array([row.recorded_at for row in rows])
+    prices = np.fromiter((row.price for row in rows), dtype=np.float64, count=len(rows))
+
+    # В переборах пороги повторяются (сетка min x max): каждое значение — один раз
+    mins, min_index = np.unique(
+        [pair.min_price for pair in thresholds], return_inverse=True
+    )
+    maxs, max_index = np.unique(
+        [pair.max_price for pair in thresholds], return_inverse=True
+    )
+    below, below_at = crossings(prices, mins, True, max_events)
+    above, above_at = crossings(prices, maxs, False, max_events)
+
+    results = [
+        {
+            "min_price": pair.min_price,
+            "max_price": pair.max_price,
+            "alerts": below[low] + above[high],
+            "below": below[low],
+            "above": above[high],
+            "below_at": timestamps[below_at[low]],
+            "above_at": timestamps[above_at[high]],
+        }
+        for pair, low, high in zip(thresholds, min_index, max_index)
+    ]
+    return orjson.dumps(
+        {
+            "symbol": symbol,
+            "quote": quote,
+            "start": (start - EPOCH) // MILLISECOND,
+            "end": (end - EPOCH) // MILLISECOND,
+            "points": len(prices),
+            "results": results,
+        },
+        option=orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+async def run_backtest(
+    db: AsyncSession,
+    symbol: str,
+    quote: str,
+    thresholds: Sequence[PriceThresholds],
+    start: datetime,
+    end: datetime,
+    max_events: int,
+) -> Optional[bytes]:
+    """
+    Проверить пары порогов на ряде символа за [start, end).
+    Ряд — как у индикаторов, по записям символа; None — за период нет цен
+    """
+    rows = await get_symbols_price_history(db, [(symbol, quote)], start, end)
+    if not rows:
+        return None
+    # Сравнения по сотням порогов и году тиков — в потоке, не в event loop
+    return await asyncio.to_thread(
+        encode_backtest, symbol, quote, start, end, thresholds, max_events, rows
+    )
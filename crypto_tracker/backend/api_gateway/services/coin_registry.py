@@ -0,0 +1,254 @@
+import asyncio
+import heapq
+import logging
+import os
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import orjson
+from core.config import settings
+from core.database import async_session
+from repositories.coin import get_coins, get_coins_synced_at, replace_coins
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger("coin_registry")
+
+
+class CoinEntry(NamedTuple):
+    id: str
+    symbol: str
+    name: str
+    rank: Optional[int]
+    is_primary: bool
+
+
+# Монеты до первой загрузки реестра — те же, что в миграции coins
+SEED_COINS = [
+    CoinEntry("bitcoin", "BTC", "Bitcoin", 1, True),
+    CoinEntry("ethereum", "ETH", "Ethereum", 2, True),
+    CoinEntry("solana", "SOL", "Solana", 5, True),
+    CoinEntry("cardano", "ADA", "Cardano", 10, True),
+    CoinEntry("polkadot", "DOT", "Polkadot", 30, True),
+]
+
+
+def pick_primary(coins: List[dict]) -> List[dict]:
+    """
+    Отметить основную монету для каждого символа: с меньшим rank,
+    затем из SEED_COINS, затем с самым коротким id
+    """
+    seed_ids = {coin.id for coin in SEED_COINS}
+    best: Dict[str, Tuple[tuple, str]] = {}
+    for coin in coins:
+        key = (
+            coin["rank"] is None,
+            coin["rank"] or 0,
+            coin["id"] not in seed_ids,
+            len(coin["id"]),
+            coin["id"],
+        )
+        current = best.get(coin["symbol"])
+        if current is None or key < current[0]:
+            best[coin["symbol"]] = (key, coin["id"])
+    primary_ids = {coin_id for _, coin_id in best.values()}
+    return [{**coin, "is_primary": coin["id"] in primary_ids} for coin in coins]
+
+
+class CoinIndex:
+    """
+    Неизменяемый индекс монет: символ -> основная монета и поиск
+    по префиксу символа или названия.
+
+    Ключи (символ и название в нижнем регистре) лежат в одном
+    отсортированном списке, совпадения с префиксом идут в нем подряд
+    от bisect_left: O(log n + k) вместо обхода всего реестра.
+    """
+
+    def __init__(self, coins: Iterable[CoinEntry]):
+        self.coins = list(coins)
+        self._by_symbol = {coin.symbol: coin for coin in self.coins if coin.is_primary}
+        keys = set()
+        for position, coin in enumerate(self.coins):
+            keys.add((coin.symbol.lower(), position))
+            keys.add((coin.name.lower(), position))
+        self._keys = sorted(keys)
+
+    def __len__(self) -> int:
+        return len(self.coins)
+
+    def coin_id(self, symbol: str) -> Optional[str]:
+        coin = self._by_symbol.get(symbol.upper())
+        return coin.id if coin is not None else None
+
+    def search(self, query: str, limit: int = 10) -> List[CoinEntry]:
+        """
+        Сначала точное совпадение символа, затем основные монеты
+        и монеты с рангом по капитализации
+        """
+        prefix = query.strip().lower()
+        if not prefix:
+            return []
+        scores: Dict[int, tuple] = {}
+        index = bisect_left(self._keys, (prefix,))
+        while index < len(self._keys) and self._keys[index][0].startswith(prefix):
+            _, position = self._keys[index]
+            coin = self.coins[position]
+            score = (
+                coin.symbol.lower() != prefix,
+                not coin.is_primary,
+                coin.rank is None,
+                coin.rank or 0,
+                coin.symbol,
+            )
+            scores[position] = score
+            index += 1
+        best = heapq.nsmallest(limit, scores, key=scores.__getitem__)
+        return [self.coins[position] for position in best]
+
+
+class CoinRegistry:
+    """
+    Реестр монет провайдера в памяти процесса.
+
+    Источник — таблица coins: раз в sync_interval один из экземпляров
+    gateway заменяет ее полным списком провайдера, остальные замечают
+    новую синхронизацию при очередной проверке (refresh_interval).
+    Снимок на диске дает полный реестр сразу после рестарта, без БД;
+    до любой загрузки работают SEED_COINS. От реестра зависит проверка
+    символов, поэтому /ready ждет loaded: снимок или первое чтение таблицы
+    (если и оно не удалось — остаются SEED_COINS, ждать дальше нечего).
+    """
+
+    def __init__(self, snapshot_path: str, sync_interval: int, refresh_interval: float):
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.sync_interval = sync_interval
+        self.refresh_interval = refresh_interval
+        self.index = CoinIndex(SEED_COINS)
+        self.source = "seed"
+        self.synced_at: Optional[datetime] = None
+        self._refreshed = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.source != "seed" or self._refreshed
+
+    def coin_id(self, symbol: str) -> Optional[str]:
+        return self.index.coin_id(symbol)
+
+    def search(self, query: str, limit: int = 10) -> List[CoinEntry]:
+        return self.index.search(query, limit)
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        await self.load_snapshot()
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Coin registry refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self) -> None:
+        """Синхронизировать таблицу с провайдером, если пора, и перечитать ее"""
+        try:
+            async with async_session() as db:
+                synced_at = await get_coins_synced_at(db)
+                if self._sync_due(synced_at):
+                    synced_at = await self.sync(db) or synced_at
+                if self.source == "db" and synced_at == self.synced_at:
+                    return
+                rows = await get_coins(db)
+            if rows:
+                await self._load([CoinEntry(*row) for row in rows], "db", synced_at)
+                await asyncio.to_thread(self._save_snapshot)
+        finally:
+            self._refreshed = True
+
+    def _sync_due(self, synced_at: Optional[datetime]) -> bool:
+        if not self.sync_interval:
+            return False
+        if synced_at is None:
+            return True
+        return datetime.utcnow() - synced_at > timedelta(seconds=self.sync_interval)
+
+    async def sync(self, db: AsyncSession) -> Optional[datetime]:
+        """Заменить таблицу coins списком провайдера; None — если не удалось"""
+        from services.price_service import fetch_coin_list
+
+        try:
+            coins = await fetch_coin_list()
+            if not coins:
+                raise ValueError("provider returned empty coin list")
+            synced_at = datetime.utcnow()
+            await replace_coins(db, pick_primary(coins), synced_at)
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"Coin list sync failed: {e}")
+            return None
+        logger.info(f"Coin registry synced: {len(coins)} coins")
+        return synced_at
+
+    async def _load(
+        self, coins: List[CoinEntry], source: str, synced_at: Optional[datetime]
+    ) -> None:
+        # Сортировка десятков тысяч ключей — в потоке, не в event loop
+        self.index = await asyncio.to_thread(CoinIndex, coins)
+        self.source = source
+        self.synced_at = synced_at
+        logger.info(f"Coin registry loaded from {source}: {len(coins)} coins")
+
+    async def load_snapshot(self) -> None:
+        if self.snapshot_path is None or not self.snapshot_path.exists():
+            return
+        try:
+            data = orjson.loads(await asyncio.to_thread(self.snapshot_path.read_bytes))
+            synced_at = data["synced_at"] and datetime.fromisoformat(data["synced_at"])
+            coins = [CoinEntry(*coin) for coin in data["coins"]]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Coin registry snapshot ignored: {e}")
+            return
+        await self._load(coins, "snapshot", synced_at)
+
+    def _save_snapshot(self) -> None:
+        if self.snapshot_path is None:
+            return
+        data = {
+            "synced_at": self.synced_at.isoformat() if self.synced_at else None,
+            "coins": [tuple(coin) for coin in self.index.coins],
+        }
+        # Запись через временный файл: читатель не увидит половину снимка
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(orjson.dumps(data))
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Coin registry snapshot not saved: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "coins": len(self.index),
+            "synced_at": self.synced_at,
+        }
+
+
+coin_registry = CoinRegistry(
+    snapshot_path=settings.COIN_REGISTRY_SNAPSHOT,
+    sync_interval=settings.COIN_REGISTRY_SYNC_INTERVAL,
+    refresh_interval=settings.COIN_REGISTRY_REFRESH,
+)
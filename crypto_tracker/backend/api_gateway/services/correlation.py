@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime
+from functools import partial
+from typing import Iterable, Sequence, Tuple
+
+import numpy as np
+import orjson
+from core.cache import get_symbol_seqs, price_key
+from core.config import settings
+from core.database import async_session
+from repositories.price_history import get_symbols_price_history
+from services.history_format import EPOCH, MILLISECOND, epoch_ms_array
+from services.tick_cache import TickCache
+from sqlalchemy import Row
+
+# Шаг общей сетки времени, секунд
+RESOLUTIONS = {"5m": 300, "1h": 3600, "1d": 86400}
+
+Pair = Tuple[str, str]  # (symbol, quote)
+CorrelationKey = Tuple[Tuple[Pair, ...], str, int]  # (pairs, resolution, points)
+
+
+def align_prices(
+    pair_index: np.ndarray,
+    timestamps: np.ndarray,
+    prices: np.ndarray,
+    pairs: int,
+    start: int,
+    step: int,
+    points: int,
+) -> np.ndarray:
+    """
+    Ряды на общей сетке: массив (pairs, points), в точке k — последняя
+    цена до конца k-го интервала; интервал без тиков — предыдущая цена,
+    до первой цены ряда — NaN.
+
+    Строки отсортированы по паре, затем по времени, поэтому номера
+    ячеек pair * points + интервал не убывают и последняя строка ячейки —
+    та, за которой идет другая ячейка. Без цикла по парам и точкам.
+    """
+    grid = np.full((pairs, points), np.nan)
+    cells = pair_index * points + (timestamps - start) // step
+    last = np.flatnonzero(np.diff(cells, append=-1) != 0)
+    grid.flat[cells[last]] = prices[last]
+    # Номер последней заполненной точки слева — источник значения
+    source = np.where(np.isnan(grid), 0, np.arange(points))
+    np.maximum.accumulate(source, axis=1, out=source)
+    return np.take_along_axis(grid, source, axis=1)
+
+
+def return_matrices(grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Ковариация и корреляция лог-доходностей за шаг сетки — одним
+    матричным произведением по всем парам. Учитываются только интервалы,
+    где есть доходности всех рядов. Возвращает (cov, corr, интервалов)
+    """
+    returns = np.diff(np.log(grid), axis=1)
+    returns = returns[:, ~np.isnan(returns).any(axis=0)]
+    observations = returns.shape[1]
+    pairs = len(grid)
+    if observations < 2:
+        empty = np.full((pairs, pairs), np.nan)
+        return empty, empty, observations
+    centered = returns - returns.mean(axis=1, keepdims=True)
+    covariance = centered @ centered.T / (observations - 1)
+    deviation = np.sqrt(np.diag(covariance))
+    # Ряд без движения цены — корреляция не определена (null)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / np.outer(deviation, deviation)
+    np.clip(correlation, -1.0, 1.0, out=correlation)
+    return covariance, correlation, observations
+
+
+def encode_correlation(
+    key: CorrelationKey, start: int, end: int, rows: Sequence[Row]
+) -> bytes:
+    """
+    Ответ /assets/correlation: метки рядов ("BTC", "ETH/EUR") в порядке
+    строк и столбцов матриц, границы сетки (мс Unix) и число интервалов
+    """
+    pairs, resolution, points = key
+    index = {pair: position for position, pair in enumerate(pairs)}
+    pair_index = np.fromiter(
+        (index[(row.symbol, row.quote)] for row in rows),
+        dtype=np.int64,
+        count=len(rows),
+    )
+    timestamps = epoch_ms_array([row.recorded_at for row in rows])
+    prices = np.fromiter((row.price for row in rows), dtype=np.float64, count=len(rows))
+    step = RESOLUTIONS[resolution] * 1000
+    grid = align_prices(pair_index, timestamps, prices, len(pairs), start, step, points)
+    covariance, correlation, observations = return_matrices(grid)
+    return orjson.dumps(
+        {
+            "symbols": [price_key(symbol, quote) for symbol, quote in pairs],
+            "resolution": resolution,
+            "start": start,
+            "end": end,
+            "observations": observations,
+            "correlation": correlation,
+            "covariance": covariance,
+        },
+        option=orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+correlation_cache = TickCache("correlation", max_size=settings.CORRELATION_CACHE_SIZE)
+
+
+async def _compute(key: CorrelationKey, start: int, end: int) -> bytes:
+    # Своя сессия: расчет переживает запрос, который его начал
+    async with async_session() as db:
+        rows = await get_symbols_price_history(
+            db, key[0], EPOCH + start * MILLISECOND, EPOCH + end * MILLISECOND
+        )
+    return await asyncio.to_thread(encode_correlation, key, start, end, rows)
+
+
+async def get_correlation(pairs: Iterable[Pair], resolution: str, points: int) -> bytes:
+    """
+    Матрицы для набора символов — из кэша или одним расчетом на всех.
+
+    Сетка заканчивается на последнем закрытом интервале, поэтому ответ
+    зависит от набора, шага и числа точек, а меняется с новым интервалом
+    или тиком любого символа набора
+    """
+    key = (tuple(sorted(set(pairs))), resolution, points)
+    step = RESOLUTIONS[resolution] * 1000
+    end = (datetime.utcnow() - EPOCH) // MILLISECOND // step * step
+    start = end - points * step
+    seqs = await get_symbol_seqs(sorted({symbol for symbol, _ in key[0]}))
+    version = (end, sum(seqs)) if seqs is not None else None
+    return await correlation_cache.get(key, version, partial(_compute, key, start, end))
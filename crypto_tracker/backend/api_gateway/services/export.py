@@ -0,0 +1,34 @@
+from typing import AsyncIterator, Sequence
+
+import orjson
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def iter_csv(chunks: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """
+    CSV по частям: одна порция строк из курсора — один кусок ответа
+    """
+    yield b"timestamp,price\n"
+    async for rows in chunks:
+        yield "".join(f"{ts.isoformat()},{price}\n" for ts, price in rows).encode()
+
+
+async def iter_ndjson(chunks: AsyncIterator[Sequence]) -> AsyncIterator[bytes]:
+    """
+    NDJSON по частям: {"recorded_at": ..., "price": ...} на строку
+    """
+    async for rows in chunks:
+        yield b"".join(
+            orjson.dumps({"recorded_at": ts, "price": price}) + b"\n"
+            for ts, price in rows
+        )
+
+
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+}
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+import msgpack
+import numpy as np
+import orjson
+
+# Поддерживаемые представления истории цен
+FORMAT_JSON = "json"  # Список объектов PriceHistory (как раньше)
+FORMAT_COLUMNAR = "columnar"  # {"t": [...], "p": [...]}
+FORMAT_MSGPACK = "msgpack"  # Тот же колоночный вид в msgpack
+
+MEDIA_TYPES = {
+    FORMAT_COLUMNAR: "application/vnd.cryptotracker.columnar+json",
+    FORMAT_MSGPACK: "application/x-msgpack",
+}
+ACCEPT_ALIASES = {
+    "application/json": FORMAT_JSON,
+    "application/*": FORMAT_JSON,
+    "*/*": FORMAT_JSON,
+    "application/vnd.cryptotracker.columnar+json": FORMAT_COLUMNAR,
+    "application/x-msgpack": FORMAT_MSGPACK,
+    "application/msgpack": FORMAT_MSGPACK,
+    "application/vnd.msgpack": FORMAT_MSGPACK,
+}
+
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+
+def parse_accept(accept: str) -> List[Tuple[str, float]]:
+    """
+    Заголовок Accept -> [(media type, q)] в порядке заголовка.
+    Без q= — 1.0, нечисловой q — 0 (неприемлемо)
+    """
+    ranges = []
+    for media_range in accept.split(","):
+        media_type, *params = media_range.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_type.strip().lower(), quality))
+    return ranges
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Выбор формата: явный параметр ?format=... важнее заголовка Accept.
+    Из Accept — поддерживаемый тип с наибольшим q (при равных — первый
+    в заголовке), q=0 — неприемлемо. Если подходящего нет — обычный JSON,
+    а не 406: прежние клиенты шлют что угодно.
+    """
+    if requested:
+        return requested
+    if accept:
+        best = max(
+            (
+                (quality, -position, ACCEPT_ALIASES[media_type])
+                for position, (media_type, quality) in enumerate(parse_accept(accept))
+                if media_type in ACCEPT_ALIASES and quality > 0
+            ),
+            default=None,
+        )
+        if best is not None:
+            return best[2]
+    return FORMAT_JSON
+
+
+def to_epoch_ms(timestamps: Sequence[datetime]) -> List[int]:
+    """
+    Наивные даты из БД (UTC) в миллисекунды Unix
+    """
+    return [(ts - EPOCH) // MILLISECOND for ts in timestamps]
+
+
+def epoch_ms_array(timestamps: Sequence[datetime]) -> np.ndarray:
+    """
+    То же, что to_epoch_ms, массивом int64 для расчетов NumPy.
+    Через total_seconds() — в разы быстрее преобразования в datetime64.
+    Округление до микросекунд точное для дат до 2100 года
+    """
+    seconds = np.fromiter(
+        ((ts - EPOCH).total_seconds() for ts in timestamps),
+        dtype=np.float64,
+        count=len(timestamps),
+    )
+    return np.rint(seconds * 1_000_000).astype(np.int64) // 1000
+
+
+def encode_columnar(timestamps: Sequence[datetime], prices: Sequence[float]) -> bytes:
+    """
+    Колоночный JSON: каждый ключ один раз, время — в мс Unix
+    """
+    return orjson.dumps({"t": to_epoch_ms(timestamps), "p": list(prices)})
+
+
+def encode_msgpack(timestamps: Sequence[datetime], prices: Sequence[float]) -> bytes:
+    """
+    Колоночный msgpack: {"t": [int, ...], "p": [float, ...]}
+    """
+    return msgpack.packb(
+        {"t": to_epoch_ms(timestamps), "p": list(prices)}, use_bin_type=True
+    )
+
+
+ENCODERS = {
+    FORMAT_COLUMNAR: encode_columnar,
+    FORMAT_MSGPACK: encode_msgpack,
+}
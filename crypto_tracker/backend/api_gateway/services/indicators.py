@@ -0,0 +1,180 @@
+import asyncio
+from functools import partial
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import orjson
+from core.cache import get_symbol_seq
+from core.config import settings
+from core.database import async_session
+from numpy.lib.stride_tricks import sliding_window_view
+from repositories.price_history import get_symbol_price_series
+from services.history_format import epoch_ms_array
+from services.tick_cache import TickCache
+from sqlalchemy import Row
+
+BOLLINGER_WIDTH = 2.0  # Ширина полос Боллинджера, в стандартных отклонениях
+# Сколько окон истории читать сверх запрошенных точек: EMA и RSI зависят
+# от всего прошлого ряда, вклад отброшенной части не больше e^-10
+WARMUP_WINDOWS = 10
+SECONDS_PER_YEAR = 365 * 24 * 3600
+# Предел показателя степени в ewm: e^300 далеко от переполнения float64
+EWM_MAX_EXPONENT = 300.0
+
+IndicatorKey = Tuple[str, str, int, int]  # (symbol, quote, window, points)
+
+
+# -------------Расчет-------------------
+def ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Экспоненциальное сглаживание y[i] = alpha*x[i] + (1-alpha)*y[i-1], y[0] = x[0].
+
+    Рекурсия в замкнутой форме по блокам: внутри блока
+    y[j] = d^j * (d*y_prev + alpha*cumsum(x[k] / d^k)), d = 1 - alpha.
+    Длина блока ограничена, чтобы d^-k не переполнился. Значения
+    неотрицательные (цены, рост, падение) — в суммах нет сокращения.
+    """
+    decay = 1.0 - alpha
+    result = np.empty_like(values)
+    if not len(values):
+        return result
+    block = max(1, int(EWM_MAX_EXPONENT / -np.log(decay)))
+    previous = values[0]
+    for start in range(0, len(values), block):
+        end = min(start + block, len(values))
+        powers = decay ** np.arange(end - start)
+        accumulated = alpha * np.cumsum(values[start:end] / powers)
+        result[start:end] = powers * (decay * previous + accumulated)
+        previous = result[end - 1]
+    return result
+
+
+def sma(prices: np.ndarray, window: int) -> np.ndarray:
+    result = np.full(len(prices), np.nan)
+    first = window - 1
+    if len(prices) >= window:
+        result[first:] = sliding_window_view(prices, window).mean(axis=1)
+    return result
+
+
+def ema(prices: np.ndarray, window: int) -> np.ndarray:
+    return ewm(prices, 2.0 / (window + 1))
+
+
+def rsi(prices: np.ndarray, window: int) -> np.ndarray:
+    """
+    RSI со сглаживанием Уайлдера (alpha = 1/window); первые window точек — NaN
+    """
+    result = np.full(len(prices), np.nan)
+    if len(prices) <= window:
+        return result
+    deltas = np.diff(prices)
+    gains = ewm(np.clip(deltas, 0.0, None), 1.0 / window)
+    losses = ewm(np.clip(-deltas, 0.0, None), 1.0 / window)
+    total = gains + losses
+    # Цена не менялась: ни роста, ни падения — нейтральные 50
+    strength = np.divide(gains, total, out=np.full(len(total), 0.5), where=total > 0)
+    # strength[i] — по изменениям до цены i + 1
+    first = window - 1
+    result[window:] = 100.0 * strength[first:]
+    return result
+
+
+def bollinger(
+    prices: np.ndarray, window: int, middle: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    deviation = np.full(len(prices), np.nan)
+    first = window - 1
+    if len(prices) >= window:
+        deviation[first:] = sliding_window_view(prices, window).std(axis=1)
+    return middle + BOLLINGER_WIDTH * deviation, middle - BOLLINGER_WIDTH * deviation
+
+
+def realized_volatility(
+    timestamps: np.ndarray, prices: np.ndarray, window: int
+) -> np.ndarray:
+    """
+    Стандартное отклонение лог-доходностей за window тиков,
+    в годовом выражении (шаг — медианный интервал между тиками)
+    """
+    result = np.full(len(prices), np.nan)
+    if len(prices) <= window:
+        return result
+    step = np.median(np.diff(timestamps)) / 1000
+    if step <= 0:
+        return result
+    returns = np.diff(np.log(prices))
+    deviation = sliding_window_view(returns, window).std(axis=1, ddof=1)
+    result[window:] = deviation * np.sqrt(SECONDS_PER_YEAR / step)
+    return result
+
+
+def compute_indicators(
+    timestamps: np.ndarray, prices: np.ndarray, window: int
+) -> Dict[str, np.ndarray]:
+    """
+    Индикаторы по ряду цен (старые первыми); массивы той же длины,
+    точки без полного окна — NaN
+    """
+    middle = sma(prices, window)
+    upper, lower = bollinger(prices, window, middle)
+    return {
+        "sma": middle,
+        "ema": ema(prices, window),
+        "rsi": rsi(prices, window),
+        "bb_upper": upper,
+        "bb_lower": lower,
+        "volatility": realized_volatility(timestamps, prices, window),
+    }
+
+
+def encode_indicators(
+    key: IndicatorKey, seq: Optional[int], rows: Sequence[Row]
+) -> bytes:
+    """
+    Ответ /indicators: колонки t (мс Unix), price и индикаторы,
+    последние points точек. NaN (нет полного окна) — null
+    """
+    symbol, quote, window, points = key
+    # Строки из БД — новые первыми; ряд нужен по возрастанию времени
+    timestamps = epoch_ms_array([row.recorded_at for row in reversed(rows)])
+    prices = np.fromiter(
+        (row.price for row in reversed(rows)), dtype=np.float64, count=len(rows)
+    )
+    start = max(len(prices) - points, 0)
+    columns = {"t": timestamps, "price": prices}
+    columns.update(compute_indicators(timestamps, prices, window))
+    return orjson.dumps(
+        {
+            "symbol": symbol,
+            "quote": quote,
+            "window": window,
+            "tick": seq,
+            **{name: column[start:] for name, column in columns.items()},
+        },
+        option=orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+indicator_cache = TickCache("indicators", max_size=settings.INDICATOR_CACHE_SIZE)
+
+
+async def _compute(key: IndicatorKey, seq: Optional[int]) -> bytes:
+    symbol, quote, window, points = key
+    # Своя сессия: расчет переживает запрос, который его начал
+    async with async_session() as db:
+        rows = await get_symbol_price_series(
+            db, symbol, quote, points + WARMUP_WINDOWS * window
+        )
+    # Окна по тысячам точек — в потоке, не в event loop
+    return await asyncio.to_thread(encode_indicators, key, seq, rows)
+
+
+async def get_indicators(symbol: str, quote: str, window: int, points: int) -> bytes:
+    """
+    Индикаторы символа в валюте котировки — из кэша текущего тика
+    или одним расчетом на всех ожидающих
+    """
+    key = (symbol, quote, window, points)
+    seq = await get_symbol_seq(symbol)
+    return await indicator_cache.get(key, seq, partial(_compute, key, seq))
@@ -1,54 +1,150 @@
+import asyncio
 import logging
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Sequence
 
 import aiohttp
 from core.config import settings
+from core.metrics import PROVIDER_LATENCY, PROVIDER_REQUESTS
+from core.tracing import traced
+from services.coin_registry import coin_registry
 
 logger = logging.getLogger("price_api_getaway")
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
-SYMBOL_MAP = {
-    "BTC": "bitcoin",
-    "ETH": "ethereum",
-    "ADA": "cardano",
-    "DOT": "polkadot",
-    "SOL": "solana",
-}
+# Первая страница /coins/markets: ранги по капитализации для топ-монет
+MARKETS_PAGE_SIZE = 250
 
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
 
-def symbol_to_id(symbol: str) -> str:
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Общая сессия aiohttp: пул соединений и DNS-кэш переиспользуются
+    между запросами к провайдеру. Создается при прогреве (/ready)
+    или при первом запросе; привязана к event loop, в котором создана.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        _session_loop = loop
+    return _session
+
+
+async def close_http_session() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def symbol_to_id(symbol: str) -> Optional[str]:
     """
-    Конвертирует символ (BTC, ETH…) в ID для CoinGecko API.
+    Конвертирует символ (BTC, ETH…) в ID для CoinGecko API по реестру монет.
     """
-    return SYMBOL_MAP.get(symbol.upper(), symbol.lower())
+    return coin_registry.coin_id(symbol)
 
 
-async def get_current_price(symbol: str) -> Optional[float]:
+@traced("price_provider.get_current_prices")
+async def get_current_prices(symbol: str, quotes: Sequence[str]) -> Dict[str, float]:
     """
-    Получить текущую цену криптовалюты.
+    Текущая цена криптовалюты в нескольких валютах котировки одним запросом:
+    {quote: price}, без валют, для которых цена не пришла или некорректна.
     """
     coin_id = symbol_to_id(symbol)
-    url = "https://api.coingecko.com/api/v3/simple/price"
+    if coin_id is None:
+        logger.warning(f"Unknown symbol {symbol}, not in coin registry")
+        return {}
+    url = f"{settings.COINGECKO_API_URL}/simple/price"
     headers = {"x-cg-demo-api-key": settings.CRYPTO_API_KEY}
-    params = {"ids": coin_id, "vs_currencies": "usd"}
+    params = {
+        "ids": coin_id,
+        "vs_currencies": ",".join(quote.lower() for quote in quotes),
+    }
 
+    started = time.perf_counter()
+    outcome = "exception"
     try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    price = data.get(coin_id, {}).get("usd")
+        session = get_http_session()
+        async with session.get(url, params=params, headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                prices = {}
+                for quote in quotes:
+                    price = data.get(coin_id, {}).get(quote.lower())
                     if price is None or price <= 0 or price > 1_000_000_000:
-                        logger.warning(f"Invalid price received: {price}")
-                        return None
-                    return float(price)
+                        logger.warning(f"Invalid price received: {price} {quote}")
+                        continue
+                    prices[quote] = float(price)
+                outcome = "ok" if prices else "invalid"
+                return prices
 
-                print(f"API error {response.status}")
-                return None
+            outcome = "http_error"
+            logger.warning(f"API error {response.status}")
+            return {}
 
     except Exception as e:
-        print(f"Error fetching price: {e}")
-        return None
+        logger.warning(f"Error fetching price: {e}")
+        return {}
+
+    finally:
+        PROVIDER_LATENCY.observe(time.perf_counter() - started)
+        PROVIDER_REQUESTS.labels(outcome).inc()
+
+
+async def get_current_price(symbol: str, quote: str = "USD") -> Optional[float]:
+    """
+    Получить текущую цену криптовалюты в валюте quote.
+    """
+    return (await get_current_prices(symbol, [quote])).get(quote)
+
+
+async def _get_json(path: str, params: dict):
+    url = f"{settings.COINGECKO_API_URL}{path}"
+    headers = {"x-cg-demo-api-key": settings.CRYPTO_API_KEY}
+    started = time.perf_counter()
+    outcome = "exception"
+    try:
+        session = get_http_session()
+        async with session.get(url, params=params, headers=headers) as response:
+            outcome = "http_error"
+            response.raise_for_status()
+            data = await response.json()
+            outcome = "ok"
+            return data
+    finally:
+        PROVIDER_LATENCY.observe(time.perf_counter() - started)
+        PROVIDER_REQUESTS.labels(outcome).inc()
+
+
+@traced("price_provider.fetch_coin_list")
+async def fetch_coin_list() -> List[dict]:
+    """
+    Полный список монет провайдера для реестра: id, symbol, name и rank
+    (место по капитализации — только для первой страницы /coins/markets)
+    """
+    coins = await _get_json("/coins/list", {})
+    markets = await _get_json(
+        "/coins/markets",
+        {
+            "vs_currency": "usd",
+            "order": "market_cap_desc",
+            "per_page": MARKETS_PAGE_SIZE,
+            "page": 1,
+        },
+    )
+    ranks = {coin["id"]: coin.get("market_cap_rank") for coin in markets}
+    return [
+        {
+            "id": coin["id"],
+            "symbol": coin["symbol"].upper(),
+            "name": coin["name"],
+            "rank": ranks.get(coin["id"]),
+        }
+        for coin in coins
+        if coin.get("id") and coin.get("symbol")
+    ]
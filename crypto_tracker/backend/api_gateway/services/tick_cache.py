@@ -0,0 +1,81 @@
+import asyncio
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from core.metrics import cache_result
+
+
+class TickCache:
+    """
+    Готовые ответы расчетов по ценам в памяти процесса.
+
+    Запись помечена версией данных (номера тиков из prices:seq, растут
+    с каждым тиком) и действительна, пока worker не запишет следующий
+    тик: все пользователи с тем же ключом делят одно вычисление.
+    Одновременные промахи по ключу ждут одну задачу. Без Redis версия
+    неизвестна — ответ считается на каждый запрос.
+    """
+
+    def __init__(self, name: str, max_size: int):
+        self.name = name
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()  # key -> (version, body)
+        self._pending: Dict[Tuple[Hashable, Any], asyncio.Task] = {}
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+
+    async def get(
+        self,
+        key: Hashable,
+        version: Optional[Any],
+        compute: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        if version is None:
+            self.misses += 1
+            cache_result(self.name, False)
+            return await compute()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            cache_result(self.name, True)
+            return entry[1]
+
+        task = self._pending.get((key, version))
+        if task is None:
+            self.misses += 1
+            cache_result(self.name, False)
+            task = asyncio.ensure_future(compute())
+            self._pending[(key, version)] = task
+            task.add_done_callback(partial(self._store, key, version))
+        else:
+            self.shared += 1
+            cache_result(self.name, True)
+        # Отмена одного ожидающего (клиент ушел) не отменяет расчет для остальных
+        return await asyncio.shield(task)
+
+    def _store(self, key: Hashable, version: Any, task: asyncio.Task) -> None:
+        del self._pending[(key, version)]
+        if task.cancelled() or task.exception() is not None:
+            return
+        entry = self._entries.get(key)
+        # Расчет по старым данным не затирает запись более новой версии
+        if entry is not None and entry[0] > version:
+            return
+        self._entries[key] = (version, task.result())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.shared + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "shared": self.shared,
+            "misses": self.misses,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Set
+
+import orjson
+from core.cache import PRICES_CHANNEL, get_redis
+from core.config import settings
+from core.tracing import start_span
+from redis.exceptions import RedisError
+
+logger = logging.getLogger("tick_stream")
+
+
+def format_event(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+async def iter_tick_events(keys: Set[str]) -> AsyncIterator[bytes]:
+    """
+    Server-Sent Events: цены активов пользователя после каждого тика.
+    keys — ключи цен (price_key): "BTC" для USD, "BTC/EUR" для других котировок.
+
+    Тики приходят из Redis Pub/Sub от worker'а вместе с контекстом трассы:
+    спан отправки клиенту продолжает трассу тика, поэтому в коллекторе
+    видна задержка от запроса к провайдеру до отправки клиенту.
+    """
+    redis = get_redis()
+    pubsub = redis.pubsub()
+    try:
+        await pubsub.subscribe(PRICES_CHANNEL)
+        yield b": connected\n\n"
+
+        while True:
+            try:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=settings.STREAM_HEARTBEAT
+                )
+            except (RedisError, asyncio.TimeoutError) as e:
+                logger.warning(f"Tick stream interrupted: {e}")
+                return
+            if message is None:
+                yield b": ping\n\n"
+                continue
+
+            tick = orjson.loads(message["data"])
+            prices = {
+                key: price for key, price in tick["prices"].items() if key in keys
+            }
+            if not prices:
+                continue
+
+            with start_span("push tick", parent=tick.get("trace")) as span:
+                latency_ms = round((time.time() - tick["published_at"]) * 1000, 2)
+                span.set_attribute("tick", tick["tick"])
+                span.set_attribute("tick.symbols", len(prices))
+                span.set_attribute("tick.publish_to_push_ms", latency_ms)
+                event = format_event(
+                    "tick",
+                    {
+                        "tick": tick["tick"],
+                        "prices": prices,
+                        "published_at": tick["published_at"],
+                        "trace_id": tick.get("trace_id"),
+                    },
+                )
+            yield event
+    finally:
+        await pubsub.aclose()
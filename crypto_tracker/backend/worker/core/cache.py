@@ -0,0 +1,40 @@
+from typing import Optional
+
+from core.config import settings
+from redis import asyncio as aioredis
+
+# Ключи, которые читает api_gateway для ETag и текущих цен
+PRICES_TICK_KEY = "prices:tick"  # Глобальный номер тика
+PRICES_TICK_AT_KEY = "prices:tick_at"  # Время последнего тика, Unix
+PRICES_SEQ_KEY = "prices:seq"  # Номер тика по каждому символу
+PRICES_LATEST_KEY = "prices:latest"  # Последняя цена по каждому символу, USD
+PRICES_FX_KEY = "prices:fx"  # Единиц валюты котировки за 1 USD
+PRICES_CHANNEL = "prices:ticks"  # Pub/Sub: тик с ценами и контекстом трассы
+
+BASE_QUOTE = "USD"
+
+
+def price_key(symbol: str, quote: str) -> str:
+    """Ключ цены в тике: "BTC" для USD, "BTC/EUR" для других котировок"""
+    return symbol if quote == BASE_QUOTE else f"{symbol}/{quote}"
+
+
+_redis: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """
+    Ленивое создание клиента Redis.
+    Если REDIS_URL пустой — публикация тиков отключена.
+    """
+    global _redis
+    if not settings.REDIS_URL:
+        return None
+    if _redis is None:
+        _redis = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+        )
+    return _redis
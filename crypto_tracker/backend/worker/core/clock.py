@@ -0,0 +1,33 @@
+import asyncio
+from datetime import datetime, timedelta
+
+
+class RealClock:
+    """Обычное время: datetime.utcnow и asyncio.sleep"""
+
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Виртуальное время для воспроизведения истории цен.
+
+    Время идет только в sleep(): сдвигается на seconds, а реально
+    ждет seconds / speed (speed=0 — не ждет совсем). Работа тика
+    виртуального времени не занимает, поэтому прогон детерминирован.
+    """
+
+    def __init__(self, start: datetime, speed: float = 1000):
+        self._now = start
+        self.speed = speed
+
+    def now(self) -> datetime:
+        return self._now
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds / self.speed if self.speed else 0)
+        self._now += timedelta(seconds=seconds)
@@ -8,10 +8,23 @@ BACKEND_DIR = Path(__file__).parent.parent.parent
 class Settings(BaseSettings):
     DATABASE_URL: str
     CRYPTO_API_KEY: str
+    COINGECKO_API_URL: str = "https://api.coingecko.com/api/v3"
+    REDIS_URL: str = "redis://redis:6379/0"
 
     PRICE_UPDATE_INTERVAL: int = 300  # 5 минут по умолчанию
     WORKER_ERROR_DELAY: int = 60  # 1 минута при ошибках
+    PRICE_BATCH_SIZE: int = 250  # монет в одном запросе к провайдеру
     SENTRY_DSN: str = ""
+    SQL_ECHO: bool = False  # Логировать каждый SQL-запрос (только для отладки)
+    SLOW_QUERY_MS: int = 0  # Логировать запросы дольше N мс, 0 — отключено
+    # Трассировка OpenTelemetry: адрес OTLP/HTTP коллектора, пусто — отключена
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = ""
+    OTEL_SERVICE_NAME: str = "crypto-tracker-worker"
+    METRICS_PORT: int = 9100  # Порт /metrics для Prometheus, 0 — отключить
+    # Мониторинг event loop: задержка планирования и детектор блокировок
+    LOOP_MONITOR_INTERVAL: float = 0.5  # секунд между замерами
+    LOOP_BLOCK_THRESHOLD_MS: int = 100  # блокировка дольше — стек в лог
+    LOOP_BLOCK_DETECTOR: bool = False  # сторожевой поток, только для отладки
 
     class Config:
         env_file = BACKEND_DIR / ".env"
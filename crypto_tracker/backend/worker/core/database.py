@@ -1,10 +1,16 @@
 from core.config import settings
+from core.metrics import DB_POOL_CHECKED_OUT
+from core.sql_log import install_slow_query_log
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 DATABASE_URL = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+# Эхо всех запросов только для отладки; в работе — лог медленных запросов
+engine = create_async_engine(DATABASE_URL, echo=settings.SQL_ECHO)
+if settings.SLOW_QUERY_MS:
+    install_slow_query_log(engine.sync_engine, settings.SLOW_QUERY_MS)
+DB_POOL_CHECKED_OUT.set_function(engine.pool.checkedout)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
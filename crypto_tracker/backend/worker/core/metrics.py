@@ -0,0 +1,77 @@
+import time
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+
+# -------------Tick-------------------
+TICK_DURATION = Histogram(
+    "worker_tick_duration_seconds",
+    "Длительность одного тика обновления цен",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+TICKS = Counter("worker_ticks_total", "Тики по результату (ok, error)", ["outcome"])
+TICK_ASSETS = Gauge("worker_tick_assets", "Активных активов в последнем тике")
+TICK_SYMBOLS = Gauge("worker_tick_symbols", "Уникальных символов в последнем тике")
+TICK_PHASE_DURATION = Histogram(
+    "worker_tick_phase_duration_seconds",
+    "Длительность фаз тика (load_assets, fetch, write, publish, alerts)",
+    ["phase"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+TICK_ALERTS = Counter("worker_alerts_total", "Сработавшие пороги цен", ["direction"])
+TICK_UPDATED = Gauge("worker_tick_updated_assets", "Обновлено активов за последний тик")
+
+# -------------Price provider-------------------
+PROVIDER_LATENCY = Histogram(
+    "price_provider_request_duration_seconds",
+    "Время запроса к провайдеру цен",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PROVIDER_REQUESTS = Counter(
+    "price_provider_requests_total",
+    "Запросы к провайдеру цен по результату (ok, http_error, invalid, exception)",
+    ["outcome"],
+)
+
+# -------------Event loop-------------------
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Задержка планирования event loop (насколько позже проснулась корутина)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total", "Блокировки event loop дольше LOOP_BLOCK_THRESHOLD_MS"
+)
+
+# -------------DB pool-------------------
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Соединения, выданные из пула")
+
+
+class PriceStalenessCollector:
+    """
+    Возраст последней полученной цены по каждому символу.
+    Считается в момент опроса, поэтому растет и тогда,
+    когда worker завис и сам ничего не обновляет.
+    """
+
+    def __init__(self):
+        self.updated_at: Dict[str, float] = {}
+
+    def mark_updated(self, symbol: str) -> None:
+        self.updated_at[symbol] = time.time()
+
+    def collect(self):
+        staleness = GaugeMetricFamily(
+            "price_staleness_seconds",
+            "Сколько секунд назад получена последняя цена символа",
+            labels=["symbol"],
+        )
+        now = time.time()
+        for symbol, updated_at in list(self.updated_at.items()):
+            staleness.add_metric([symbol], now - updated_at)
+        yield staleness
+
+
+price_staleness = PriceStalenessCollector()
+REGISTRY.register(price_staleness)
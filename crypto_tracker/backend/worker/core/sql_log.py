@@ -0,0 +1,56 @@
+import hashlib
+import logging
+import re
+import time
+from typing import Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger("price_worker.sql")
+
+_WHITESPACE = re.compile(r"\s+")
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PARAMS = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """
+    Нормализованный текст запроса и короткий хэш от него:
+    литералы и параметры заменяются на ?, списки (?, ?, ...) — на (?+).
+    Запросы, отличающиеся только значениями, получают один отпечаток.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _STRINGS.sub("?", normalized)
+    normalized = _PARAMS.sub("?", normalized)
+    normalized = _NUMBERS.sub("?", normalized)
+    normalized = _VALUE_LISTS.sub("(?+)", normalized)
+    digest = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+    return digest, normalized
+
+
+def install_slow_query_log(engine, threshold_ms: int) -> None:
+    """
+    Логировать запросы дольше threshold_ms вместе с отпечатком.
+    Параметры запросов в лог не попадают.
+    """
+    threshold = threshold_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed < threshold:
+            return
+        digest, normalized = fingerprint(statement)
+        logger.warning(
+            f"Slow query {elapsed * 1000:.1f} ms fingerprint={digest}: {normalized}"
+        )
@@ -0,0 +1,65 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.metrics import TICK_DURATION, TICK_PHASE_DURATION, TICKS
+from core.tracing import start_span
+
+logger = logging.getLogger("price_worker.tick")
+
+
+class TickRecord:
+    """
+    Структурированная запись об одном тике worker'а.
+
+    Копит длительность фаз, счетчики и сбои, а в конце тика
+    выводит одну JSON-строку в лог и обновляет метрики.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.utcnow()
+        self._started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.failures: Dict[str, List[str]] = {}
+        self.outcome = "ok"
+        self.error: Optional[str] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            with start_span(f"tick.{name}"):
+                yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] = round(elapsed * 1000, 2)
+            TICK_PHASE_DURATION.labels(name).observe(elapsed)
+
+    def fail(self, phase: str, item: str) -> None:
+        self.failures.setdefault(phase, []).append(item)
+
+    def set_error(self, error: Exception) -> None:
+        self.outcome = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def as_dict(self) -> dict:
+        return {
+            "event": "tick",
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round((time.perf_counter() - self._started) * 1000, 2),
+            "outcome": self.outcome,
+            "phases_ms": self.phases,
+            "counts": self.counts,
+            "failures": self.failures,
+            "error": self.error,
+        }
+
+    def emit(self) -> None:
+        TICK_DURATION.observe(time.perf_counter() - self._started)
+        TICKS.labels(self.outcome).inc()
+        level = logging.INFO if self.outcome == "ok" else logging.ERROR
+        logger.log(level, json.dumps(self.as_dict(), ensure_ascii=False))
@@ -0,0 +1,97 @@
+import functools
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from core.config import settings
+
+# opentelemetry — опциональная зависимость. Без коллектора спаны некуда
+# отправлять, поэтому и импорт (~100 мс на старте) не нужен
+trace = None
+if settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+    try:
+        from opentelemetry import propagate, trace
+    except ImportError:
+        trace = None
+
+TRACING_AVAILABLE = trace is not None
+TRACER_NAME = "crypto_tracker.worker"
+
+logger = logging.getLogger("price_worker.tracing")
+
+
+def setup_tracing() -> None:
+    """
+    Экспорт спанов в OTLP-коллектор, если задан OTEL_EXPORTER_OTLP_ENDPOINT.
+    Без него (или без opentelemetry) спаны не создаются.
+    """
+    if not settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    if not TRACING_AVAILABLE:
+        logger.warning(
+            "OTEL_EXPORTER_OTLP_ENDPOINT is set, but opentelemetry is missing"
+        )
+        return
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME})
+    )
+    provider.add_span_processor(
+        BatchSpanProcessor(
+            OTLPSpanExporter(
+                endpoint=f"{settings.OTEL_EXPORTER_OTLP_ENDPOINT.rstrip('/')}/v1/traces"
+            )
+        )
+    )
+    trace.set_tracer_provider(provider)
+    logger.info(f"Tracing enabled, exporting to {settings.OTEL_EXPORTER_OTLP_ENDPOINT}")
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+
+@contextmanager
+def start_span(name: str):
+    if not TRACING_AVAILABLE:
+        yield _NoopSpan()
+        return
+    with trace.get_tracer(TRACER_NAME).start_as_current_span(name) as span:
+        yield span
+
+
+def traced(name: Optional[str] = None):
+    """Декоратор для корутин: вызов — отдельный спан"""
+
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with start_span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def inject_context() -> Dict[str, str]:
+    """Контекст текущего спана (traceparent) для передачи в gateway"""
+    carrier: Dict[str, str] = {}
+    if TRACING_AVAILABLE:
+        propagate.inject(carrier)
+    return carrier
+
+
+def current_trace_id() -> Optional[str]:
+    if not TRACING_AVAILABLE:
+        return None
+    span_context = trace.get_current_span().get_span_context()
+    return format(span_context.trace_id, "032x") if span_context.is_valid else None
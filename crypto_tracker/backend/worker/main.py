@@ -1,12 +1,27 @@
 import asyncio
 import logging
-from datetime import datetime
 
+from core.cache import BASE_QUOTE
+from core.clock import RealClock
 from core.config import settings
 from core.database import get_async_session
+from core.loop_monitor import loop_monitor
+from core.metrics import (
+    TICK_ALERTS,
+    TICK_ASSETS,
+    TICK_SYMBOLS,
+    TICK_UPDATED,
+    price_staleness,
+)
+from core.tick_record import TickRecord
+from core.tracing import setup_tracing, traced
 from httpx import HTTPError
+from models.schemas import PriceAlert
+from prometheus_client import start_http_server
 from repositories.asset_repo import get_all_active_assets, update_asset_price
-from services.price_service import get_current_price
+from services.alerts import find_alerts
+from services.price_service import get_prices, refresh_coin_ids
+from services.tick_publisher import publish_tick
 from sqlalchemy.exc import OperationalError
 
 logger = logging.getLogger("price_worker")
@@ -16,47 +31,100 @@ logging.basicConfig(
 
 
 class PriceUpdateWorker:
-    def __init__(self, interval: int = 300):
+    """
+    Тики обновления цен. Часы и источник цен подменяются
+    для воспроизведения истории (replay.py), по умолчанию —
+    реальное время и CoinGecko.
+
+    Источник цен: price_source(symbols, quotes) -> {symbol: {quote: price}}.
+    """
+
+    def __init__(self, interval: int = 300, clock=None, price_source=None):
         self.interval = interval
+        self.clock = clock or RealClock()
+        self.price_source = price_source or get_prices
 
+    @traced("worker.tick")
     async def update_all_assets_prices(self):
         """
-        Асинхронная функция для обновления цен всех активов
+        Асинхронная функция для обновления цен всех активов.
+        Каждая фаза тика замеряется, итог — одна запись TickRecord.
         """
         db_session = get_async_session()
+        record = TickRecord()
+        tick_time = self.clock.now()
         try:
-            assets = await get_all_active_assets(db_session)
-            updated_count = 0
+            with record.phase("load_assets"):
+                assets = await get_all_active_assets(db_session)
+                symbols = sorted({asset.symbol for asset in assets})
+                quotes = sorted({asset.quote for asset in assets} | {BASE_QUOTE})
+                await refresh_coin_ids(db_session, symbols)
+            # Цены прошлого тика — до записи новых, для проверки порогов
+            previous_prices = {asset.id: asset.current_price for asset in assets}
+            record.counts.update(
+                assets=len(assets), symbols=len(symbols), quotes=len(quotes)
+            )
+            TICK_ASSETS.set(len(assets))
+            TICK_SYMBOLS.set(len(symbols))
+
+            # Все символы и валюты котировки — одним запросом к провайдеру
+            # (пачками по PRICE_BATCH_SIZE монет), а не запрос на символ
+            with record.phase("fetch"):
+                tick_prices = await self.price_source(symbols, quotes)
+                for symbol in symbols:
+                    if symbol in tick_prices:
+                        price_staleness.mark_updated(symbol)
+                    else:
+                        record.fail("fetch", symbol)
 
-            for asset in assets:
-                current_price = await get_current_price(asset.symbol)
-                if current_price is not None:
-                    await update_asset_price(db_session, asset.id, current_price)
+            updated_count = 0
+            with record.phase("write"):
+                for asset in assets:
+                    current_price = tick_prices.get(asset.symbol, {}).get(asset.quote)
+                    if current_price is None:
+                        continue
+                    await update_asset_price(
+                        db_session, asset.id, current_price, recorded_at=tick_time
+                    )
                     updated_count += 1
-                    logger.info(f"Updated {asset.symbol}: ${current_price}")
-                else:
-                    logger.warning(f"Failed to get price for {asset.symbol}")
-                await asyncio.sleep(0.1)
-
-            logger.info(
-                f"Successfully updated {updated_count}/{len(assets)} assets "
-                f"at {datetime.utcnow()}"
-            )
+                    logger.debug(
+                        f"Updated {asset.symbol}: {current_price} {asset.quote}"
+                    )
+
+            with record.phase("publish"):
+                await publish_tick(tick_prices)
+
+            with record.phase("alerts"):
+                alerts = find_alerts(assets, previous_prices, tick_prices)
+                for alert in alerts:
+                    self.notify(alert)
+
+            record.counts.update(updated=updated_count, alerts=len(alerts))
+            TICK_UPDATED.set(updated_count)
             return updated_count
 
         except OperationalError as e:
+            record.set_error(e)
             logger.critical(f"Database connection error: {e}")
             raise
         except HTTPError as e:
+            record.set_error(e)
             logger.error(f"API error: {e}")
             return 0
         except Exception as e:
+            record.set_error(e)
             logger.exception(f"Unexpected error: {e}")
             raise
 
         finally:
+            record.emit()
             await db_session.close()
 
+    def notify(self, alert: PriceAlert) -> None:
+        """Уведомление о пересечении порога"""
+        TICK_ALERTS.labels(alert.direction).inc()
+        logger.info(f"Price alert: {alert.model_dump_json()}")
+
     async def run(self):
         """Основной цикл воркера"""
         logger.info(f"Price update worker started. Interval: {self.interval} seconds")
@@ -65,7 +133,7 @@ class PriceUpdateWorker:
             try:
                 await self.update_all_assets_prices()
                 logger.info(f"Next update in {self.interval} seconds...")
-                await asyncio.sleep(self.interval)
+                await self.clock.sleep(self.interval)
 
             except Exception as e:
                 logger.error(f"Worker error: {e}")
@@ -73,7 +141,11 @@ class PriceUpdateWorker:
 
 
 async def main():
-    logger.info("Database tables created/verified")
+    setup_tracing()
+    if settings.METRICS_PORT:
+        start_http_server(settings.METRICS_PORT)
+        logger.info(f"Metrics available on port {settings.METRICS_PORT}")
+    loop_monitor.start()
     worker = PriceUpdateWorker(interval=settings.PRICE_UPDATE_INTERVAL)
     await worker.run()
 
@@ -1,4 +1,4 @@
-from .database import Asset, PriceHistory, User
+from .database import Asset, Coin, PriceHistory, User
 from .schemas import (
     AssetBase,
     AssetCreateRequest,
@@ -18,6 +18,7 @@ __all__ = [
     "User",
     "Asset",
     "PriceHistory",
+    "Coin",
     "UserBase",
     "UserCreateRequest",
     "UserLoginRequest",
@@ -48,6 +48,8 @@ class Asset(Base):
     )  # Название валюты (например: "bitcoin", "ethereum")
     min_price = Column(Float)  # Нижний порог цены для уведомления
     max_price = Column(Float)  # Верхний порог цены для уведомления
+    # Валюта котировки: пороги, текущая цена и история — в ней
+    quote = Column(String(8), default="USD", server_default="USD", nullable=False)
     current_price = Column(Float, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)  # Дата добавления актива
     is_active = Column(Boolean, default=True)  # Флаг активности отслеживания
@@ -65,6 +67,7 @@ class PriceHistory(Base):
     __tablename__ = "price_history"
     __table_args__ = (
         Index("ix_price_history_asset_recorded", "asset_id", "recorded_at"),
+        Index("ix_price_history_symbol_recorded", "symbol", "quote", "recorded_at"),
     )
 
     # Поля для записи истории
@@ -74,9 +77,30 @@ class PriceHistory(Base):
     asset_id = Column(
         Integer, ForeignKey("assets.id")
     )  # Ссылка на актив (внешний ключ)
-    price = Column(Float)  # Цена актива в момент записи
+    # Символ и валюта на момент записи: владелец может сменить символ актива,
+    # а ряды символа (индикаторы, корреляция) строятся по этим полям
+    symbol = Column(String, nullable=False)
+    quote = Column(String(8), nullable=False)
+    price = Column(Float)  # Цена актива в момент записи, в валюте актива (quote)
     recorded_at = Column(DateTime, default=datetime.utcnow)  # Временная записи
 
     asset = relationship(
         "Asset", back_populates="price_history"
     )  # Позволяет получить доступ к данным актива из записи цены
+
+
+class Coin(Base):
+    """
+    Реестр монет провайдера цен (CoinGecko /coins/list)
+    Один символ может принадлежать нескольким монетам: is_primary
+    отмечает ту, по которой отслеживаются активы с этим символом
+    """
+
+    __tablename__ = "coins"
+
+    id = Column(String, primary_key=True)  # id монеты у провайдера ("bitcoin")
+    symbol = Column(String, index=True)  # Символ в верхнем регистре ("BTC")
+    name = Column(String)  # Название ("Bitcoin")
+    rank = Column(Integer, nullable=True)  # Место по капитализации, если известно
+    is_primary = Column(Boolean, default=False)  # Основная монета для символа
+    updated_at = Column(DateTime, nullable=True)  # Синхронизация с провайдером
@@ -99,6 +99,7 @@ class AssetResponse(BaseModel):
     symbol: str
     min_price: float
     max_price: float
+    quote: str = "USD"
     current_price: Optional[float] = None
     is_active: bool
     created_at: datetime
@@ -144,3 +145,16 @@ class TokenData(BaseModel):
 
     username: Optional[str] = None
     user_id: Optional[int] = None
+
+
+# -------------Alerts---------------
+class PriceAlert(BaseModel):
+    """Цена вышла за порог актива"""
+
+    asset_id: int
+    user_id: int
+    symbol: str
+    quote: str = "USD"  # Валюта цены и порога
+    price: float
+    threshold: float
+    direction: str  # "below" — ниже min_price, "above" — выше max_price
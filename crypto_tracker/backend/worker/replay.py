@@ -0,0 +1,256 @@
+"""
+Воспроизведение истории цен через настоящий путь worker'а
+(тик, запись в БД, проверка порогов) на виртуальных часах.
+
+    python replay.py --database-url sqlite+aiosqlite:///replay.sqlite \
+        --synthetic BTC,ETH,SOL --days 90 --speed 0 --report report.json
+    python replay.py --database-url postgresql://... --csv btc.csv --symbol BTC
+
+Только для отдельной БД, которую нужно указать явно (--database-url,
+DATABASE_URL из окружения не используется): создает таблицы, пользователя
+replay и по активу на символ, тик обрабатывает все активные активы.
+Тики в Redis не публикуются, если не передан --publish (тогда — в REDIS_URL).
+Итог — JSON: пропускная способность, задержка обнаружения
+пересечений порога (в виртуальном времени) и рост БД.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from core.clock import VirtualClock
+from core.config import settings
+from core.database import Base, async_session
+from main import PriceUpdateWorker
+from models.database import Asset, PriceHistory, User
+from models.schemas import PriceAlert
+from services.replay_source import (
+    PriceSeries,
+    ReplayPriceSource,
+    load_csv,
+    load_parquet,
+    synthetic_series,
+)
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+def percentile(sorted_samples: List[float], q: float) -> Optional[float]:
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, int(q * len(sorted_samples)))
+    return round(sorted_samples[index], 3)
+
+
+class ReplayWorker(PriceUpdateWorker):
+    """
+    PriceUpdateWorker, который запоминает уведомления и считает задержку:
+    от первого наблюдения за порогом в ряду до тика, который его заметил.
+    """
+
+    def __init__(self, series: PriceSeries, clock: VirtualClock, interval: int):
+        super().__init__(
+            interval=interval,
+            clock=clock,
+            price_source=ReplayPriceSource(series, clock),
+        )
+        self.series = series
+        self.alert_latencies: List[float] = []
+        self.alerts = 0
+
+    def notify(self, alert: PriceAlert) -> None:
+        super().notify(alert)
+        self.alerts += 1
+        tick_time = self.clock.now()
+        crossed_at = self.series.first_crossing(
+            alert.symbol,
+            tick_time - timedelta(seconds=self.interval),
+            tick_time,
+            alert.threshold,
+            alert.direction,
+        )
+        if crossed_at is not None:
+            self.alert_latencies.append((tick_time - crossed_at).total_seconds())
+
+
+def use_database(url: str) -> AsyncEngine:
+    """
+    Движок для БД прогона; сессии worker'а (get_async_session) тоже идут в нее
+    """
+    engine = create_async_engine(url.replace("postgresql://", "postgresql+asyncpg://"))
+    async_session.configure(bind=engine)
+    return engine
+
+
+async def db_size(engine: AsyncEngine) -> dict:
+    async with engine.connect() as conn:
+        rows = (
+            await conn.execute(select(func.count()).select_from(PriceHistory))
+        ).scalar()
+        if engine.dialect.name == "postgresql":
+            size = (
+                await conn.execute(
+                    text("SELECT pg_total_relation_size('price_history')")
+                )
+            ).scalar()
+        elif engine.dialect.name == "sqlite":
+            page_count = (await conn.execute(text("PRAGMA page_count"))).scalar()
+            page_size = (await conn.execute(text("PRAGMA page_size"))).scalar()
+            size = page_count * page_size
+        else:
+            size = None
+    return {"price_history_rows": rows, "bytes": size}
+
+
+async def prepare(engine: AsyncEngine, series: PriceSeries, band: float) -> None:
+    """Таблицы, пользователь replay и актив на символ с порогами ±band"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_session() as db:
+        user = User(username=f"replay-{uuid.uuid4().hex[:8]}", email=None)
+        db.add(user)
+        await db.flush()
+        for symbol in series.symbols:
+            first_price = series.first_price(symbol)
+            db.add(
+                Asset(
+                    user_id=user.id,
+                    symbol=symbol,
+                    min_price=first_price * (1 - band),
+                    max_price=first_price * (1 + band),
+                    current_price=first_price,
+                )
+            )
+        await db.commit()
+
+
+async def replay(
+    engine: AsyncEngine, series: PriceSeries, interval: int, speed: float, band: float
+) -> dict:
+    await prepare(engine, series, band)
+    size_before = await db_size(engine)
+
+    clock = VirtualClock(series.start, speed=speed)
+    worker = ReplayWorker(series, clock, interval)
+    tick_durations = []
+    started = time.perf_counter()
+    while clock.now() <= series.end:
+        tick_started = time.perf_counter()
+        await worker.update_all_assets_prices()
+        tick_durations.append(time.perf_counter() - tick_started)
+        await clock.sleep(interval)
+    wall = time.perf_counter() - started
+
+    size_after = await db_size(engine)
+    await engine.dispose()
+
+    virtual = (series.end - series.start).total_seconds()
+    rows = size_after["price_history_rows"] - size_before["price_history_rows"]
+    grown = (
+        size_after["bytes"] - size_before["bytes"]
+        if size_after["bytes"] is not None
+        else None
+    )
+    durations = sorted(tick_durations)
+    latencies = sorted(worker.alert_latencies)
+    days = virtual / 86_400 or 1
+    return {
+        "series": {
+            "symbols": series.symbols,
+            "observations": len(series),
+            "start": series.start.isoformat(),
+            "end": series.end.isoformat(),
+        },
+        "interval_s": interval,
+        "speed": speed,
+        "ticks": len(durations),
+        "wall_s": round(wall, 2),
+        "virtual_s": virtual,
+        "speedup": round(virtual / wall, 1) if wall else None,
+        "throughput": {
+            "ticks_per_s": round(len(durations) / wall, 2),
+            "rows_per_s": round(rows / wall, 1),
+            "tick_p50_ms": percentile([d * 1000 for d in durations], 0.50),
+            "tick_p95_ms": percentile([d * 1000 for d in durations], 0.95),
+        },
+        "alerts": {
+            "count": worker.alerts,
+            "latency_p50_s": percentile(latencies, 0.50),
+            "latency_p95_s": percentile(latencies, 0.95),
+            "latency_max_s": latencies[-1] if latencies else None,
+        },
+        "db_growth": {
+            "rows": rows,
+            "bytes": grown,
+            "bytes_per_row": round(grown / rows, 1) if grown and rows else None,
+            "bytes_per_day": round(grown / days) if grown is not None else None,
+        },
+    }
+
+
+def load_series(args) -> PriceSeries:
+    if args.csv:
+        return load_csv(args.csv, args.symbol)
+    if args.parquet:
+        return load_parquet(args.parquet, args.symbol)
+    start = datetime.fromisoformat(args.start) if args.start else datetime(2024, 1, 1)
+    return synthetic_series(
+        args.synthetic.split(","),
+        start,
+        args.days,
+        step_seconds=args.step,
+        volatility=args.volatility,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay price series through worker")
+    parser.add_argument(
+        "--database-url", required=True, help="Отдельная БД прогона, не рабочая"
+    )
+    parser.add_argument(
+        "--publish", action="store_true", help="Публиковать тики в REDIS_URL"
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", help="CSV: symbol,timestamp|recorded_at,price")
+    source.add_argument("--parquet", help="Parquet: symbol,recorded_at,price")
+    source.add_argument("--synthetic", help="Символы через запятую: BTC,ETH")
+    parser.add_argument("--symbol", help="Символ для ряда без колонки symbol")
+    parser.add_argument("--days", type=float, default=30, help="Длина синтетики")
+    parser.add_argument("--step", type=int, default=60, help="Шаг синтетики, с")
+    parser.add_argument("--volatility", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", help="Начало синтетики (ISO), UTC")
+    parser.add_argument("--interval", type=int, default=300, help="Интервал тика, с")
+    parser.add_argument(
+        "--speed", type=float, default=1000, help="Ускорение часов, 0 — без ожидания"
+    )
+    parser.add_argument("--band", type=float, default=0.05, help="Пороги ±доля")
+    parser.add_argument("--report", help="Записать отчет JSON в файл")
+    parser.add_argument("--verbose", action="store_true", help="Лог каждого тика")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger("price_worker").setLevel(logging.WARNING)
+
+    if not args.publish:
+        settings.REDIS_URL = ""
+
+    series = load_series(args)
+    engine = use_database(args.database_url)
+    report = asyncio.run(replay(engine, series, args.interval, args.speed, args.band))
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
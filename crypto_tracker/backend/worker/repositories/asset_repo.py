@@ -1,5 +1,7 @@
+from datetime import datetime
 from typing import List, Optional
 
+from core.tracing import traced
 from models.database import Asset
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -8,6 +10,7 @@ from .price_repo import create_price_history
 
 
 # _______________WORKER_____________________#
+@traced()
 async def get_all_active_assets(db: AsyncSession) -> List[Asset]:
     """
     Получить все активные валюты (для WORKER задачи)
@@ -16,11 +19,16 @@ async def get_all_active_assets(db: AsyncSession) -> List[Asset]:
     return result.scalars().all()
 
 
+@traced()
 async def update_asset_price(
-    db: AsyncSession, asset_id: int, current_price: float
+    db: AsyncSession,
+    asset_id: int,
+    current_price: float,
+    recorded_at: Optional[datetime] = None,
 ) -> Optional[Asset]:
     """
     Обновить текущую цену актива и записать в историю
+    (recorded_at — время тика, по умолчанию текущее)
     """
 
     result = await db.execute(select(Asset).where(Asset.id == asset_id))
@@ -28,7 +36,7 @@ async def update_asset_price(
 
     if asset:
         asset.current_price = current_price
-        await create_price_history(db, asset_id, current_price)
+        await create_price_history(db, asset, current_price, recorded_at)
         await db.commit()
         await db.refresh(asset)
 
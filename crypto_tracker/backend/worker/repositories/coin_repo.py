@@ -0,0 +1,19 @@
+from typing import Dict, Iterable
+
+from core.tracing import traced
+from models.database import Coin
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+
+@traced()
+async def get_coin_ids(db: AsyncSession, symbols: Iterable[str]) -> Dict[str, str]:
+    """
+    id провайдера для символов: основная монета символа из реестра coins
+    """
+    result = await db.execute(
+        select(Coin.symbol, Coin.id).where(
+            Coin.symbol.in_(list(symbols)), Coin.is_primary.is_(True)
+        )
+    )
+    return dict(result.all())
@@ -1,14 +1,28 @@
-from models.database import PriceHistory
+from datetime import datetime
+from typing import Optional
+
+from core.tracing import traced
+from models.database import Asset, PriceHistory
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+@traced()
 async def create_price_history(
-    db: AsyncSession, asset_id: int, price: float
+    db: AsyncSession,
+    asset: Asset,
+    price: float,
+    recorded_at: Optional[datetime] = None,
 ) -> PriceHistory:
     """
-    Создать запись в истории цен
+    Создать запись в истории цен (с текущими символом и валютой актива)
     """
-    price_history = PriceHistory(asset_id=asset_id, price=price)
+    price_history = PriceHistory(
+        asset_id=asset.id,
+        symbol=asset.symbol,
+        quote=asset.quote,
+        price=price,
+        recorded_at=recorded_at or datetime.utcnow(),
+    )
     db.add(price_history)
     await db.commit()
     await db.refresh(price_history)
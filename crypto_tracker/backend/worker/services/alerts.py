@@ -0,0 +1,46 @@
+from typing import Dict, List, Optional, Sequence
+
+from models.database import Asset
+from models.schemas import PriceAlert
+
+
+def find_alerts(
+    assets: Sequence[Asset],
+    previous_prices: Dict[int, Optional[float]],
+    prices: Dict[str, Dict[str, float]],
+) -> List[PriceAlert]:
+    """
+    Активы, цена которых (в валюте актива) в этом тике вышла
+    за min_price / max_price.
+
+    Срабатывает только пересечение порога: если цена уже была
+    за порогом в прошлом тике, повторного уведомления нет.
+    """
+    alerts = []
+    for asset in assets:
+        price = prices.get(asset.symbol, {}).get(asset.quote)
+        if price is None:
+            continue
+        previous = previous_prices.get(asset.id)
+
+        if asset.min_price is not None and price < asset.min_price:
+            if previous is None or previous >= asset.min_price:
+                alerts.append(_make_alert(asset, price, asset.min_price, "below"))
+        elif asset.max_price is not None and price > asset.max_price:
+            if previous is None or previous <= asset.max_price:
+                alerts.append(_make_alert(asset, price, asset.max_price, "above"))
+    return alerts
+
+
+def _make_alert(
+    asset: Asset, price: float, threshold: float, direction: str
+) -> PriceAlert:
+    return PriceAlert(
+        asset_id=asset.id,
+        user_id=asset.user_id,
+        symbol=asset.symbol,
+        quote=asset.quote,
+        price=price,
+        threshold=threshold,
+        direction=direction,
+    )
@@ -1,9 +1,20 @@
-from typing import Optional
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
 
 import aiohttp
 from core.config import settings
+from core.metrics import PROVIDER_LATENCY, PROVIDER_REQUESTS
+from core.tracing import traced
+from repositories.coin_repo import get_coin_ids
+from sqlalchemy.ext.asyncio import AsyncSession
 
-SYMBOL_MAP = {
+logger = logging.getLogger("price_worker.provider")
+
+# Символ -> id провайдера. Реестр монет (таблица coins) ведет gateway,
+# worker дочитывает из него символы каждого тика; до первой синхронизации
+# реестра работают монеты из миграции coins
+_coin_ids: Dict[str, str] = {
     "BTC": "bitcoin",
     "ETH": "ethereum",
     "ADA": "cardano",
@@ -12,32 +23,76 @@ SYMBOL_MAP = {
 }
 
 
-def symbol_to_id(symbol: str) -> str:
+async def refresh_coin_ids(db: AsyncSession, symbols: Iterable[str]) -> None:
+    _coin_ids.update(await get_coin_ids(db, symbols))
+
+
+def symbol_to_id(symbol: str) -> Optional[str]:
     """
     Конвертирует символ (BTC, ETH…) в ID для CoinGecko API.
     """
-    return SYMBOL_MAP.get(symbol.upper(), symbol.lower())
+    return _coin_ids.get(symbol.upper())
 
 
-async def get_current_price(symbol: str) -> Optional[float]:
+@traced("price_provider.get_prices")
+async def get_prices(
+    symbols: Sequence[str], quotes: Sequence[str]
+) -> Dict[str, Dict[str, float]]:
     """
-    Получить текущую цену криптовалюты.
+    Цены символов во всех нужных валютах котировки: {symbol: {quote: price}}.
+    Один запрос /simple/price на PRICE_BATCH_SIZE монет (ids=...&vs_currencies=...),
+    а не запрос на каждый символ и валюту.
     """
-    coin_id = symbol_to_id(symbol)
-    url = "https://api.coingecko.com/api/v3/simple/price"
+    ids = {}
+    for symbol in symbols:
+        coin_id = symbol_to_id(symbol)
+        if coin_id is None:
+            logger.warning(f"Unknown symbol {symbol}, not in coin registry")
+            continue
+        ids[coin_id] = symbol
+
+    coin_ids = list(ids)
+    prices: Dict[str, Dict[str, float]] = {}
+    for start in range(0, len(coin_ids), settings.PRICE_BATCH_SIZE):
+        end = start + settings.PRICE_BATCH_SIZE
+        batch = coin_ids[start:end]
+        data = await _fetch_batch(batch, quotes)
+        for coin_id in batch:
+            quoted = {
+                quote: float(price)
+                for quote in quotes
+                if (price := data.get(coin_id, {}).get(quote.lower())) is not None
+            }
+            if quoted:
+                prices[ids[coin_id]] = quoted
+    return prices
+
+
+async def _fetch_batch(coin_ids: List[str], quotes: Sequence[str]) -> dict:
+    url = f"{settings.COINGECKO_API_URL}/simple/price"
     headers = {"x-cg-demo-api-key": settings.CRYPTO_API_KEY}
-    params = {"ids": coin_id, "vs_currencies": "usd"}
+    params = {
+        "ids": ",".join(coin_ids),
+        "vs_currencies": ",".join(quote.lower() for quote in quotes),
+    }
 
+    started = time.perf_counter()
+    outcome = "exception"
     try:
         async with aiohttp.ClientSession() as session:
             async with session.get(url, params=params, headers=headers) as response:
                 if response.status == 200:
-                    data = await response.json()
-                    return data.get(coin_id, {}).get("usd")
+                    outcome = "ok"
+                    return await response.json()
 
-                print(f"API error {response.status}")
-                return None
+                outcome = "http_error"
+                logger.warning(f"API error {response.status}")
+                return {}
 
     except Exception as e:
-        print(f"Error fetching price: {e}")
-        return None
+        logger.warning(f"Error fetching prices for {len(coin_ids)} coins: {e}")
+        return {}
+
+    finally:
+        PROVIDER_LATENCY.observe(time.perf_counter() - started)
+        PROVIDER_REQUESTS.labels(outcome).inc()
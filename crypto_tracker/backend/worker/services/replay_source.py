@@ -0,0 +1,182 @@
+import csv
+import math
+import random
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow — опциональная зависимость, только для Parquet
+    pq = None
+
+# Цены, от которых стартует синтетический ряд
+SYNTHETIC_START_PRICES = {
+    "BTC": 60_000.0,
+    "ETH": 3_000.0,
+    "ADA": 0.5,
+    "DOT": 7.0,
+    "SOL": 150.0,
+}
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+class PriceSeries:
+    """
+    Записанный ряд цен по символам.
+    Цена на момент t — последнее наблюдение не позже t.
+    """
+
+    def __init__(self, points: Dict[str, List[Tuple[datetime, float]]]):
+        self._times: Dict[str, List[datetime]] = {}
+        self._prices: Dict[str, List[float]] = {}
+        for symbol, observations in points.items():
+            observations = sorted(observations)
+            self._times[symbol] = [moment for moment, _ in observations]
+            self._prices[symbol] = [price for _, price in observations]
+        if not self._times:
+            raise ValueError("Price series is empty")
+
+    @property
+    def symbols(self) -> List[str]:
+        return sorted(self._times)
+
+    @property
+    def start(self) -> datetime:
+        return min(times[0] for times in self._times.values())
+
+    @property
+    def end(self) -> datetime:
+        return max(times[-1] for times in self._times.values())
+
+    def __len__(self) -> int:
+        return sum(len(times) for times in self._times.values())
+
+    def first_price(self, symbol: str) -> float:
+        return self._prices[symbol][0]
+
+    def price_at(self, symbol: str, moment: datetime) -> Optional[float]:
+        times = self._times.get(symbol)
+        if times is None:
+            return None
+        index = bisect_right(times, moment)
+        return self._prices[symbol][index - 1] if index else None
+
+    def first_crossing(
+        self,
+        symbol: str,
+        since: datetime,
+        until: datetime,
+        threshold: float,
+        direction: str,
+    ) -> Optional[datetime]:
+        """Первое наблюдение в (since, until] за порогом threshold"""
+        times = self._times.get(symbol, [])
+        prices = self._prices.get(symbol, [])
+        for index in range(bisect_right(times, since), bisect_right(times, until)):
+            price = prices[index]
+            if price < threshold if direction == "below" else price > threshold:
+                return times[index]
+        return None
+
+
+def _build(rows, symbol: Optional[str]) -> PriceSeries:
+    points: Dict[str, List[Tuple[datetime, float]]] = {}
+    for row_symbol, moment, price in rows:
+        row_symbol = (row_symbol or symbol or "").upper()
+        if not row_symbol:
+            raise ValueError("Series has no symbol column, pass symbol explicitly")
+        points.setdefault(row_symbol, []).append((_naive_utc(moment), float(price)))
+    return PriceSeries(points)
+
+
+def load_csv(path: str, symbol: Optional[str] = None) -> PriceSeries:
+    """
+    CSV с заголовком: symbol (необязательно), timestamp или recorded_at, price.
+    Подходит выгрузка GET /assets/{id}/export?format=csv (с symbol=...).
+    """
+    with open(path, newline="") as file:
+        rows = [
+            (
+                row.get("symbol"),
+                datetime.fromisoformat(row.get("timestamp") or row["recorded_at"]),
+                row["price"],
+            )
+            for row in csv.DictReader(file)
+        ]
+    return _build(rows, symbol)
+
+
+def load_parquet(path: str, symbol: Optional[str] = None) -> PriceSeries:
+    """
+    Parquet с колонками symbol (необязательно), recorded_at, price —
+    например, выгрузка GET /assets/export?format=parquet
+    """
+    if pq is None:
+        raise RuntimeError("Parquet replay requires pyarrow")
+    table = pq.read_table(path)
+    columns = set(table.column_names)
+    symbols = (
+        table.column("symbol").to_pylist()
+        if "symbol" in columns
+        else [None] * table.num_rows
+    )
+    rows = zip(
+        symbols,
+        table.column("recorded_at").to_pylist(),
+        table.column("price").to_pylist(),
+    )
+    return _build(rows, symbol)
+
+
+def synthetic_series(
+    symbols: Sequence[str],
+    start: datetime,
+    days: float,
+    step_seconds: int = 60,
+    volatility: float = 0.002,
+    seed: int = 0,
+) -> PriceSeries:
+    """
+    Геометрическое случайное блуждание с шагом step_seconds.
+    Один seed — один и тот же ряд.
+    """
+    rng = random.Random(seed)
+    steps = int(days * 86_400 / step_seconds) + 1
+    points = {}
+    for symbol in symbols:
+        symbol = symbol.upper()
+        price = SYNTHETIC_START_PRICES.get(symbol, 100.0)
+        observations = []
+        for step in range(steps):
+            observations.append((start + timedelta(seconds=step * step_seconds), price))
+            price *= math.exp(rng.gauss(0, volatility))
+        points[symbol] = observations
+    return PriceSeries(points)
+
+
+class ReplayPriceSource:
+    """
+    Источник цен для PriceUpdateWorker: цена ряда на текущий момент часов.
+    Ряд записан в одной валюте, он отдается как цена в quote (по умолчанию USD)
+    """
+
+    def __init__(self, series: PriceSeries, clock, quote: str = "USD"):
+        self.series = series
+        self.clock = clock
+        self.quote = quote
+
+    async def __call__(
+        self, symbols: Sequence[str], quotes: Sequence[str]
+    ) -> Dict[str, Dict[str, float]]:
+        prices = {}
+        for symbol in symbols:
+            price = self.series.price_at(symbol.upper(), self.clock.now())
+            if price is not None and self.quote in quotes:
+                prices[symbol] = {self.quote: price}
+        return prices
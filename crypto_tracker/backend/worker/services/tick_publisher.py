@@ -0,0 +1,86 @@
+import json
+import logging
+import time
+from typing import Dict
+
+from core.cache import (
+    BASE_QUOTE,
+    PRICES_CHANNEL,
+    PRICES_FX_KEY,
+    PRICES_LATEST_KEY,
+    PRICES_SEQ_KEY,
+    PRICES_TICK_AT_KEY,
+    PRICES_TICK_KEY,
+    get_redis,
+    price_key,
+)
+from core.tracing import current_trace_id, inject_context
+from redis.exceptions import RedisError
+
+logger = logging.getLogger("price_worker")
+
+
+def fx_rates(prices: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """
+    Курсы котировок к USD из цен самого тика: цена одной монеты
+    в обеих валютах (сначала BTC — у него точнее округление)
+    """
+    rates = {}
+    for symbol in sorted(prices, key=lambda symbol: (symbol != "BTC", symbol)):
+        usd = prices[symbol].get(BASE_QUOTE)
+        if not usd:
+            continue
+        for quote, price in prices[symbol].items():
+            if quote != BASE_QUOTE:
+                rates.setdefault(quote, price / usd)
+    return rates
+
+
+async def publish_tick(prices: Dict[str, Dict[str, float]]) -> None:
+    """
+    Опубликовать результат тика в Redis: последние цены в USD,
+    курсы котировок к USD, номер тика по каждому символу, общий номер тика
+    и его время (пока реплика может отставать, gateway читает из primary).
+    Цену в другой валюте gateway получает как USD * курс, без отдельного
+    ключа на каждую пару символ/валюта.
+
+    Вызывается только после commit, чтобы gateway не выдал
+    новый ETag раньше, чем данные станут видны в БД.
+    Затем тик с контекстом трассы уходит в Pub/Sub для потока цен gateway.
+    """
+    redis = get_redis()
+    if redis is None or not prices:
+        return
+
+    latest = {
+        symbol: quoted[BASE_QUOTE]
+        for symbol, quoted in prices.items()
+        if BASE_QUOTE in quoted
+    }
+    fx = fx_rates(prices)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            if latest:
+                pipe.hset(PRICES_LATEST_KEY, mapping=latest)
+            if fx:
+                pipe.hset(PRICES_FX_KEY, mapping=fx)
+            for symbol in prices:
+                pipe.hincrby(PRICES_SEQ_KEY, symbol, 1)
+            pipe.set(PRICES_TICK_AT_KEY, time.time())
+            pipe.incr(PRICES_TICK_KEY)
+            results = await pipe.execute()
+
+        message = {
+            "tick": results[-1],
+            "prices": {
+                price_key(symbol, quote): price
+                for symbol, quoted in prices.items()
+                for quote, price in quoted.items()
+            },
+            "published_at": time.time(),
+            "trace": inject_context(),
+            "trace_id": current_trace_id(),
+        }
+        await redis.publish(PRICES_CHANNEL, json.dumps(message))
+    except RedisError as e:
+        logger.warning(f"Failed to publish tick to Redis: {e}")
@@ -0,0 +1,89 @@
+"""
+Пропускная способность потоковой выгрузки истории цен.
+
+Количество строк задается BENCH_EXPORT_ROWS (по умолчанию 100 000).
+Для замера на многомиллионной серии в Postgres (отдельная тестовая база):
+    TEST_DATABASE_URL=postgresql://.../crypto_test BENCH_EXPORT_ROWS=3000000 \
+    pytest crypto_tracker/tests/benchmarks/test_export_throughput.py -s
+"""
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+from core.database import engine
+from models.database import Asset, PriceHistory, User
+from repositories.price_history import stream_price_history
+from services.export import EXPORT_WRITERS
+from sqlalchemy import insert
+
+pytestmark = pytest.mark.bench
+
+ROWS = int(os.environ.get("BENCH_EXPORT_ROWS", 100_000))
+INSERT_BATCH = 50_000
+MAX_PEAK_MEMORY = 64 * 1024 * 1024
+
+
+async def seed(rows: int) -> int:
+    async with engine.begin() as conn:
+        user_id = (
+            await conn.execute(
+                insert(User).values(username="bench", email="bench@example.com")
+            )
+        ).inserted_primary_key[0]
+        asset_id = (
+            await conn.execute(
+                insert(Asset).values(
+                    user_id=user_id, symbol="BTC", min_price=1, max_price=2
+                )
+            )
+        ).inserted_primary_key[0]
+
+        start = datetime(2015, 1, 1)
+        for offset in range(0, rows, INSERT_BATCH):
+            batch = [
+                {
+                    "asset_id": asset_id,
+                    "symbol": "BTC",
+                    "quote": "USD",
+                    "price": 40000 + (i % 1000) * 0.5,
+                    "recorded_at": start + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + INSERT_BATCH, rows))
+            ]
+            await conn.execute(insert(PriceHistory), batch)
+    return asset_id
+
+
+async def consume(asset_id: int, export_format: str):
+    total_bytes = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    async for chunk in EXPORT_WRITERS[export_format](stream_price_history(asset_id)):
+        total_bytes += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, total_bytes, peak
+
+
+@pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+def test_export_throughput(db, export_format):
+    async def run():
+        try:
+            asset_id = await seed(ROWS)
+            return await consume(asset_id, export_format)
+        finally:
+            await engine.dispose()
+
+    elapsed, total_bytes, peak = asyncio.run(run())
+
+    print(
+        f"\n{export_format}: {ROWS} строк за {elapsed:.2f} s "
+        f"({ROWS / elapsed:,.0f} строк/с, {total_bytes / elapsed / 1e6:.1f} MB/s), "
+        f"пик памяти {peak / 1e6:.1f} MB"
+    )
+    assert total_bytes > 0
+    assert peak < MAX_PEAK_MEMORY
@@ -0,0 +1,75 @@
+"""
+Сравнение форматов ответа /assets/{id}/history.
+
+Запуск: pytest crypto_tracker/tests/benchmarks/test_history_serialization.py -s
+"""
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from models.database import PriceHistory as PriceHistoryRow
+from models.schemas import PriceHistory
+from services.history_format import encode_columnar, encode_msgpack
+
+pytestmark = pytest.mark.bench
+
+ROWS = 1000
+ROUNDS = 30
+
+
+def make_rows(count: int) -> List[PriceHistoryRow]:
+    start = datetime(2025, 1, 1)
+    return [
+        PriceHistoryRow(
+            id=i,
+            asset_id=1,
+            price=40000 + i * 0.37,
+            recorded_at=start + timedelta(minutes=5 * i),
+        )
+        for i in range(count)
+    ]
+
+
+def encode_pydantic(rows) -> bytes:
+    """Путь response_model=List[PriceHistory]: валидация строк + JSON"""
+    models = [PriceHistory.model_validate(row) for row in rows]
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+def encode_columnar_rows(rows) -> bytes:
+    return encode_columnar([r.recorded_at for r in rows], [r.price for r in rows])
+
+
+def encode_msgpack_rows(rows) -> bytes:
+    return encode_msgpack([r.recorded_at for r in rows], [r.price for r in rows])
+
+
+def measure(encoder, rows):
+    payload = encoder(rows)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        encoder(rows)
+    elapsed = (time.perf_counter() - start) / ROUNDS
+    return elapsed, len(payload)
+
+
+def test_history_formats_benchmark():
+    rows = make_rows(ROWS)
+    results = {
+        "json (pydantic)": measure(encode_pydantic, rows),
+        "columnar json": measure(encode_columnar_rows, rows),
+        "msgpack": measure(encode_msgpack_rows, rows),
+    }
+
+    print(f"\n{ROWS} строк, среднее по {ROUNDS} прогонам")
+    for name, (elapsed, size) in results.items():
+        print(f"{name:<16} {elapsed * 1000:8.3f} ms {size:>8} bytes")
+
+    base_time, base_size = results["json (pydantic)"]
+    for name in ("columnar json", "msgpack"):
+        elapsed, size = results[name]
+        assert size < base_size / 2
+        assert elapsed < base_time
@@ -0,0 +1,147 @@
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterable, List
+
+import pytest
+from sqlalchemy.engine import make_url
+
+API_GATEWAY_DIR = Path(__file__).resolve().parent.parent / "backend" / "api_gateway"
+
+# Тесты пересоздают схему, поэтому БД — всегда своя: DATABASE_URL из окружения
+# (рабочая база разработчика) не используется. Postgres — через TEST_DATABASE_URL
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL") or (
+    f"sqlite+aiosqlite:///{Path(tempfile.gettempdir()) / 'crypto_tracker_test.sqlite'}"
+)
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["DATABASE_REPLICA_URL"] = ""
+
+# Настройки для запуска без .env и без внешних сервисов
+os.environ.setdefault("CRYPTO_API_KEY", "test")
+os.environ.setdefault("JWT_SECRET", "test-secret-key-with-enough-length-32")
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("SENTRY_DSN", "")
+os.environ["REDIS_URL"] = ""
+
+sys.path.insert(0, str(API_GATEWAY_DIR))
+
+TICK = timedelta(minutes=5)  # Шаг рядов цен, как у worker'а по умолчанию
+
+
+def is_test_database(url: str) -> bool:
+    """SQLite-файл или база, в имени которой есть "test" (crypto_test, ...)"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" or "test" in (parsed.database or "")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "bench: замеры времени и нагрузки, запускаются через make bench"
+    )
+    if not is_test_database(TEST_DATABASE_URL):
+        raise pytest.UsageError(
+            f"TEST_DATABASE_URL={make_url(TEST_DATABASE_URL)!r}: тесты удаляют "
+            "все таблицы, нужна отдельная база с test в имени"
+        )
+
+
+@pytest.fixture
+def db():
+    """Пустая схема в тестовой БД; возвращает движок приложения"""
+    from core.database import engine
+    from models.database import Base
+
+    async def reset():
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+        finally:
+            # Пул привязан к event loop, а у каждого теста свой asyncio.run
+            await engine.dispose()
+
+    asyncio.run(reset())
+    return engine
+
+
+@pytest.fixture
+def seed_series(db):
+    """
+    Данные в тестовой БД (вызывать внутри event loop теста):
+    users(*имена) -> id, assets(user_id, символы, quote) -> id,
+    prices(asset_id, цены, start, step) — ряд с шагом step
+    """
+    from models.database import Asset, PriceHistory, User
+    from sqlalchemy import insert, select
+
+    async def users(*names: str) -> List[int]:
+        async with db.begin() as conn:
+            result = await conn.execute(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [{"username": name, "email": f"{name}@example.com"} for name in names],
+            )
+            return result.scalars().all()
+
+    async def assets(
+        user_id: int, symbols: Iterable[str], quote: str = "USD"
+    ) -> List[int]:
+        async with db.begin() as conn:
+            result = await conn.execute(
+                insert(Asset).returning(Asset.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "user_id": user_id,
+                        "symbol": symbol,
+                        "quote": quote,
+                        "min_price": 1,
+                        "max_price": 10**9,
+                        "is_active": True,
+                    }
+                    for symbol in symbols
+                ],
+            )
+            return result.scalars().all()
+
+    async def prices(
+        asset_id: int, values: Iterable[float], start: datetime, step=TICK
+    ) -> None:
+        async with db.begin() as conn:
+            # Записи — под текущими символом и валютой актива, как у worker'а
+            asset = (
+                await conn.execute(
+                    select(Asset.symbol, Asset.quote).where(Asset.id == asset_id)
+                )
+            ).one()
+            await conn.execute(
+                insert(PriceHistory),
+                [
+                    {
+                        "asset_id": asset_id,
+                        "symbol": asset.symbol,
+                        "quote": asset.quote,
+                        "price": price,
+                        "recorded_at": start + i * step,
+                    }
+                    for i, price in enumerate(values)
+                ],
+            )
+
+    return SimpleNamespace(users=users, assets=assets, prices=prices)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Redis в памяти процесса (fakeredis) вместо отключенного REDIS_URL"""
+    import core.cache
+    from core.config import settings
+    from fakeredis import FakeAsyncRedis, FakeServer
+
+    # Свой сервер: fakeredis иначе делит данные между клиентами с тем же адресом
+    redis = FakeAsyncRedis(server=FakeServer(), decode_responses=True)
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://fake")
+    monkeypatch.setattr(core.cache, "_redis", redis)
+    return redis
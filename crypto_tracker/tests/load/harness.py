@@ -0,0 +1,114 @@
+"""
+Генератор нагрузки и сравнение с сохраненными baseline'ами.
+"""
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+
+# Метрики сравнения: (ключ, больше — лучше)
+COMPARED = [("rps", True), ("p95_ms", False)]
+# Разница меньше этой не считается регрессией (шум таймера на быстрых запросах)
+ABSOLUTE_SLACK_MS = 2.0
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    index = min(len(sorted_samples) - 1, int(q * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int, shed: int) -> dict:
+    samples = sorted(latencies)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "shed": shed,
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+    }
+
+
+async def run_load(
+    call: Callable[[int], Awaitable[int]],
+    total: int,
+    concurrency: int,
+    expected_status: int = 200,
+) -> dict:
+    """
+    Выполнить total вызовов call(i) (возвращает HTTP-статус),
+    не больше concurrency одновременно. 503 от контроля нагрузки
+    считается отдельно (shed), прочие неожиданные статусы — ошибки.
+    """
+    latencies: List[float] = []
+    errors = shed = 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal errors, shed
+        for i in counter:
+            started = time.perf_counter()
+            status = await call(i)
+            latencies.append(time.perf_counter() - started)
+            if status == 503:
+                shed += 1
+            elif status != expected_status:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors, shed)
+
+
+def load_baselines() -> dict:
+    if not BASELINES_PATH.exists():
+        return {"params": {}, "scenarios": {}}
+    return json.loads(BASELINES_PATH.read_text())
+
+
+def save_baselines(params: dict, results: Dict[str, dict]) -> None:
+    BASELINES_PATH.write_text(
+        json.dumps({"params": params, "scenarios": results}, indent=2) + "\n"
+    )
+
+
+def find_regressions(
+    results: Dict[str, dict], baselines: dict, tolerance: float
+) -> List[str]:
+    """
+    Сценарии, которые хуже baseline больше чем в (1 + tolerance) раз
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        for key, higher_is_better in COMPARED:
+            if key not in baseline:
+                continue
+            expected, actual = baseline[key], result[key]
+            if higher_is_better:
+                failed = actual * (1 + tolerance) < expected
+            else:
+                failed = actual > expected * (1 + tolerance) + ABSOLUTE_SLACK_MS
+            if failed:
+                regressions.append(f"{name}: {key} {actual} (baseline {expected})")
+    return regressions
+
+
+def format_report(results: Dict[str, dict], baselines: dict) -> str:
+    lines = [
+        f"{'scenario':<22} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        f" {'base p95':>9}"
+    ]
+    for name, result in results.items():
+        base = baselines.get(name, {}).get("p95_ms", "-")
+        lines.append(
+            f"{name:<22} {result['rps']:>9} {result['p50_ms']:>9}"
+            f" {result['p95_ms']:>9} {result['p99_ms']:>9} {base:>9}"
+        )
+    return "\n".join(lines)
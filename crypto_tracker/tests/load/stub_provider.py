@@ -0,0 +1,79 @@
+"""
+Локальная заглушка CoinGecko: GET /simple/price?ids=...&vs_currencies=usd,eur,
+а также /coins/list и /coins/markets для реестра монет.
+
+Цена детерминирована (зависит от id монеты и номера запроса),
+поэтому прогоны воспроизводимы и не требуют сети.
+"""
+import asyncio
+import zlib
+from collections import Counter
+from typing import List, Optional
+
+from aiohttp import web
+
+# Единиц валюты за 1 USD для vs_currencies, отличных от usd
+STUB_FX = {"usd": 1.0, "eur": 0.9, "gbp": 0.8, "jpy": 150.0, "btc": 1 / 60_000}
+
+
+def stub_price(coin_id: str, request_number: int) -> float:
+    base = 1 + zlib.crc32(coin_id.encode()) % 50_000
+    # Небольшие колебания, чтобы тики меняли цену и срабатывали пороги
+    return round(base * (1 + 0.01 * ((request_number % 20) - 10)), 2)
+
+
+class StubPriceProvider:
+    def __init__(self, latency: float = 0.0, coins: Optional[List[dict]] = None):
+        self.latency = latency
+        # {"id", "symbol", "name", "market_cap_rank"} — для /coins/*
+        self.coins = coins or []
+        self.requests: Counter = Counter()
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/simple/price", self._price)
+        app.router.add_get("/coins/list", self._coins_list)
+        app.router.add_get("/coins/markets", self._coins_markets)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _price(self, request: web.Request) -> web.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.requests["/simple/price"] += 1
+        quotes = request.query.get("vs_currencies", "usd").split(",")
+        prices = {}
+        for coin_id in request.query.get("ids", "").split(","):
+            if coin_id:
+                self.requests[coin_id] += 1
+                usd = stub_price(coin_id, self.requests[coin_id])
+                prices[coin_id] = {
+                    quote: usd * STUB_FX[quote] for quote in quotes if quote in STUB_FX
+                }
+        return web.json_response(prices)
+
+    async def _coins_list(self, request: web.Request) -> web.Response:
+        self.requests["/coins/list"] += 1
+        return web.json_response(
+            [
+                {"id": coin["id"], "symbol": coin["symbol"], "name": coin["name"]}
+                for coin in self.coins
+            ]
+        )
+
+    async def _coins_markets(self, request: web.Request) -> web.Response:
+        ranked = [coin for coin in self.coins if coin.get("market_cap_rank")]
+        ranked.sort(key=lambda coin: coin["market_cap_rank"])
+        return web.json_response(ranked[: int(request.query.get("per_page", 100))])
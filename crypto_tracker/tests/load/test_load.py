@@ -0,0 +1,209 @@
+"""
+Нагрузочный прогон без сети: заглушка провайдера цен, тестовая БД
+(TEST_DATABASE_URL, по умолчанию SQLite через aiosqlite), N пользователей
+с активами и историей, параллельные запросы к эндпоинтам API
+и тики worker'а в отдельном процессе.
+
+Отчет — rps и p50/p95/p99 по сценариям; rps и p95 сравниваются
+с baselines.json: регрессия — хуже baseline больше чем в (1 + LOAD_TOLERANCE) раз.
+Baseline сравнивается, только если параметры прогона совпадают.
+
+    pytest crypto_tracker/tests/load -s
+    LOAD_USERS=500 LOAD_REQUESTS=5000 TEST_DATABASE_URL=postgresql://.../crypto_test \\
+        pytest crypto_tracker/tests/load -s
+    LOAD_UPDATE_BASELINES=1 pytest crypto_tracker/tests/load -s
+"""
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from core.config import settings
+from core.database import engine
+from core.rate_limit import limiter
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from models.database import Asset, PriceHistory, User
+from sqlalchemy import insert
+
+from .harness import (
+    find_regressions,
+    format_report,
+    load_baselines,
+    run_load,
+    save_baselines,
+    summarize,
+)
+from .stub_provider import StubPriceProvider
+
+# Замеры времени — только в make bench, не в make test
+pytestmark = pytest.mark.bench
+
+PARAMS = {
+    "users": int(os.environ.get("LOAD_USERS", 20)),
+    "assets_per_user": int(os.environ.get("LOAD_ASSETS_PER_USER", 3)),
+    "history_rows": int(os.environ.get("LOAD_HISTORY_ROWS", 200)),
+    "requests": int(os.environ.get("LOAD_REQUESTS", 300)),
+    "concurrency": int(os.environ.get("LOAD_CONCURRENCY", 10)),
+    "worker_ticks": int(os.environ.get("LOAD_WORKER_TICKS", 3)),
+}
+TOLERANCE = float(os.environ.get("LOAD_TOLERANCE", 1.5))
+UPDATE_BASELINES = os.environ.get("LOAD_UPDATE_BASELINES") == "1"
+
+SYMBOLS = ["BTC", "ETH", "ADA", "DOT", "SOL"]
+WORKER_SCRIPT = Path(__file__).parent / "worker_ticks.py"
+
+
+async def seed() -> list:
+    """Пользователи: [(токен, [id активов])]"""
+    async with engine.begin() as conn:
+        users = []
+        for n in range(PARAMS["users"]):
+            user_id = (
+                await conn.execute(
+                    insert(User).values(
+                        username=f"load{n}", email=f"load{n}@example.com"
+                    )
+                )
+            ).inserted_primary_key[0]
+            asset_ids = []
+            for k in range(PARAMS["assets_per_user"]):
+                asset_ids.append(
+                    (
+                        await conn.execute(
+                            insert(Asset).values(
+                                user_id=user_id,
+                                symbol=SYMBOLS[(n + k) % len(SYMBOLS)],
+                                min_price=1,
+                                max_price=1_000_000,
+                                current_price=100,
+                            )
+                        )
+                    ).inserted_primary_key[0]
+                )
+            users.append((make_token(user_id, f"load{n}"), asset_ids))
+
+        start = datetime(2024, 1, 1)
+        history = [
+            {
+                "asset_id": asset_id,
+                "symbol": SYMBOLS[(n + k) % len(SYMBOLS)],
+                "quote": "USD",
+                "price": 100 + i % 50,
+                "recorded_at": start + timedelta(minutes=5 * i),
+            }
+            for n, (_, asset_ids) in enumerate(users)
+            for k, asset_id in enumerate(asset_ids)
+            for i in range(PARAMS["history_rows"])
+        ]
+        await conn.execute(insert(PriceHistory), history)
+    return users
+
+
+def scenarios() -> dict:
+    """Имя -> (метод, путь, тело, ожидаемый статус); {asset_id} — актив пользователя"""
+    return {
+        "auth_me": ("GET", "/api/v1/auth/me", None, 200),
+        "asset_list": ("GET", "/api/v1/assets/", None, 200),
+        "asset": ("GET", "/api/v1/assets/{asset_id}", None, 200),
+        "history": ("GET", "/api/v1/assets/{asset_id}/history?limit=100", None, 200),
+        "history_columnar": (
+            "GET",
+            "/api/v1/assets/{asset_id}/history?limit=100&format=columnar",
+            None,
+            200,
+        ),
+        "update_asset": ("PUT", "/api/v1/assets/{asset_id}", {"min_price": 2}, 200),
+        "create_asset": (
+            "POST",
+            "/api/v1/assets/",
+            {"symbol": "BTC", "min_price": 1, "max_price": 1_000_000},
+            200,
+        ),
+    }
+
+
+async def drive_gateway(client: AsyncClient, users: list) -> dict:
+    results = {}
+    for name, (method, path, body, status) in scenarios().items():
+
+        async def call(i: int, method=method, path=path, body=body) -> int:
+            token, asset_ids = users[i % len(users)]
+            response = await client.request(
+                method,
+                path.format(asset_id=asset_ids[i % len(asset_ids)]),
+                json=body,
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            return response.status_code
+
+        results[name] = await run_load(
+            call, PARAMS["requests"], PARAMS["concurrency"], status
+        )
+    return results
+
+
+async def drive_worker(provider_url: str) -> dict:
+    """Тики worker'а отдельным процессом, итог — по записям TickRecord"""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        str(WORKER_SCRIPT),
+        str(PARAMS["worker_ticks"]),
+        env={**os.environ, "COINGECKO_API_URL": provider_url, "METRICS_PORT": "0"},
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    assert process.returncode == 0, stderr.decode()
+    ticks = json.loads(stdout.decode().strip().splitlines()[-1])
+
+    durations = [tick["duration_ms"] / 1000 for tick in ticks]
+    errors = sum(tick["outcome"] != "ok" for tick in ticks)
+    result = summarize(durations, sum(durations), errors, 0)
+    result["updated_per_tick"] = [tick["counts"].get("updated", 0) for tick in ticks]
+    return result
+
+
+def test_offline_load(db):
+    async def run():
+        provider = StubPriceProvider()
+        provider_url = await provider.start()
+        original_url = settings.COINGECKO_API_URL
+        settings.COINGECKO_API_URL = provider_url
+        # Лимиты частоты рассчитаны на одного клиента, а не на нагрузочный прогон
+        limiter.enabled = False
+        try:
+            users = await seed()
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                results = await drive_gateway(c, users)
+            await engine.dispose()
+            results["worker_tick"] = await drive_worker(provider_url)
+            return results
+        finally:
+            limiter.enabled = True
+            settings.COINGECKO_API_URL = original_url
+            await provider.stop()
+            await engine.dispose()
+
+    results = asyncio.run(run())
+
+    stored = load_baselines()
+    baselines = stored["scenarios"] if stored["params"] == PARAMS else {}
+    print(f"\nПараметры: {PARAMS}\n{format_report(results, baselines)}")
+    if stored["params"] != PARAMS:
+        print("Параметры отличаются от baselines.json — сравнение пропущено")
+    if UPDATE_BASELINES:
+        save_baselines(PARAMS, results)
+
+    for name, result in results.items():
+        assert result["errors"] == 0, f"{name}: {result}"
+    assert all(results["worker_tick"]["updated_per_tick"])
+    regressions = find_regressions(results, baselines, TOLERANCE)
+    assert not regressions, "Регрессия относительно baselines.json:\n" + "\n".join(
+        regressions
+    )
@@ -0,0 +1,45 @@
+"""
+Тики worker'а для нагрузочного прогона. Запускается отдельным процессом:
+у worker'а и api_gateway одинаковые имена пакетов (core, models, ...).
+
+    python worker_ticks.py <ticks>
+
+Настройки — из окружения (DATABASE_URL, COINGECKO_API_URL, ...).
+Последняя строка stdout — JSON-список записей TickRecord.
+"""
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+WORKER_DIR = Path(__file__).resolve().parents[2] / "backend" / "worker"
+sys.path.insert(0, str(WORKER_DIR))
+
+from main import PriceUpdateWorker  # noqa: E402
+
+
+class TickCollector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+async def run(ticks: int):
+    worker = PriceUpdateWorker(interval=0)
+    for _ in range(ticks):
+        await worker.update_all_assets_prices()
+
+
+if __name__ == "__main__":
+    collector = TickCollector()
+    tick_logger = logging.getLogger("price_worker.tick")
+    tick_logger.addHandler(collector)
+    tick_logger.setLevel(logging.INFO)
+    tick_logger.propagate = False
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run(int(sys.argv[1])))
+    print(json.dumps(collector.records))
@@ -0,0 +1,49 @@
+"""
+Права администратора: только по флагу users.is_admin, не по email;
+метрики не отдаются на публичном порту API.
+"""
+import asyncio
+
+from core.database import async_session, engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from repositories.user import set_admin
+
+
+def test_admin_requires_flag(seed_series):
+    async def run():
+        try:
+            [user_id] = await seed_series.users("root")
+            headers = {"Authorization": f"Bearer {make_token(user_id, 'root')}"}
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                forbidden = await c.get("/api/v1/admin/query-stats", headers=headers)
+
+                async with async_session() as db:
+                    await set_admin(db, "root", True)
+                granted = await c.get("/api/v1/admin/query-stats", headers=headers)
+
+                async with async_session() as db:
+                    await set_admin(db, "root", False)
+                revoked = await c.get("/api/v1/admin/query-stats", headers=headers)
+            return forbidden, granted, revoked
+        finally:
+            await engine.dispose()
+
+    forbidden, granted, revoked = asyncio.run(run())
+
+    assert forbidden.status_code == 403
+    # Кэш аутентификации сбрасывается при смене прав
+    assert granted.status_code == 200, granted.text
+    assert revoked.status_code == 403
+
+
+def test_metrics_not_on_public_port():
+    async def run():
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as c:
+            return await c.get("/metrics")
+
+    # Метрики — только на API_METRICS_PORT (start_metrics_server при старте)
+    assert asyncio.run(run()).status_code == 404
@@ -0,0 +1,134 @@
+"""
+Проверка порогов на истории: векторные пересечения против правила
+worker'а и эндпоинт /assets/backtest с перебором пар.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+from core.database import engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from services.backtest import crossings
+
+TICK = timedelta(minutes=5)
+EPOCH = datetime(1970, 1, 1)
+
+
+def reference_alerts(prices, min_price, max_price):
+    """Поэлементно, теми же условиями, что find_alerts в worker"""
+    below, above = [], []
+    for i in range(1, len(prices)):
+        price, previous = prices[i], prices[i - 1]
+        if price < min_price:
+            if previous >= min_price:
+                below.append(i)
+        elif price > max_price:
+            if previous <= max_price:
+                above.append(i)
+    return below, above
+
+
+def test_crossings_match_worker_rule():
+    rng = np.random.default_rng(11)
+    # Ряд длиннее порции: пороги обрабатываются в несколько приемов
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000)))
+    mins = np.linspace(prices.min(), 100, 1000)
+    maxs = mins + 20
+
+    below, below_at = crossings(prices, mins, True, 3)
+    above, above_at = crossings(prices, maxs, False, 10**6)
+
+    for i in range(0, 1000, 37):
+        expected_below, expected_above = reference_alerts(prices, mins[i], maxs[i])
+        assert below[i] == len(expected_below)
+        assert above[i] == len(expected_above)
+        assert list(below_at[i]) == expected_below[:3]
+        assert list(above_at[i]) == expected_above
+
+
+def test_backtest_endpoint(seed_series):
+    # Цена ходит пилой 100 -> 109 -> 100: каждые 10 тиков
+    prices = [100 + i % 10 for i in range(100)]
+    start = datetime(2026, 3, 1)
+
+    async def run():
+        try:
+            [user_id] = await seed_series.users("bt")
+            [asset_id] = await seed_series.assets(user_id, ["BTC"])
+            await seed_series.prices(asset_id, prices, start, TICK)
+
+            headers = {"Authorization": f"Bearer {make_token(user_id, 'bt')}"}
+            period = {
+                "start": (start - timedelta(hours=1)).isoformat() + "Z",
+                "end": (start + 100 * TICK).isoformat() + "Z",
+            }
+            sweep = [
+                {"min_price": low, "max_price": high}
+                for low in (99, 100.5, 101)
+                for high in (105, 108.5)
+            ]
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                ok = await c.post(
+                    "/api/v1/assets/backtest",
+                    json={
+                        "symbol": "btc",
+                        "thresholds": sweep,
+                        "max_events": 2,
+                        **period,
+                    },
+                    headers=headers,
+                )
+                untracked = await c.post(
+                    "/api/v1/assets/backtest",
+                    json={"symbol": "ETH", "thresholds": sweep[:1], **period},
+                    headers=headers,
+                )
+                inverted = await c.post(
+                    "/api/v1/assets/backtest",
+                    json={
+                        "symbol": "BTC",
+                        "thresholds": [{"min_price": 5, "max_price": 4}],
+                    },
+                    headers=headers,
+                )
+                too_long = await c.post(
+                    "/api/v1/assets/backtest",
+                    json={
+                        "symbol": "BTC",
+                        "thresholds": sweep[:1],
+                        "start": "2020-01-01T00:00:00",
+                    },
+                    headers=headers,
+                )
+            return ok, untracked, inverted, too_long
+        finally:
+            await engine.dispose()
+
+    ok, untracked, inverted, too_long = asyncio.run(run())
+
+    assert ok.status_code == 200, ok.text
+    body = ok.json()
+    assert body["points"] == 100
+    results = {(r["min_price"], r["max_price"]): r for r in body["results"]}
+    assert len(results) == 6
+    for (low, high), result in results.items():
+        expected_below, expected_above = reference_alerts(prices, low, high)
+        assert result["below"] == len(expected_below)
+        assert result["above"] == len(expected_above)
+        assert result["alerts"] == result["below"] + result["above"]
+        assert result["below_at"] == [
+            (start + i * TICK - EPOCH) // timedelta(milliseconds=1)
+            for i in expected_below[:2]
+        ]
+    # Падение 109 -> 100 раз в 10 тиков пересекает min 100.5 и 101
+    assert results[(101, 105)]["below"] == 9
+    assert results[(99, 105)]["below"] == 0
+    assert results[(100.5, 108.5)]["above"] == 10
+
+    # Цен символа за период нет — 404, а не пустой результат
+    assert untracked.status_code == 404
+    assert inverted.status_code == 422
+    assert too_long.status_code == 422
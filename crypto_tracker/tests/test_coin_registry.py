@@ -0,0 +1,112 @@
+"""
+Реестр монет: синхронизация списка провайдера, поиск по префиксу
+и проверка символа при создании актива.
+"""
+import asyncio
+
+from core.config import settings
+from core.database import engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from services.coin_registry import (
+    SEED_COINS,
+    CoinEntry,
+    CoinIndex,
+    CoinRegistry,
+    coin_registry,
+    pick_primary,
+)
+
+from .load.stub_provider import StubPriceProvider
+
+PROVIDER_COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "market_cap_rank": 1},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum", "market_cap_rank": 2},
+    {"id": "bridged-ether", "symbol": "eth", "name": "Bridged Ether"},
+    {"id": "bitcoin-cash", "symbol": "bch", "name": "Bitcoin Cash"},
+    {"id": "pepe", "symbol": "pepe", "name": "Pepe", "market_cap_rank": 40},
+    {"id": "pepecoin", "symbol": "pepecoin", "name": "PepeCoin"},
+]
+
+
+def make_index(coins) -> CoinIndex:
+    rows = pick_primary(
+        [
+            {
+                "id": coin["id"],
+                "symbol": coin["symbol"].upper(),
+                "name": coin["name"],
+                "rank": coin.get("market_cap_rank"),
+            }
+            for coin in coins
+        ]
+    )
+    return CoinIndex(CoinEntry(**row) for row in rows)
+
+
+def test_coin_index_search():
+    index = make_index(PROVIDER_COINS)
+
+    assert index.coin_id("eth") == "ethereum"
+    assert index.coin_id("DOGE") is None
+    assert [coin.id for coin in index.search("ETH")] == ["ethereum", "bridged-ether"]
+    # Точное совпадение символа выше совпадений по названию
+    assert [coin.id for coin in index.search("pepe")] == ["pepe", "pepecoin"]
+    assert [coin.id for coin in index.search("bitc")] == ["bitcoin", "bitcoin-cash"]
+    assert len(index.search("b", limit=1)) == 1
+    assert index.search("  ") == []
+
+
+def test_registry_sync_and_asset_validation(seed_series, tmp_path):
+    async def run():
+        provider = StubPriceProvider(coins=PROVIDER_COINS)
+        original_url = settings.COINGECKO_API_URL
+        settings.COINGECKO_API_URL = await provider.start()
+        coin_registry.snapshot_path = tmp_path / "coins.json"
+        try:
+            [user_id] = await seed_series.users("coins")
+            headers = {"Authorization": f"Bearer {make_token(user_id, 'coins')}"}
+
+            await coin_registry.refresh()
+            await coin_registry.refresh()
+            syncs = provider.requests["/coins/list"]
+
+            snapshot = CoinRegistry(str(coin_registry.snapshot_path), 0, 0)
+            await snapshot.load_snapshot()
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                search = await c.get("/api/v1/coins/search", params={"q": "pe"})
+                body = {"min_price": 1, "max_price": 2}
+                created = await c.post(
+                    "/api/v1/assets/",
+                    json={**body, "symbol": "pepe"},
+                    headers=headers,
+                )
+                unknown = await c.post(
+                    "/api/v1/assets/",
+                    json={**body, "symbol": "NOPE"},
+                    headers=headers,
+                )
+            return syncs, snapshot, search, created, unknown
+        finally:
+            coin_registry.snapshot_path = None
+            coin_registry.index = CoinIndex(SEED_COINS)
+            coin_registry.source = "seed"
+            coin_registry.synced_at = None
+            settings.COINGECKO_API_URL = original_url
+            await provider.stop()
+            await engine.dispose()
+
+    syncs, snapshot, search, created, unknown = asyncio.run(run())
+
+    # Вторая проверка видит свежую синхронизацию и провайдера не зовет
+    assert syncs == 1
+    assert snapshot.source == "snapshot"
+    assert len(snapshot.index) == len(PROVIDER_COINS)
+    assert [coin["symbol"] for coin in search.json()] == ["PEPE", "PEPECOIN"]
+    assert created.status_code == 200, created.text
+    assert created.json()["symbol"] == "PEPE"
+    assert created.json()["current_price"] is not None
+    assert unknown.status_code == 422
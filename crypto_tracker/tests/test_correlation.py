@@ -0,0 +1,110 @@
+"""
+Корреляция активов: выравнивание рядов на общую сетку и матрицы
+по доходностям через эндпоинт /assets/correlation.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from core.database import engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from models.database import Asset
+from services.correlation import align_prices, return_matrices
+from sqlalchemy import update
+
+TICK = timedelta(minutes=5)
+
+
+def test_align_and_matrices():
+    # Пара 0: тики в интервалах 0, 0, 2 (в 1 пропуск); пара 1 — с интервала 1
+    pair_index = np.array([0, 0, 0, 1, 1, 1])
+    timestamps = np.array([0, 5, 25, 12, 20, 38])
+    prices = np.array([1.0, 2.0, 3.0, 10.0, 11.0, 12.0])
+    grid = align_prices(pair_index, timestamps, prices, 2, 0, 10, 4)
+
+    np.testing.assert_array_equal(
+        grid, [[2.0, 2.0, 3.0, 3.0], [np.nan, 10.0, 11.0, 12.0]]
+    )
+
+    rng = np.random.default_rng(3)
+    grid = np.exp(np.cumsum(rng.normal(0, 0.01, (3, 200)), axis=1))
+    grid[2, :50] = np.nan
+    covariance, correlation, observations = return_matrices(grid)
+    returns = np.diff(np.log(grid[:, 50:]), axis=1)
+    assert observations == 149
+    np.testing.assert_allclose(covariance, np.cov(returns))
+    np.testing.assert_allclose(correlation, np.corrcoef(returns))
+
+
+def test_correlation_endpoint(seed_series):
+    rng = np.random.default_rng(5)
+    ticks = 24 * 12
+    btc = 60_000 * np.exp(np.cumsum(rng.normal(0, 0.002, ticks)))
+    series = {
+        "BTC": btc,
+        # Те же доходности, что у BTC, и противоположные
+        "ETH": btc / 20,
+        "SOL": 1e7 / btc,
+    }
+
+    async def run():
+        try:
+            user_id, empty_id, renamed_id = await seed_series.users(
+                "watcher", "empty", "renamed"
+            )
+            start = datetime.utcnow() - ticks * TICK
+            # Самый старый актив отслеживал другую монету и был переименован в BTC:
+            # его прежние цены не должны попасть в ряд BTC
+            [renamed] = await seed_series.assets(renamed_id, ["DOGE"])
+            await seed_series.prices(renamed, rng.uniform(0.1, 0.2, ticks), start)
+            async with engine.begin() as conn:
+                await conn.execute(
+                    update(Asset).where(Asset.id == renamed).values(symbol="BTC")
+                )
+
+            symbols = ["SOL", "BTC", "ETH", "BTC"]
+            asset_ids = await seed_series.assets(user_id, symbols)
+            for asset_id, symbol in zip(asset_ids, symbols):
+                await seed_series.prices(asset_id, series[symbol], start)
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                responses = [
+                    await c.get(
+                        "/api/v1/assets/correlation",
+                        params={"resolution": "1h", "points": 12},
+                        headers={"Authorization": f"Bearer {make_token(uid, 'user')}"},
+                    )
+                    for uid in (user_id, empty_id)
+                ]
+                invalid = await c.get(
+                    "/api/v1/assets/correlation",
+                    params={"resolution": "2h"},
+                    headers={"Authorization": f"Bearer {make_token(user_id, 'u')}"},
+                )
+            return responses, invalid
+        finally:
+            await engine.dispose()
+
+    (ok, empty), invalid = asyncio.run(run())
+
+    assert ok.status_code == 200, ok.text
+    body = ok.json()
+    assert body["symbols"] == ["BTC", "ETH", "SOL"]
+    assert body["resolution"] == "1h"
+    assert body["end"] - body["start"] == 12 * 3600 * 1000
+    assert body["observations"] == 11
+    np.testing.assert_allclose(
+        body["correlation"], [[1, 1, -1], [1, 1, -1], [-1, -1, 1]], atol=1e-9
+    )
+    variance = body["covariance"][0][0]
+    assert variance > 0
+    assert body["covariance"][2][0] == pytest.approx(-variance)
+
+    assert empty.status_code == 200, empty.text
+    assert empty.json()["symbols"] == []
+    assert empty.json()["correlation"] == []
+    assert invalid.status_code == 422
@@ -0,0 +1,59 @@
+"""
+ETag на чтении активов: 304 только для действующего пользователя
+и чтение из primary, пока реплика может не видеть новую версию.
+"""
+import asyncio
+import time
+
+from core.cache import PRICES_TICK_AT_KEY, get_data_versions, invalidate_user_data
+from core.database import async_session, engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from repositories.user import deactivate_user
+
+
+def test_not_modified_only_for_active_user(seed_series, fake_redis):
+    async def run():
+        try:
+            [user_id] = await seed_series.users("etag")
+            await seed_series.assets(user_id, ["BTC"])
+            headers = {"Authorization": f"Bearer {make_token(user_id, 'etag')}"}
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                first = await c.get("/api/v1/assets/", headers=headers)
+                headers["If-None-Match"] = first.headers["etag"]
+                cached = await c.get("/api/v1/assets/", headers=headers)
+
+                async with async_session() as db:
+                    await deactivate_user(db, user_id)
+                deactivated = await c.get("/api/v1/assets/", headers=headers)
+            return first, cached, deactivated
+        finally:
+            await engine.dispose()
+
+    first, cached, deactivated = asyncio.run(run())
+
+    assert first.status_code == 200, first.text
+    assert cached.status_code == 304
+    assert deactivated.status_code == 401
+
+
+def test_recent_versions(fake_redis):
+    async def run():
+        await fake_redis.set(PRICES_TICK_AT_KEY, time.time() - 3600)
+        before = await get_data_versions(1)
+        await invalidate_user_data(1)
+        written = await get_data_versions(1)
+        other = await get_data_versions(2)
+        await fake_redis.set(PRICES_TICK_AT_KEY, time.time())
+        tick = await get_data_versions(2)
+        return before, written, other, tick
+
+    before, written, other, tick = asyncio.run(run())
+
+    assert before == ("0", "0", False)
+    # Запись пользователя и свежий тик — окно, когда реплика может отставать
+    assert written == ("1", "0", True)
+    assert other[2] is False
+    assert tick[2] is True
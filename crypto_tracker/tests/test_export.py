@@ -0,0 +1,108 @@
+"""
+Выгрузка истории цен: период из запроса с часовым поясом сравнивается
+с recorded_at в UTC без зоны; Arrow/Parquet читаются обратно pyarrow.
+"""
+import asyncio
+import io
+from datetime import datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from core.database import engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+
+START = datetime(2024, 1, 1)
+STEP = timedelta(minutes=5)
+
+
+def export(seed_series, symbols, path, params):
+    """
+    Пользователь с активами symbols (по 12 цен 1..12 с шагом STEP);
+    GET path.format(asset_id=первый актив) от его имени
+    """
+
+    async def run():
+        try:
+            [user_id] = await seed_series.users("exporter")
+            asset_ids = await seed_series.assets(user_id, symbols)
+            for asset_id in asset_ids:
+                await seed_series.prices(asset_id, range(1, 13), START, STEP)
+
+            headers = {"Authorization": f"Bearer {make_token(user_id, 'exporter')}"}
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                return await c.get(
+                    path.format(asset_id=asset_ids[0]), params=params, headers=headers
+                )
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def test_export_period_with_timezone(seed_series):
+    # 03:30+03:00 — это 00:30 UTC
+    response = export(
+        seed_series,
+        ["BTC"],
+        "/api/v1/assets/{asset_id}/export",
+        {
+            "format": "csv",
+            "start": "2024-01-01T03:30:00+03:00",
+            "end": "2024-01-01T00:45:00Z",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.text.splitlines() == [
+        "timestamp,price",
+        "2024-01-01T00:30:00,7.0",
+        "2024-01-01T00:35:00,8.0",
+        "2024-01-01T00:40:00,9.0",
+    ]
+
+
+def test_export_arrow_round_trip(seed_series):
+    response = export(
+        seed_series,
+        ["BTC"],
+        "/api/v1/assets/{asset_id}/export",
+        {"format": "arrow", "start": "2024-01-01T00:10:00Z"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.schema == pa.schema(
+        [("recorded_at", pa.timestamp("us")), ("price", pa.float64())]
+    )
+    assert table.num_rows == 10
+    recorded_at = table.column("recorded_at").to_pylist()
+    assert (recorded_at[0], recorded_at[-1]) == (START + 2 * STEP, START + 11 * STEP)
+
+
+def test_export_parquet_round_trip(seed_series):
+    response = export(
+        seed_series,
+        ["BTC", "ETH"],
+        "/api/v1/assets/export",
+        {"format": "parquet", "end": "2024-01-01T00:30:00Z"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.schema.remove_metadata() == pa.schema(
+        [
+            ("asset_id", pa.int32()),
+            ("symbol", pa.string()),
+            ("recorded_at", pa.timestamp("us")),
+            ("price", pa.float64()),
+        ]
+    )
+    assert table.num_rows == 12
+    assert sorted(set(table.column("symbol").to_pylist())) == ["BTC", "ETH"]
+    recorded_at = table.column("recorded_at").to_pylist()
+    assert (min(recorded_at), max(recorded_at)) == (START, START + 5 * STEP)
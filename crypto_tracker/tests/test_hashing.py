@@ -0,0 +1,103 @@
+"""
+Хэширование паролей вне event loop: очередь ограничена (503),
+одновременно работает не больше workers потоков; вход пересчитывает
+хэш с устаревшими параметрами.
+"""
+import asyncio
+import threading
+
+import pytest
+from core.config import settings
+from core.database import async_session, engine
+from core.hashing import HashingPool
+from core.rate_limit import limiter
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+from main import app
+from passlib.hash import pbkdf2_sha256
+from repositories.user import get_user_by_id
+
+
+def test_queue_limit_rejects():
+    pool = HashingPool(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.ensure_future(pool.run(release.wait))
+        queued = asyncio.ensure_future(pool.run(release.wait))
+        while pool.waiting < 1 or pool.in_flight < 1:
+            await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(HTTPException) as rejected:
+                await pool.run(release.wait)
+        finally:
+            release.set()
+            await asyncio.gather(running, queued)
+        return rejected.value
+
+    rejected = asyncio.run(run())
+
+    assert rejected.status_code == 503
+    assert rejected.headers == {"Retry-After": "1"}
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["completed"] == 2
+
+
+def test_concurrency_bounded_by_workers():
+    pool = HashingPool(workers=2, max_queue=100)
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        threading.Event().wait(0.02)
+        with lock:
+            running -= 1
+
+    async def run():
+        await asyncio.gather(*(pool.run(work) for _ in range(8)))
+
+    # Семафор привязан к своему event loop: пул работает и в следующем
+    asyncio.run(run())
+    asyncio.run(run())
+
+    assert peak == 2
+    assert pool.stats()["completed"] == 16
+
+
+def test_login_rehashes_outdated_hash(seed_series, monkeypatch):
+    # Счетчик лимита входа общий для процесса — не тратим его здесь
+    monkeypatch.setattr(limiter, "enabled", False)
+    rounds = settings.PASSWORD_HASH_ROUNDS
+    outdated = pbkdf2_sha256.using(rounds=rounds // 2).hash("secret-password")
+
+    async def run():
+        try:
+            [user_id] = await seed_series.users("hasher")
+            async with async_session() as db:
+                user = await get_user_by_id(db, user_id)
+                user.password_hash = outdated
+                await db.commit()
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                response = await c.post(
+                    "/api/v1/auth/login",
+                    json={"email": "hasher@example.com", "password": "secret-password"},
+                )
+
+            async with async_session() as db:
+                return response, (await get_user_by_id(db, user_id)).password_hash
+        finally:
+            await engine.dispose()
+
+    response, password_hash = asyncio.run(run())
+
+    assert response.status_code == 200, response.text
+    assert password_hash != outdated
+    assert pbkdf2_sha256.from_string(password_hash).rounds == rounds
+    assert pbkdf2_sha256.verify("secret-password", password_hash)
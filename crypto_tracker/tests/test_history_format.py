@@ -0,0 +1,32 @@
+"""
+Выбор формата истории цен по ?format= и заголовку Accept с весами q.
+"""
+import pytest
+from services.history_format import negotiate_format
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, "json"),
+        ("application/x-msgpack", "msgpack"),
+        ("application/x-msgpack;q=0.1, application/json", "json"),
+        ("application/json;q=0.1, application/x-msgpack", "msgpack"),
+        ("application/json;q=0.1, text/csv", "json"),
+        (
+            "application/x-msgpack;q=0.5, "
+            "application/vnd.cryptotracker.columnar+json;q=0.9, */*;q=0.1",
+            "columnar",
+        ),
+        # При равных q — первый в заголовке
+        ("application/msgpack, application/json", "msgpack"),
+        ("application/x-msgpack;q=0", "json"),
+        ("text/csv", "json"),
+    ],
+)
+def test_negotiate_format(accept, expected):
+    assert negotiate_format(accept) == expected
+
+
+def test_format_param_wins():
+    assert negotiate_format("application/x-msgpack", "columnar") == "columnar"
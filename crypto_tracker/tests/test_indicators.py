@@ -0,0 +1,179 @@
+"""
+Индикаторы: векторный расчет против поэлементного, один расчет
+на тик для всех запросов символа и эндпоинт /assets/{id}/indicators.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from core.database import async_session, engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from models.database import Asset
+from repositories.price_history import (
+    get_symbol_price_series,
+    get_symbols_price_history,
+)
+from services.indicators import compute_indicators, ewm, indicator_cache
+from services.tick_cache import TickCache
+from sqlalchemy import update
+
+TICK = timedelta(minutes=5)
+
+
+def reference_ewm(values, alpha):
+    result = [values[0]]
+    for value in values[1:]:
+        result.append(alpha * value + (1 - alpha) * result[-1])
+    return result
+
+
+def test_vectorized_indicators():
+    rng = np.random.default_rng(7)
+    prices = 60_000 * np.exp(np.cumsum(rng.normal(0, 0.01, 5000)))
+    timestamps = np.arange(len(prices), dtype=np.int64) * 300_000
+
+    # Несколько блоков замкнутой формы подряд совпадают с рекурсией
+    for alpha in (2 / 3, 2 / 21, 1 / 14):
+        np.testing.assert_allclose(
+            ewm(prices, alpha), reference_ewm(list(prices), alpha), rtol=1e-9
+        )
+
+    window = 20
+    result = compute_indicators(timestamps, prices, window)
+    last = prices[-window:]
+    assert result["sma"][-1] == pytest.approx(last.mean())
+    assert result["bb_upper"][-1] == pytest.approx(last.mean() + 2 * last.std())
+    assert np.isnan(result["sma"][window - 2])
+    assert np.isnan(result["rsi"][window - 1])
+    assert 0 < result["rsi"][-1] < 100
+    returns = np.diff(np.log(prices))[-window:]
+    year = np.sqrt(365 * 24 * 12)
+    assert result["volatility"][-1] == pytest.approx(returns.std(ddof=1) * year)
+
+    flat = compute_indicators(timestamps[:50], np.full(50, 100.0), window)
+    assert flat["rsi"][-1] == 50
+    assert flat["bb_upper"][-1] == flat["bb_lower"][-1] == 100
+    rising = compute_indicators(timestamps[:50], np.arange(1.0, 51.0), window)
+    assert rising["rsi"][-1] == 100
+
+
+def test_cache_one_computation_per_tick():
+    cache = TickCache("test", max_size=2)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return f"body{len(calls)}".encode()
+
+    async def run():
+        key = ("BTC", "USD", 20, 100)
+        first = await asyncio.gather(*(cache.get(key, 1, compute) for _ in range(50)))
+        again = await cache.get(key, 1, compute)
+        next_tick = await cache.get(key, 2, compute)
+        # Без Redis номера тика нет — каждый запрос считает сам
+        uncached = [await cache.get(key, None, compute) for _ in range(2)]
+        return first, again, next_tick, uncached
+
+    first, again, next_tick, uncached = asyncio.run(run())
+
+    assert set(first) == {b"body1"}
+    assert again == b"body1"
+    assert next_tick == b"body2"
+    assert len(calls) == 4
+    assert cache.stats()["shared"] == 49
+
+
+def test_indicators_endpoint(seed_series):
+    async def run():
+        try:
+            old_id, new_id = await seed_series.users("old", "new")
+            [old_asset] = await seed_series.assets(old_id, ["BTC"])
+            [new_asset] = await seed_series.assets(new_id, ["BTC"])
+            start = datetime(2026, 1, 1)
+            # У нового актива история короче, но ряд символа общий
+            for asset_id, first in ((old_asset, 0), (new_asset, 280)):
+                await seed_series.prices(
+                    asset_id,
+                    [60_000 + 10 * i for i in range(first, 300)],
+                    start + first * TICK,
+                )
+
+            headers = {"Authorization": f"Bearer {make_token(new_id, 'new')}"}
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                ok = await c.get(
+                    f"/api/v1/assets/{new_asset}/indicators",
+                    params={"window": 14, "points": 50},
+                    headers=headers,
+                )
+                foreign = await c.get(
+                    f"/api/v1/assets/{old_asset}/indicators", headers=headers
+                )
+                too_wide = await c.get(
+                    f"/api/v1/assets/{new_asset}/indicators",
+                    params={"window": 1000},
+                    headers=headers,
+                )
+            return ok, foreign, too_wide
+        finally:
+            await engine.dispose()
+
+    misses = indicator_cache.misses
+    ok, foreign, too_wide = asyncio.run(run())
+
+    assert ok.status_code == 200, ok.text
+    body = ok.json()
+    assert body["symbol"] == "BTC" and body["quote"] == "USD"
+    assert body["tick"] is None
+    assert len(body["t"]) == len(body["sma"]) == 50
+    assert body["price"][-1] == 60_000 + 10 * 299
+    assert body["price"][0] == 60_000 + 10 * 250
+    assert body["sma"][-1] == pytest.approx(60_000 + 10 * (299 - 6.5))
+    assert body["rsi"][-1] == 100
+    assert foreign.status_code == 404
+    assert too_wide.status_code == 422
+    assert indicator_cache.misses == misses + 1
+
+
+def test_symbol_series_after_rename(seed_series):
+    start = datetime(2026, 1, 1)
+
+    async def run():
+        try:
+            first, second = await seed_series.users("renamed", "paused")
+            # Самый старый актив сначала отслеживал ETH, затем его переименовали
+            [renamed] = await seed_series.assets(first, ["ETH"])
+            [paused] = await seed_series.assets(second, ["BTC"])
+            await seed_series.prices(renamed, [3000.0] * 10, start)
+            async with engine.begin() as conn:
+                await conn.execute(
+                    update(Asset).where(Asset.id == renamed).values(symbol="BTC")
+                )
+            btc = [60_000.0 + i for i in range(20)]
+            await seed_series.prices(renamed, btc[5:], start + 5 * TICK)
+            # Второй актив был приостановлен на тиках 5..9
+            await seed_series.prices(paused, btc[:5], start)
+            await seed_series.prices(paused, btc[10:], start + 10 * TICK)
+
+            async with async_session() as db:
+                series = await get_symbol_price_series(db, "BTC", "USD", 100)
+                history = await get_symbols_price_history(
+                    db, [("BTC", "USD"), ("ETH", "USD")], start, start + 20 * TICK
+                )
+            return series, history
+        finally:
+            await engine.dispose()
+
+    series, history = asyncio.run(run())
+
+    # Ряд BTC — без цен ETH и без дыры приостановленного актива
+    assert [row.price for row in reversed(series)] == [60_000.0 + i for i in range(20)]
+    assert [row.recorded_at for row in reversed(series)] == [
+        start + i * TICK for i in range(20)
+    ]
+    assert [row.symbol for row in history].count("BTC") == 20
+    assert {row.price for row in history if row.symbol == "ETH"} == {3000.0}
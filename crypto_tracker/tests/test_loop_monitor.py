@@ -0,0 +1,43 @@
+"""
+Монитор event loop: синхронный вызов внутри корутины должен попасть
+в задержку планирования, а детектор — записать его стек.
+"""
+import asyncio
+import time
+
+from core.loop_monitor import LoopMonitor
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+def test_blocking_call_is_detected():
+    monitor = LoopMonitor(interval=0.05, block_threshold_ms=50, detect_blocking=True)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.1)
+        blocking_call()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert monitor.max_lag >= 0.2
+    assert monitor.blocks == 1
+    assert "blocking_call" in monitor.recent_blocks[0]["stack"]
+
+
+def test_no_blocks_on_idle_loop():
+    monitor = LoopMonitor(interval=0.02, block_threshold_ms=100, detect_blocking=True)
+
+    async def scenario():
+        monitor.start()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+
+    asyncio.run(scenario())
+
+    assert monitor.blocks == 0
+    assert monitor.max_lag < 0.1
@@ -0,0 +1,139 @@
+"""
+Кэш аутентификации: сброс при изменении пользователя, срок жизни записей
+и гонка "запрос прочитал пользователя из БД до сброса".
+"""
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import api.v1.endpoints.admin
+import core.principal_cache
+import core.security
+import pytest
+import repositories.user
+from core.database import async_session, engine
+from core.principal_cache import PrincipalCache
+from core.security import decode_token, make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from models.schemas import UserResponse
+from repositories.user import get_user_by_id, set_admin, update_password_hash
+
+PRINCIPAL = UserResponse(
+    id=1,
+    username="alice",
+    email="alice@example.com",
+    is_active=True,
+    created_at=datetime(2024, 1, 1),
+)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Свой кэш вместо общего: записи прошлых тестов не мешают"""
+    cache = PrincipalCache(max_size=100, ttl=60, use_redis=False)
+    for module in (core.security, repositories.user, api.v1.endpoints.admin):
+        monkeypatch.setattr(module, "principal_cache", cache)
+    return cache
+
+
+def test_invalidated_on_user_changes(seed_series, cache):
+    async def run():
+        try:
+            [user_id] = await seed_series.users("alice")
+            token = make_token(user_id, "alice")
+            iat = decode_token(token)["iat"]
+            headers = {"Authorization": f"Bearer {token}"}
+            cached = []
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+
+                async def me():
+                    response = await c.get("/api/v1/auth/me", headers=headers)
+                    cached.append(await cache.get(user_id, iat) is not None)
+                    return response
+
+                async def after(change):
+                    async with async_session() as db:
+                        await change(db)
+                    cached.append(await cache.get(user_id, iat) is not None)
+                    return await me()
+
+                await me()
+                admin = await after(lambda db: set_admin(db, "alice", True))
+                stats = await c.get("/api/v1/admin/principal-cache", headers=headers)
+
+                async def rehash(db):
+                    user = await get_user_by_id(db, user_id)
+                    await update_password_hash(db, user, "rehashed")
+
+                await after(rehash)
+                await c.delete("/api/v1/auth/me", headers=headers)
+                cached.append(await cache.get(user_id, iat) is not None)
+                deactivated = await c.get("/api/v1/auth/me", headers=headers)
+                health = await c.get("/health")
+            return cached, admin, stats, deactivated, health
+        finally:
+            await engine.dispose()
+
+    cached, admin, stats, deactivated, health = asyncio.run(run())
+
+    # Запрос кэширует, изменение пользователя сбрасывает
+    assert cached == [True, False, True, False, True, False]
+    assert admin.json()["is_admin"] is True
+    assert stats.status_code == 200
+    assert stats.json()["invalidations"] == 1
+    assert deactivated.status_code == 401
+    # Статистика кэша — только администраторам
+    assert "principal_cache" not in health.json()
+
+
+def test_entries_expire(monkeypatch):
+    clock = SimpleNamespace(monotonic=lambda: 0.0)
+    monkeypatch.setattr(core.principal_cache, "time", clock)
+    cache = PrincipalCache(max_size=100, ttl=60, use_redis=False)
+
+    async def run():
+        await cache.set(1, 100, PRINCIPAL, await cache.generation(1))
+        clock.monotonic = lambda: 59.0
+        fresh = await cache.get(1, 100)
+        clock.monotonic = lambda: 61.0
+        expired = await cache.get(1, 100)
+        return fresh, expired
+
+    fresh, expired = asyncio.run(run())
+
+    assert fresh == PRINCIPAL
+    assert expired is None
+    assert cache.stats()["size"] == 0
+
+
+def test_stale_principal_not_cached(fake_redis):
+    # Два процесса gateway с общим Redis
+    first = PrincipalCache(max_size=100, ttl=60, use_redis=True)
+    second = PrincipalCache(max_size=100, ttl=60, use_redis=True)
+
+    async def run():
+        # Сброс в том же процессе, пока запрос читал из БД
+        generation = await first.generation(1)
+        await first.invalidate(1)
+        await first.set(1, 100, PRINCIPAL, generation)
+        same_process = await first.get(1, 100)
+
+        # Сброс в другом процессе
+        generation = await first.generation(1)
+        await second.invalidate(1)
+        await first.set(1, 100, PRINCIPAL, generation)
+        other_process = (await first.get(1, 100), await second.get(1, 100))
+
+        # Без сброса запись видна обоим процессам
+        await first.set(1, 100, PRINCIPAL, await first.generation(1))
+        fresh = await second.get(1, 100)
+        return same_process, other_process, fresh
+
+    same_process, other_process, fresh = asyncio.run(run())
+
+    assert same_process is None
+    assert other_process == (None, None)
+    assert fresh == PRINCIPAL
@@ -0,0 +1,73 @@
+"""
+Профилирование запроса по подписанному токену: токен выдает администратор,
+профиль скачивается как .prof; неверный и просроченный токены игнорируются.
+"""
+import asyncio
+import pstats
+
+from core.config import settings
+from core.database import async_session, engine
+from core.profiling import ProfilingMiddleware, make_profile_token
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from repositories.user import set_admin
+
+
+def test_profile_by_signed_token(seed_series, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    profile_dir = tmp_path / "profiles"
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(profile_dir))
+    invalid = {"bad": "9999999999.deadbeef", "expired": make_profile_token(ttl=-1)}
+
+    async def run():
+        try:
+            [user_id] = await seed_series.users("profiler")
+            headers = {"Authorization": f"Bearer {make_token(user_id, 'profiler')}"}
+            # Middleware подключается при импорте main только с PROFILING_ENABLED
+            transport = ASGITransport(app=ProfilingMiddleware(app))
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                forbidden = await c.post(
+                    "/api/v1/admin/profiles/token", headers=headers
+                )
+                async with async_session() as db:
+                    await set_admin(db, "profiler", True)
+                issued = await c.post(
+                    "/api/v1/admin/profiles/token", params={"ttl": 60}, headers=headers
+                )
+
+                profiled = await c.get(
+                    "/api/v1/auth/me",
+                    headers={**headers, "X-Profile": issued.json()["token"]},
+                )
+                profile_id = profiled.headers["x-profile-id"]
+                download = await c.get(
+                    f"/api/v1/admin/profiles/{profile_id}", headers=headers
+                )
+                ignored = {
+                    name: await c.get(
+                        "/api/v1/auth/me", headers={**headers, "X-Profile": token}
+                    )
+                    for name, token in invalid.items()
+                }
+            return forbidden, issued, profiled, download, ignored
+        finally:
+            await engine.dispose()
+
+    forbidden, issued, profiled, download, ignored = asyncio.run(run())
+
+    assert forbidden.status_code == 403
+    assert issued.status_code == 200, issued.text
+    assert profiled.status_code == 200
+    assert download.status_code == 200
+    assert download.headers["content-disposition"].endswith('.prof"')
+    saved = tmp_path / "downloaded.prof"
+    saved.write_bytes(download.content)
+    assert pstats.Stats(str(saved)).total_calls > 0
+    for response in ignored.values():
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+    # Профиль сохранен только для запроса с верным токеном
+    assert [path.stem for path in profile_dir.glob("*.prof")] == [
+        profiled.headers["x-profile-id"]
+    ]
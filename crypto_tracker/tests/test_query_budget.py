@@ -0,0 +1,94 @@
+"""
+Бюджет SQL-запросов на эндпоинт.
+
+Каждый запрос считается по событию before_cursor_execute движка.
+Пользователь уже в кэше принципалов (как у обычного клиента после
+первого запроса), поэтому проверка владельца и сама выборка
+должны уложиться в один round-trip.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from core.database import engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from sqlalchemy import event
+
+# (метод, путь, тело, ожидаемый статус, максимум SQL-запросов)
+BUDGETS = [
+    ("GET", "/api/v1/auth/me", None, 200, 0),
+    ("GET", "/api/v1/assets/", None, 200, 1),
+    ("GET", "/api/v1/assets/all", None, 200, 1),
+    ("GET", "/api/v1/assets/{asset_id}", None, 200, 1),
+    ("GET", "/api/v1/assets/{asset_id}/history", None, 200, 1),
+    ("GET", "/api/v1/assets/{asset_id}/history?format=columnar", None, 200, 1),
+    ("GET", "/api/v1/assets/{foreign_id}/history", None, 404, 1),
+    ("PUT", "/api/v1/assets/{asset_id}", {"min_price": 10}, 200, 1),
+    ("PUT", "/api/v1/assets/{foreign_id}", {"min_price": 10}, 404, 1),
+    ("DELETE", "/api/v1/assets/{asset_id}", None, 200, 1),
+    ("DELETE", "/api/v1/assets/{foreign_id}", None, 404, 1),
+    ("POST", "/api/v1/assets/{asset_id}/restore", None, 200, 1),
+]
+
+
+async def seed(seed_series) -> dict:
+    user_id, other_id = await seed_series.users("owner", "other")
+    [asset_id] = await seed_series.assets(user_id, ["BTC"])
+    [foreign_id] = await seed_series.assets(other_id, ["BTC"])
+    for asset in (asset_id, foreign_id):
+        await seed_series.prices(
+            asset,
+            [50 + i for i in range(10)],
+            datetime(2024, 1, 1),
+            timedelta(minutes=1),
+        )
+    return {
+        "asset_id": asset_id,
+        "foreign_id": foreign_id,
+        "token": make_token(user_id, "owner"),
+    }
+
+
+@pytest.mark.parametrize(
+    "method,path,body,expected_status,budget",
+    BUDGETS,
+    ids=[f"{method} {path}" for method, path, *_ in BUDGETS],
+)
+def test_query_budget(seed_series, method, path, body, expected_status, budget):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    async def run():
+        try:
+            ids = await seed(seed_series)
+            headers = {"Authorization": f"Bearer {ids['token']}"}
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                # Прогрев кэша принципалов
+                assert (await c.get("/api/v1/auth/me", headers=headers)).is_success
+
+                event.listen(
+                    engine.sync_engine, "before_cursor_execute", count_statement
+                )
+                try:
+                    return await c.request(
+                        method, path.format(**ids), json=body, headers=headers
+                    )
+                finally:
+                    event.remove(
+                        engine.sync_engine, "before_cursor_execute", count_statement
+                    )
+        finally:
+            await engine.dispose()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == expected_status, response.text
+    assert len(statements) <= budget, (
+        f"{method} {path}: {len(statements)} SQL-запросов при бюджете {budget}:\n"
+        + "\n---\n".join(statements)
+    )
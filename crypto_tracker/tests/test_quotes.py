@@ -0,0 +1,113 @@
+"""
+Валюты котировки: актив в EUR через API и тик worker'а, который
+забирает все нужные валюты одним запросом к провайдеру.
+"""
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+from core.config import settings
+from core.database import engine
+from core.security import make_token
+from httpx import ASGITransport, AsyncClient
+from main import app
+from models.database import Asset, PriceHistory
+from sqlalchemy import select
+
+from .load.stub_provider import STUB_FX, StubPriceProvider, stub_price
+
+WORKER_TICKS = Path(__file__).resolve().parent / "load" / "worker_ticks.py"
+
+
+def test_asset_in_eur(seed_series):
+    async def run():
+        provider = StubPriceProvider()
+        original_url = settings.COINGECKO_API_URL
+        settings.COINGECKO_API_URL = await provider.start()
+        try:
+            [user_id] = await seed_series.users("quotes")
+            headers = {"Authorization": f"Bearer {make_token(user_id, 'quotes')}"}
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                body = {"symbol": "BTC", "quote": "EUR", "min_price": 1, "max_price": 2}
+                created = await c.post("/api/v1/assets/", json=body, headers=headers)
+                url = f"/api/v1/assets/{created.json()['id']}"
+                same = await c.put(url, json={"symbol": "btc"}, headers=headers)
+                updated = await c.put(url, json={"symbol": "ETH"}, headers=headers)
+                unsupported = await c.post(
+                    "/api/v1/assets/", json={**body, "quote": "XYZ"}, headers=headers
+                )
+            return created, same, updated, unsupported, provider.requests
+        finally:
+            settings.COINGECKO_API_URL = original_url
+            await provider.stop()
+            await engine.dispose()
+
+    created, same, updated, unsupported, requests = asyncio.run(run())
+
+    assert created.status_code == 200, created.text
+    assert created.json()["quote"] == "EUR"
+    assert created.json()["current_price"] == pytest.approx(
+        stub_price("bitcoin", 1) * STUB_FX["eur"]
+    )
+    # Тот же символ — без запроса к провайдеру, цена прежняя
+    assert same.status_code == 200, same.text
+    assert same.json()["current_price"] == created.json()["current_price"]
+    # Смена символа: цена в валюте актива
+    assert updated.status_code == 200, updated.text
+    assert updated.json()["symbol"] == "ETH"
+    assert updated.json()["current_price"] == pytest.approx(
+        stub_price("ethereum", 1) * STUB_FX["eur"]
+    )
+    assert requests["/simple/price"] == 2
+    assert unsupported.status_code == 422
+
+
+def test_worker_fetches_all_quotes_in_one_request(seed_series):
+    async def seed():
+        [user_id] = await seed_series.users("quotes")
+        await seed_series.assets(user_id, ["BTC", "ETH"], quote="USD")
+        await seed_series.assets(user_id, ["BTC"], quote="EUR")
+
+    async def history():
+        async with engine.connect() as conn:
+            rows = await conn.execute(
+                select(Asset.symbol, Asset.quote, PriceHistory.price).join(
+                    PriceHistory, PriceHistory.asset_id == Asset.id
+                )
+            )
+            return {(symbol, quote): price for symbol, quote, price in rows}
+
+    async def run():
+        provider = StubPriceProvider()
+        provider_url = await provider.start()
+        try:
+            await seed()
+            await engine.dispose()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                str(WORKER_TICKS),
+                "1",
+                env={**os.environ, "COINGECKO_API_URL": provider_url},
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await process.communicate()
+            assert process.returncode == 0, stderr.decode()
+            ticks = json.loads(stdout.decode().strip().splitlines()[-1])
+            return ticks, await history(), provider.requests
+        finally:
+            await provider.stop()
+            await engine.dispose()
+
+    ticks, prices, requests = asyncio.run(run())
+
+    assert requests["/simple/price"] == 1
+    assert ticks[0]["counts"]["quotes"] == 2
+    assert ticks[0]["counts"]["updated"] == 3
+    assert prices[("BTC", "EUR")] == pytest.approx(
+        prices[("BTC", "USD")] * STUB_FX["eur"]
+    )
@@ -0,0 +1,43 @@
+"""
+Лимиты запросов на limits.aio: 429 с Retry-After и счет в памяти,
+пока хранилище недоступно.
+"""
+import asyncio
+
+from core.database import engine
+from core.rate_limit import RateLimiter
+from httpx import ASGITransport, AsyncClient
+from limits import parse
+from main import app
+
+
+def test_login_limit(db):
+    async def run():
+        try:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                credentials = {"email": "nobody@example.com", "password": "wrong"}
+                return [
+                    await c.post("/api/v1/auth/login", json=credentials)
+                    for _ in range(6)
+                ]
+        finally:
+            await engine.dispose()
+
+    responses = asyncio.run(run())
+
+    assert [r.status_code for r in responses] == [401] * 5 + [429]
+    assert int(responses[-1].headers["retry-after"]) == 60
+
+
+def test_memory_fallback():
+    # Порт 1 закрыт: хранилище недоступно, счет идет в памяти процесса
+    limiter = RateLimiter(
+        "async+redis://127.0.0.1:1", strategy="moving-window", key_prefix="test"
+    )
+    item = parse("2/minute")
+
+    async def run():
+        return [await limiter.hit(item, "ip:1", "scope") for _ in range(3)]
+
+    assert asyncio.run(run()) == [True, True, False]
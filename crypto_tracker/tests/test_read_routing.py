@@ -0,0 +1,116 @@
+"""
+Маршрутизация чтения: SELECT в реплику, после записи пользователя —
+в primary на READ_YOUR_WRITES_WINDOW (и после записи в другом процессе —
+по отметке в Redis); истекшие окна не копятся.
+"""
+import asyncio
+from collections import Counter
+
+import core.database
+import pytest
+from core.cache import invalidate_user_data
+from core.database import (
+    DATABASE_URL,
+    async_session,
+    engine,
+    make_engine,
+    route_user_reads,
+)
+from models.database import Asset
+from sqlalchemy import event, select, update
+
+
+@pytest.fixture
+def statements(monkeypatch):
+    """
+    "Реплика" — второй пул к той же тестовой БД: важно, куда ушел запрос.
+    Счетчик SELECT по пулам: primary / replica
+    """
+    replica = make_engine(DATABASE_URL)
+    monkeypatch.setattr(core.database, "replica_engine", replica)
+    monkeypatch.setattr(core.database, "_recent_writes", {})
+    counter = Counter()
+
+    def count(name):
+        def before_cursor_execute(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                counter[name] += 1
+
+        return before_cursor_execute
+
+    count_primary = count("primary")
+    event.listen(engine.sync_engine, "before_cursor_execute", count_primary)
+    event.listen(replica.sync_engine, "before_cursor_execute", count("replica"))
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", count_primary)
+    asyncio.run(replica.dispose())
+
+
+def test_reads_follow_user_writes(seed_series, statements):
+    async def read_assets(user_id):
+        async with async_session() as db:
+            db.info["user_id"] = user_id
+            await db.execute(select(Asset).where(Asset.user_id == user_id))
+
+    async def run():
+        try:
+            writer, reader = await seed_series.users("writer", "reader")
+            [asset_id] = await seed_series.assets(writer, ["BTC"])
+
+            await read_assets(writer)
+            before = statements.copy()
+
+            async with async_session() as db:
+                db.info["user_id"] = writer
+                await db.execute(
+                    update(Asset).where(Asset.id == asset_id).values(min_price=2)
+                )
+                await db.commit()
+
+            statements.clear()
+            await read_assets(writer)
+            await read_assets(reader)
+            return before, statements.copy()
+        finally:
+            await engine.dispose()
+
+    before, after = asyncio.run(run())
+
+    assert before == {"replica": 1}
+    # Писавший читает из primary, остальные — из реплики
+    assert after == {"primary": 1, "replica": 1}
+
+
+def test_reads_follow_writes_in_other_process(seed_series, statements, fake_redis):
+    async def read_assets(user_id):
+        async with async_session() as db:
+            await route_user_reads(db, user_id)
+            await db.execute(select(Asset).where(Asset.user_id == user_id))
+
+    async def run():
+        try:
+            writer, reader = await seed_series.users("writer", "reader")
+            # Запись в другом процессе gateway: в этом окна нет, только отметка
+            await invalidate_user_data(writer)
+
+            await read_assets(writer)
+            await read_assets(reader)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+    assert core.database._recent_writes == {}
+    assert statements == {"primary": 1, "replica": 1}
+
+
+def test_expired_write_windows_are_pruned(monkeypatch):
+    recent_writes = {1: 0.0, 2: 0.0}
+    monkeypatch.setattr(core.database, "_recent_writes", recent_writes)
+
+    class WroteSession:
+        info = {"wrote": True, "user_id": 3}
+
+    core.database.remember_user_write(WroteSession())
+
+    assert list(recent_writes) == [3]
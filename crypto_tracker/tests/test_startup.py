@@ -0,0 +1,137 @@
+"""
+Старт gateway: бюджет времени импорта, порт метрик и готовность (GET /ready).
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import urllib.request
+from pathlib import Path
+
+import pytest
+from core.database import Base, engine
+from core.metrics import start_metrics_server
+from core.readiness import CoinRegistryNotLoaded, readiness
+from httpx import ASGITransport, AsyncClient
+from main import app
+from services.coin_registry import coin_registry
+
+API_GATEWAY_DIR = Path(__file__).resolve().parent.parent / "backend" / "api_gateway"
+
+# Холодный импорт main в отдельном процессе, секунд
+IMPORT_BUDGET = float(os.environ.get("IMPORT_BUDGET", 3.0))
+# Необязательные модули, которые без настроек не должны импортироваться на старте
+LAZY_MODULES = ("sentry_sdk", "opentelemetry", "pyarrow")
+
+IMPORT_SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+import main
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def cold_import() -> dict:
+    env = {
+        **os.environ,
+        "SENTRY_DSN": "",
+        "OTEL_EXPORTER_OTLP_ENDPOINT": "",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=API_GATEWAY_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_lazy_imports():
+    assert cold_import()["loaded"] == []
+
+
+# Замер времени зависит от машины — только в make bench
+@pytest.mark.bench
+def test_import_budget():
+    report = cold_import()
+
+    print(f"\nimport main: {report['seconds']:.3f} s")
+    assert report["seconds"] < IMPORT_BUDGET
+
+
+def test_metrics_port_busy(caplog):
+    # Порт уже занят: второй процесс uvicorn --workers или worker
+    with socket.socket() as busy:
+        busy.bind(("0.0.0.0", 0))
+        busy.listen()
+        port = busy.getsockname()[1]
+
+        assert start_metrics_server(port) is None
+    assert f"Metrics port {port} unavailable" in caplog.text
+
+    server = start_metrics_server(port)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert b"gateway_http_request_duration_seconds" in body
+
+
+def test_ready_after_warm_up(db, monkeypatch):
+    # Как сразу после старта: ни снимка, ни загрузки из БД
+    monkeypatch.setattr(coin_registry, "_refreshed", False)
+    monkeypatch.setattr(coin_registry, "sync_interval", 0)
+
+    async def run():
+        try:
+            # Схема тестовой БД без таблиц — как до применения миграций
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                not_ready = await c.get("/ready")
+
+                # Без таблиц (миграции не применены) прогрев не проходит
+                try:
+                    await readiness.warm_up()
+                except Exception:
+                    pass
+                not_migrated = await c.get("/ready")
+
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+
+                # Реестр монет еще не загружен — символы не проверить
+                with pytest.raises(CoinRegistryNotLoaded):
+                    await readiness.warm_up()
+                registry_loading = await c.get("/ready")
+
+                # Первое чтение таблицы coins (пустой — остаются SEED_COINS)
+                await coin_registry.refresh()
+                await readiness.warm_up()
+                ready = await c.get("/ready")
+            return not_ready, not_migrated, registry_loading, ready
+        finally:
+            readiness.ready = False
+            await engine.dispose()
+
+    not_ready, not_migrated, registry_loading, ready = asyncio.run(run())
+
+    assert not_ready.status_code == 503
+    assert not_migrated.status_code == 503
+    assert registry_loading.status_code == 503
+    assert ready.status_code == 200, ready.text
+    assert ready.json()["checks"]["db_primary"] == "ok"
+    assert ready.json()["checks"]["redis"] == "disabled"
+    assert ready.json()["checks"]["coin_registry"] == "seed"
@@ -0,0 +1,77 @@
+"""
+Крайний срок SQL-запросов: в Postgres остаток бюджета HTTP-запроса
+становится statement_timeout транзакции.
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+from core.database import (
+    QUERY_CANCELED,
+    StatementDeadlineExceeded,
+    check_statement_deadline,
+    reset_statement_timeout,
+    statement_deadline,
+    translate_statement_timeout,
+)
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(int(parameters[0]))
+
+
+def run_check(conn, cursor):
+    check_statement_deadline(conn, cursor, "SELECT 1", (), None, False)
+
+
+def test_statement_timeout_follows_deadline():
+    conn = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"), info={})
+    cursor = RecordingCursor()
+    token = statement_deadline.set(time.monotonic() + 2)
+    try:
+        run_check(conn, cursor)
+        # Тот же срок в пределах допуска — без лишнего round-trip
+        run_check(conn, cursor)
+        assert len(cursor.executed) == 1
+        assert 1900 < cursor.executed[0] <= 2000
+
+        # Срок стал ближе: прежний таймаут пережил бы его
+        statement_deadline.set(time.monotonic() + 0.5)
+        run_check(conn, cursor)
+        assert len(cursor.executed) == 2
+        assert cursor.executed[1] <= 500
+
+        # Новая транзакция — SET LOCAL уже сброшен
+        reset_statement_timeout(conn)
+        run_check(conn, cursor)
+        assert len(cursor.executed) == 3
+
+        statement_deadline.set(time.monotonic() - 0.01)
+        with pytest.raises(StatementDeadlineExceeded):
+            run_check(conn, cursor)
+
+        canceled = SimpleNamespace(
+            original_exception=SimpleNamespace(sqlstate=QUERY_CANCELED)
+        )
+        assert isinstance(
+            translate_statement_timeout(canceled), StatementDeadlineExceeded
+        )
+    finally:
+        statement_deadline.reset(token)
+
+    assert translate_statement_timeout(canceled) is None
+
+
+def test_sqlite_only_checks_deadline():
+    conn = SimpleNamespace(dialect=SimpleNamespace(name="sqlite"), info={})
+    cursor = RecordingCursor()
+    token = statement_deadline.set(time.monotonic() + 2)
+    try:
+        run_check(conn, cursor)
+    finally:
+        statement_deadline.reset(token)
+    assert cursor.executed == []
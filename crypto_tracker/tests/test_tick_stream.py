@@ -0,0 +1,161 @@
+"""
+Поток цен: тик worker'а (publish_tick) через Redis Pub/Sub до событий
+SSE gateway (iter_tick_events), heartbeat и трассировка генераторов.
+"""
+import asyncio
+import importlib
+import inspect
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import core.tracing
+import orjson
+import pytest
+from core.config import settings
+from core.database import engine
+from core.security import make_token
+from core.tracing import traced
+from httpx import ASGITransport, AsyncClient
+from main import app
+from services.tick_stream import iter_tick_events
+
+WORKER_DIR = Path(__file__).resolve().parent.parent / "backend" / "worker"
+WORKER_PACKAGES = {"core", "models", "repositories", "services"}
+
+
+def is_shared_package(name: str) -> bool:
+    return name.split(".")[0] in WORKER_PACKAGES
+
+
+def import_worker_module(name: str):
+    """
+    Модуль worker'а в процессе тестов. У worker'а и api_gateway одинаковые
+    имена пакетов, поэтому на время импорта пакеты gateway убираются
+    из sys.modules; импортированный модуль держит ссылки на свои.
+    """
+    gateway_modules = {n: m for n, m in sys.modules.items() if is_shared_package(n)}
+    for n in gateway_modules:
+        del sys.modules[n]
+    sys.path.insert(0, str(WORKER_DIR))
+    try:
+        return importlib.import_module(name)
+    finally:
+        sys.path.remove(str(WORKER_DIR))
+        for n in [n for n in sys.modules if is_shared_package(n)]:
+            del sys.modules[n]
+        sys.modules.update(gateway_modules)
+
+
+@pytest.fixture
+def tick_publisher(fake_redis, monkeypatch):
+    """publish_tick worker'а, публикующий в тот же fakeredis, что читает gateway"""
+    publisher = import_worker_module("services.tick_publisher")
+    monkeypatch.setattr(publisher, "get_redis", lambda: fake_redis)
+    return publisher
+
+
+async def next_tick(events) -> dict:
+    """Следующее событие tick (комментарии-heartbeat пропускаются)"""
+    while True:
+        event = await asyncio.wait_for(events.__anext__(), timeout=5)
+        if event.startswith(b"event: tick"):
+            return orjson.loads(event.split(b"data: ", 1)[1])
+
+
+def test_publish_tick_to_stream(tick_publisher, fake_redis):
+    async def run():
+        events = iter_tick_events({"BTC", "ETH/EUR"})
+        try:
+            assert await events.__anext__() == b": connected\n\n"
+
+            await tick_publisher.publish_tick(
+                {"BTC": {"USD": 100.0, "EUR": 90.0}, "SOL": {"USD": 5.0}}
+            )
+            # Ни одного актива пользователя — событие не отправляется
+            await tick_publisher.publish_tick({"SOL": {"USD": 6.0}})
+            await tick_publisher.publish_tick({"ETH": {"USD": 10.0, "EUR": 9.0}})
+
+            return [await next_tick(events), await next_tick(events)]
+        finally:
+            await events.aclose()
+
+    first, second = asyncio.run(run())
+
+    assert first["tick"] == 1
+    assert first["prices"] == {"BTC": 100.0}
+    assert second["tick"] == 3
+    assert second["prices"] == {"ETH/EUR": 9.0}
+
+
+def test_heartbeat_when_idle(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_HEARTBEAT", 0.05)
+
+    async def run():
+        events = iter_tick_events({"BTC"})
+        try:
+            return [await events.__anext__(), await events.__anext__()]
+        finally:
+            await events.aclose()
+
+    assert asyncio.run(run()) == [b": connected\n\n", b": ping\n\n"]
+
+
+def test_stream_unavailable_without_redis(seed_series):
+    async def run():
+        try:
+            [user_id] = await seed_series.users("stream")
+            headers = {"Authorization": f"Bearer {make_token(user_id, 'stream')}"}
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url="http://test") as c:
+                return await c.get("/api/v1/assets/stream", headers=headers)
+        finally:
+            await engine.dispose()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 503
+
+
+class RecordingTracer:
+    def __init__(self):
+        self.spans = []
+
+    def start_span(self, name):
+        span = SimpleNamespace(name=name, ended=False)
+        span.end = lambda: setattr(span, "ended", True)
+        self.spans.append(span)
+        return span
+
+
+def test_traced_async_generator(monkeypatch):
+    tracer = RecordingTracer()
+    monkeypatch.setattr(core.tracing, "TRACING_AVAILABLE", True)
+    monkeypatch.setattr(
+        core.tracing, "trace", SimpleNamespace(get_tracer=lambda name: tracer)
+    )
+
+    @traced("numbers")
+    async def numbers(n):
+        for i in range(n):
+            yield i
+
+    async def run():
+        items = []
+        async for i in numbers(3):
+            # Спан открыт всю итерацию
+            assert not tracer.spans[0].ended
+            items.append(i)
+
+        # Клиент отключился посреди потока — спан все равно закрывается
+        partial = numbers(3)
+        await partial.__anext__()
+        await partial.aclose()
+        return items
+
+    assert inspect.isasyncgenfunction(numbers)
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert [(span.name, span.ended) for span in tracer.spans] == [
+        ("numbers", True),
+        ("numbers", True),
+    ]
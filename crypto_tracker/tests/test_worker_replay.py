@@ -0,0 +1,73 @@
+"""
+Воспроизведение ряда цен через worker (replay.py) на виртуальных часах.
+
+worker запускается отдельным процессом: у него и api_gateway
+одинаковые имена пакетов (core, models, ...).
+"""
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+WORKER_DIR = Path(__file__).resolve().parent.parent / "backend" / "worker"
+
+
+def run_replay(tmp_path: Path, *args: str) -> dict:
+    # DATABASE_URL из окружения прогон не трогает — только --database-url
+    env = {**os.environ, "DATABASE_URL": "sqlite+aiosqlite:////nonexistent/app.db"}
+    result = subprocess.run(
+        [
+            sys.executable,
+            "replay.py",
+            "--database-url",
+            f"sqlite+aiosqlite:///{tmp_path / 'replay.sqlite'}",
+            *args,
+            "--report",
+            str(tmp_path / "r.json"),
+        ],
+        cwd=WORKER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads((tmp_path / "r.json").read_text())
+
+
+def test_replay_csv_alert_latency(tmp_path):
+    # Цена 100 час, на 62-й минуте — 110: порог max_price=105 пересечен,
+    # ближайший тик (интервал 5 мин) — на 65-й минуте, задержка 180 с
+    start = datetime(2024, 1, 1)
+    lines = ["timestamp,price"]
+    for minute in range(0, 91):
+        price = 110 if minute >= 62 else 100
+        lines.append(f"{(start + timedelta(minutes=minute)).isoformat()},{price}")
+    series = tmp_path / "btc.csv"
+    series.write_text("\n".join(lines) + "\n")
+
+    report = run_replay(
+        tmp_path, "--csv", str(series), "--symbol", "BTC", "--speed", "0"
+    )
+
+    assert report["ticks"] == 19
+    assert report["db_growth"]["rows"] == 19
+    assert report["alerts"]["count"] == 1
+    assert report["alerts"]["latency_max_s"] == 180
+
+
+def test_replay_synthetic_is_deterministic(tmp_path):
+    args = ("--synthetic", "BTC,ETH", "--days", "1", "--band", "0.01", "--speed", "0")
+    reports = []
+    for run in ("first", "second"):
+        (tmp_path / run).mkdir()
+        reports.append(run_replay(tmp_path / run, *args))
+    first, second = reports
+
+    assert first["ticks"] == 289
+    assert first["db_growth"]["rows"] == 289 * 2
+    assert first["alerts"]["count"] > 0
+    assert first["alerts"]["latency_max_s"] <= first["interval_s"]
+    assert second["alerts"] == first["alerts"]